@@ -1,34 +1,98 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, InvalidSessionIdException,
+                                        NoSuchWindowException, WebDriverException)
 import pandas as pd
 import json
 import time
 import logging
+import queue
+import threading
 from datetime import datetime
 import os
+import re
+
+from company_schema import MIN_COLUMNS, CompanyRecord, json_default, row_to_record
+from crawl_waits import ReadinessWaiter
+from selector_probe import probe, probe_condition, select_option
+from browser_profile import NetworkReport, apply_lean_options, use_target
+from crawl_metrics import CrawlMetrics
+from rate_limiter import get_shared_limiter, is_error_page
+from crawl_journal import CrawlJournal
+from delta_index import DeltaTracker, FingerprintIndex
+from crawl_sinks import create_sink
+from cin_dedup import CinDeduplicator
+from page_cache import PageCache
+from company_statistics import compute_statistics
 
 class ROCCompanyCrawler:
-    def __init__(self, headless=True):
+    # List of all Indian states and UTs
+    STATES = [
+        "andaman and nicobar islands", "andhra pradesh", "arunachal pradesh", 
+        "assam", "bihar", "chandigarh", "chattisgarh", "dadra & nagar haveli", 
+        "daman and diu", "delhi", "goa", "gujarat", "haryana", "himachal pradesh", 
+        "jammu & kashmir", "jharkhand", "karnataka", "kerala", "ladakh", 
+        "lakshadweep", "madhya pradesh", "maharashtra", "manipur", "meghalaya", 
+        "mizoram", "nagaland", "orissa", "pondicherry", "punjab", "rajasthan", 
+        "sikkim", "tamil nadu", "telangana", "tripura", "uttar pradesh", 
+        "uttarakhand", "west bengal"
+    ]
+    
+    def __init__(self, headless=True, journal=None, delta=None, sink=None):
         self.setup_logging()
         self.driver = None
         self.wait = None
+        self.waiter = None
         self.headless = headless
         
-        # List of all Indian states and UTs
-        self.states = [
-            "andaman and nicobar islands", "andhra pradesh", "arunachal pradesh", 
-            "assam", "bihar", "chandigarh", "chattisgarh", "dadra & nagar haveli", 
-            "daman and diu", "delhi", "goa", "gujarat", "haryana", "himachal pradesh", 
-            "jammu & kashmir", "jharkhand", "karnataka", "kerala", "ladakh", 
-            "lakshadweep", "madhya pradesh", "maharashtra", "manipur", "meghalaya", 
-            "mizoram", "nagaland", "orissa", "pondicherry", "punjab", "rajasthan", 
-            "sikkim", "tamil nadu", "telangana", "tripura", "uttar pradesh", 
-            "uttarakhand", "west bengal"
-        ]
+        # Optional pause between consecutive states handled by the same driver;
+        # page readiness is handled by self.waiter, not by sleeping
+        self.state_delay = 0
+        
+        # Per-condition timeout overrides for ReadinessWaiter
+        self.wait_timeouts = {}
+        
+        # Keep one loaded page across states and only change the dropdown; the
+        # page is reloaded only when it is found corrupted or the session is stale
+        self.reuse_session = True
+        self.page_ready = False
+        self.page_loads = 0
+        self.page_reuses = 0
+        
+        # Lean browser profile (browser_profile.TARGET_PROFILES) blocking resources
+        # the crawler never reads; None launches a stock Chrome
+        self.browser_profile = 'roc'
+        self.network_report = NetworkReport()
+        
+        # Per-phase timing spans, latency histograms and row counters for the run
+        self.metrics = CrawlMetrics()
+        
+        # Per-host token buckets shared by every worker; the request rate to the
+        # site adapts to its latency, timeouts and error pages
+        self.rate_limiter = get_shared_limiter()
+        
+        # Optional CrawlJournal for resuming an interrupted crawl
+        self.journal = journal
+        
+        # Optional DeltaTracker for incremental crawls against a previous snapshot
+        self.delta = delta
+        
+        # Optional streaming sink (crawl_sinks); when set, rows are written as each
+        # page is extracted and are not kept in memory
+        self.sink = sink
+        
+        # Optional PageCache keeping a compressed DOM snapshot of every extracted
+        # page, so extraction can be re-run offline (page_cache.py reparse)
+        self.page_cache = None
+        
+        # Optional CinDeduplicator shared by every worker; rows whose CIN was already
+        # kept under any state are dropped before they are journaled or stored
+        self.dedup = None
+        
+        self.states = list(self.STATES)
         
         self.base_url = "https://www.data.gov.in/resource/registrars-companies-roc-wise-company-master-data"
         
@@ -56,10 +120,21 @@ class ROCCompanyCrawler:
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        if self.browser_profile:
+            apply_lean_options(chrome_options, [self.browser_profile])
         
         try:
             self.driver = webdriver.Chrome(options=chrome_options)
+            if self.browser_profile:
+                use_target(self.driver, self.browser_profile)
+            self.page_ready = False
             self.wait = WebDriverWait(self.driver, 30)  # Increased timeout
+            self.waiter = ReadinessWaiter(
+                self.driver,
+                timeouts=self.wait_timeouts,
+                table_selectors=self.TABLE_BODY_SELECTORS,
+                metrics=self.metrics
+            )
             self.logger.info("Chrome driver initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize Chrome driver: {e}")
@@ -68,17 +143,41 @@ class ROCCompanyCrawler:
     def close_driver(self):
         """Close the WebDriver"""
         if self.driver:
-            self.driver.quit()
+            if self.waiter and self.waiter.stats:
+                self.logger.info(f"Wait timings: {json.dumps(self.waiter.summary())}")
+            if self.page_loads or self.page_reuses:
+                self.logger.info(f"Page loads: {self.page_loads}, reused page for {self.page_reuses} states")
+            if self.browser_profile:
+                self.network_report.collect(self.driver)
+                self.logger.info(f"Network usage: {json.dumps(self.network_report.summary())}")
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                self.logger.warning(f"Error quitting Chrome driver: {e}")
+            self.driver = None
+            self.page_ready = False
             self.logger.info("Chrome driver closed")
     
+    def drain_network_log(self):
+        """Fold Chrome's performance log into the network report, so it does not grow over a long crawl"""
+        if self.browser_profile and self.driver:
+            self.network_report.collect(self.driver)
+    
     def navigate_to_page(self):
         """Navigate to the ROC data page"""
         try:
             self.logger.info(f"Navigating to: {self.base_url}")
-            self.driver.get(self.base_url)
-            
-            # Wait for page to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            with self.rate_limiter.request(self.base_url, self.metrics) as ticket:
+                self.driver.get(self.base_url)
+                self.page_loads += 1
+                self.drain_network_log()
+                
+                # Wait for page to load
+                self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                ticket['ok'] = not is_error_page(self.driver.title)
+            if not ticket['ok']:
+                self.logger.error(f"Site returned an error page: {self.driver.title}")
+                return False
             self.logger.info("Page loaded successfully")
             
             # Handle popup if present
@@ -92,55 +191,140 @@ class ROCCompanyCrawler:
             self.logger.error(f"Error navigating to page: {e}")
             return False
     
+    # One round trip that tells whether the loaded page can serve another state
+    PAGE_HEALTH_SCRIPT = """
+        var dropdown = document.getElementById('CompanyStateCode');
+        var buttons = document.querySelectorAll('button');
+        var preview = false;
+        for (var i = 0; i < buttons.length && !preview; i++) {
+            preview = buttons[i].textContent.indexOf('Preview & Download') !== -1;
+        }
+        var backdrop = document.querySelector('.modal-backdrop');
+        return {
+            ready: document.readyState === 'complete',
+            url: window.location.href,
+            dropdown: !!dropdown && dropdown.options.length > 1,
+            preview: preview,
+            popup: !!backdrop && backdrop.getClientRects().length > 0
+        };
+    """
+    
+    def page_is_healthy(self):
+        """Check that the loaded page still has a usable dropdown and Preview button"""
+        health = self.driver.execute_script(self.PAGE_HEALTH_SCRIPT) or {}
+        if not health.get('url', '').startswith(self.base_url):
+            self.logger.warning(f"Loaded page navigated away to {health.get('url')}")
+            return False
+        if not (health.get('ready') and health.get('dropdown') and health.get('preview')):
+            self.logger.warning(f"Loaded page is missing its controls: {health}")
+            return False
+        if health.get('popup'):
+            self.handle_popup()
+        return True
+    
+    def restart_driver(self):
+        """Replace a dead WebDriver session with a fresh one"""
+        self.logger.warning("WebDriver session is stale, restarting Chrome")
+        self.close_driver()
+        self.setup_driver()
+    
+    def prepare_page(self, force_reload=False, state_name=None):
+        """Reuse the loaded page when it is healthy, otherwise load it from scratch"""
+        # A reused page is never navigated away from, so its log is drained state by state
+        self.drain_network_log()
+        if self.reuse_session and self.page_ready and not force_reload:
+            try:
+                with self.metrics.span('check_page', state=state_name) as span:
+                    span['ok'] = self.page_is_healthy()
+                if span['ok']:
+                    self.page_reuses += 1
+                    self.logger.info("Reusing the loaded page")
+                    return True
+            except (InvalidSessionIdException, NoSuchWindowException):
+                self.restart_driver()
+            except WebDriverException as e:
+                self.logger.warning(f"Could not inspect the loaded page: {e}")
+        
+        with self.metrics.span('navigate', state=state_name) as span:
+            self.page_ready = span['ok'] = self.navigate_to_page()
+        return self.page_ready
+    
+    def open_state(self, state_name):
+        """Select a state and load its first table page, reloading the page once if a reused one fails"""
+        for attempt in range(2):
+            reused = self.reuse_session and self.page_ready and attempt == 0
+            if not self.prepare_page(force_reload=attempt > 0, state_name=state_name):
+                return False
+            
+            with self.metrics.span('select_state', state=state_name) as span:
+                span['ok'] = self.select_state(state_name)
+            if not span['ok']:
+                self.page_ready = False
+            else:
+                # Preview fetches the state's table from the site
+                with self.rate_limiter.request(self.base_url, self.metrics) as ticket:
+                    with self.metrics.span('preview', state=state_name) as span:
+                        span['ok'] = self.click_preview_download()
+                    if not span['ok']:
+                        self.page_ready = False
+                    else:
+                        with self.metrics.span('wait_data', state=state_name, page=1) as span:
+                            span['ok'] = ticket['ok'] = self.wait_for_data_load()
+            
+            if span['ok']:
+                return True
+            elif self.page_ready and not reused:
+                self.logger.warning(f"No data loaded for state: {state_name}")
+                return False
+            
+            if not reused:
+                return False
+            self.page_ready = False
+            self.logger.warning(f"Reused page failed for {state_name}, falling back to a full reload")
+        return False
+    
     def handle_popup(self):
         """Handle any popup messages that appear on the site"""
         try:
-            # Look for common popup close buttons
-            close_selectors = [
-                "button.close",
-                ".modal-header .close",
-                ".popup-close",
-                "button[data-dismiss='modal']",
-                ".close-button",
-                "//button[contains(text(), '×')]",
-                "//button[contains(text(), 'Close')]",
-                "//span[contains(text(), '×')]",
-                ".modal .close"
-            ]
-            
-            for selector in close_selectors:
+            # All close-button candidates are checked in one call
+            index, close_button = probe(self.driver, self.POPUP_CLOSE_SELECTORS)
+            if close_button is not None:
                 try:
-                    if selector.startswith("//"):
-                        close_button = self.driver.find_elements(By.XPATH, selector)
-                    else:
-                        close_button = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    if close_button and close_button[0].is_displayed():
-                        close_button[0].click()
-                        self.logger.info(f"Closed popup using selector: {selector}")
-                        time.sleep(1)
-                        return True
-                except Exception:
-                    continue
-            
-            # Check for modal backdrop and click it
-            try:
-                modal_backdrop = self.driver.find_elements(By.CSS_SELECTOR, ".modal-backdrop")
-                if modal_backdrop:
-                    # Press Escape key to close modal
-                    from selenium.webdriver.common.keys import Keys
-                    self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
-                    self.logger.info("Closed popup using Escape key")
-                    time.sleep(1)
+                    close_button.click()
+                    self.logger.info(f"Closed popup using selector: {self.POPUP_CLOSE_SELECTORS[index]}")
+                    self.waiter.wait_element_hidden('popup_closed', close_button)
                     return True
-            except Exception:
-                pass
+                except WebDriverException as e:
+                    self.logger.debug(f"Could not click popup close button: {e}")
+            
+            # Check for modal backdrop and press Escape to close it
+            _, modal_backdrop = probe(self.driver, [".modal-backdrop"])
+            if modal_backdrop is not None:
+                from selenium.webdriver.common.keys import Keys
+                self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+                self.logger.info("Closed popup using Escape key")
+                self.waiter.wait_element_hidden('popup_closed', modal_backdrop)
+                return True
             
             return False
             
         except Exception as e:
             self.logger.warning(f"Error handling popup: {e}")
             return False
+    
+    # Close buttons of the site's popups, in order of preference
+    POPUP_CLOSE_SELECTORS = [
+        "button.close",
+        ".modal-header .close",
+        ".popup-close",
+        "button[data-dismiss='modal']",
+        ".close-button",
+        "//button[contains(text(), '×')]",
+        "//button[contains(text(), 'Close')]",
+        "//span[contains(text(), '×')]",
+        ".modal .close"
+    ]
+
 
     def select_state(self, state_name):
         """Select a state from the dropdown"""
@@ -150,43 +334,17 @@ class ROCCompanyCrawler:
                 EC.element_to_be_clickable((By.ID, "CompanyStateCode"))
             )
             
-            # Create Select object
-            select = Select(state_dropdown)
-            
-            # Select the state by visible text (try different formats)
+            # Try the text formats (then values, then a partial match) in one call
             state_options = [
                 state_name.lower(),
                 state_name.title(),
                 state_name.upper(),
                 state_name
             ]
-            
-            selected = False
-            for state_option in state_options:
-                try:
-                    select.select_by_visible_text(state_option)
-                    selected = True
-                    break
-                except:
-                    try:
-                        select.select_by_value(state_option)
-                        selected = True
-                        break
-                    except:
-                        continue
-            
-            if not selected:
-                # Try selecting by partial text match
-                options = select.options
-                for option in options:
-                    if state_name.lower() in option.text.lower():
-                        select.select_by_visible_text(option.text)
-                        selected = True
-                        break
+            selected = select_option(self.driver, state_dropdown, state_options, partial=state_name)
             
             if selected:
-                self.logger.info(f"Selected state: {state_name}")
-                time.sleep(2)  # Wait for selection to take effect
+                self.logger.info(f"Selected state: {state_name} ({selected['text']})")
                 return True
             else:
                 self.logger.error(f"Could not select state: {state_name}")
@@ -198,9 +356,10 @@ class ROCCompanyCrawler:
         except Exception as e:
             self.logger.error(f"Error selecting state: {e}")
             return False
-    
+
+
     def click_preview_download(self):
-        """Click the Preview & Download button"""
+        """Click the Preview & Download button; False unless the table then shows different rows"""
         try:
             # Wait for and click the Preview & Download button
             preview_button = self.wait.until(
@@ -209,14 +368,18 @@ class ROCCompanyCrawler:
             
             # Scroll to button if needed
             self.driver.execute_script("arguments[0].scrollIntoView(true);", preview_button)
-            time.sleep(1)
+            
+            # Remember the table as it was so a refresh can be told apart from stale rows
+            previous_state = self.waiter.table_state()
             
             # Click the button
             preview_button.click()
             self.logger.info("Clicked Preview & Download button")
             
-            # Wait for the data to load
-            time.sleep(5)
+            # Wait for the new state's rows (or its empty table); on a reused page the old state's table is still showing
+            if self.waiter.wait_table_refreshed(previous_state) is None:
+                self.logger.error("Table did not refresh after clicking Preview & Download")
+                return False
             
             return True
             
@@ -230,55 +393,85 @@ class ROCCompanyCrawler:
     def wait_for_data_load(self):
         """Wait for company data to load after clicking Preview & Download"""
         try:
-            # Wait for table data to appear - try multiple selectors
-            selectors_to_try = [
-                "tbody[role='rowgroup']",
-                "table tbody",
-                ".data-table tbody",
-                "tbody tr",
-                "#DataTables_Table_0 tbody"
-            ]
-            
-            data_loaded = False
-            for selector in selectors_to_try:
-                try:
-                    self.wait.until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                    )
-                    self.logger.info(f"Data loaded with selector: {selector}")
-                    data_loaded = True
-                    break
-                except TimeoutException:
-                    continue
-            
-            if not data_loaded:
+            # One wait over every table selector, bounded by a single timeout
+            found = self.waiter.wait_for('data_table', probe_condition(self.DATA_TABLE_SELECTORS, visible=False))
+            if not found:
                 self.logger.warning("Could not find data table with any selector")
                 return False
+            self.logger.info(f"Data loaded with selector: {self.DATA_TABLE_SELECTORS[found[0]]}")
             
-            # Additional wait to ensure all data is loaded
-            time.sleep(3)
-            
-            return True
+            # Rows are only final once DataTables has finished processing
+            return self.waiter.wait_processing_done() is not None
             
         except Exception as e:
             self.logger.warning(f"Error waiting for data to load: {e}")
             return False
     
+    DATA_TABLE_SELECTORS = [
+        "tbody[role='rowgroup']",
+        "table tbody",
+        ".data-table tbody",
+        "tbody tr",
+        "#DataTables_Table_0 tbody"
+    ]
+    
+    # Reads every row of the first matching table body in one browser-side call
+    EXTRACT_TABLE_SCRIPT = """
+        var selectors = arguments[0];
+        var body = null;
+        for (var i = 0; i < selectors.length && !body; i++) {
+            body = document.querySelector(selectors[i]);
+        }
+        if (!body) {
+            return null;
+        }
+        var rows = body.querySelectorAll('tr');
+        var data = [];
+        for (var r = 0; r < rows.length; r++) {
+            var cells = rows[r].querySelectorAll('td');
+            var values = [];
+            for (var c = 0; c < cells.length; c++) {
+                // Hidden cells read as empty, the same as WebElement.text
+                var rendered = cells[c].getClientRects().length > 0;
+                values.push(rendered ? cells[c].innerText : '');
+            }
+            data.push(values);
+        }
+        return data;
+    """
+    
+    # Table bodies the rows are read from; DATA_TABLE_SELECTORS also accepts a bare row
+    TABLE_BODY_SELECTORS = [
+        "tbody[role='rowgroup']",
+        "table tbody",
+        ".data-table tbody",
+        "#DataTables_Table_0 tbody"
+    ]
+
     def extract_company_data(self):
-        """Extract company data from the current page"""
+        """Extract company data from the current page with a single script call"""
+        try:
+            rows = self.driver.execute_script(self.EXTRACT_TABLE_SCRIPT, self.TABLE_BODY_SELECTORS)
+        except Exception as e:
+            self.logger.warning(f"Bulk table extraction failed, falling back to per-cell reads: {e}")
+            return self.extract_company_data_per_cell()
+        
+        if rows is None:
+            self.logger.error("Could not find table body")
+            return []
+        
+        self.logger.info(f"Found {len(rows)} company rows")
+        # One timestamp string shared by every row of the page
+        scraped_at = datetime.now().isoformat()
+        return [row_to_record(cells, scraped_at) for cells in rows if len(cells) >= MIN_COLUMNS]
+    
+    def extract_company_data_per_cell(self):
+        """Extract company data from the current page one WebDriver call per cell"""
         companies = []
         
         try:
-            # Try different selectors to find the table
-            table_selectors = [
-                "tbody[role='rowgroup']",
-                "table tbody",
-                ".data-table tbody",
-                "#DataTables_Table_0 tbody"
-            ]
-            
             table_body = None
-            for selector in table_selectors:
+            for selector in self.TABLE_BODY_SELECTORS:
                 try:
                     table_body = self.driver.find_element(By.CSS_SELECTOR, selector)
                     break
@@ -292,32 +485,14 @@ class ROCCompanyCrawler:
             # Find all rows
             rows = table_body.find_elements(By.CSS_SELECTOR, "tr")
             self.logger.info(f"Found {len(rows)} company rows")
+            scraped_at = datetime.now().isoformat()
             
             for row in rows:
                 try:
                     cells = row.find_elements(By.CSS_SELECTOR, "td")
                     
-                    if len(cells) >= 10:  # Adjust based on actual column count
-                        company_data = {
-                            'cin': cells[0].text.strip() if len(cells) > 0 else '',
-                            'company_name': cells[1].text.strip() if len(cells) > 1 else '',
-                            'roc': cells[2].text.strip() if len(cells) > 2 else '',
-                            'company_category': cells[3].text.strip() if len(cells) > 3 else '',
-                            'company_sub_category': cells[4].text.strip() if len(cells) > 4 else '',
-                            'class_of_company': cells[5].text.strip() if len(cells) > 5 else '',
-                            'authorized_capital': cells[6].text.strip() if len(cells) > 6 else '',
-                            'paid_up_capital': cells[7].text.strip() if len(cells) > 7 else '',
-                            'date_of_incorporation': cells[8].text.strip() if len(cells) > 8 else '',
-                            'registered_office_address': cells[9].text.strip() if len(cells) > 9 else '',
-                            'listing_status': cells[10].text.strip() if len(cells) > 10 else '',
-                            'company_status': cells[11].text.strip() if len(cells) > 11 else '',
-                            'state': cells[12].text.strip() if len(cells) > 12 else '',
-                            'country_of_incorporation': cells[13].text.strip() if len(cells) > 13 else '',
-                            'company_type_code': cells[14].text.strip() if len(cells) > 14 else '',
-                            'activity_description': cells[15].text.strip() if len(cells) > 15 else '',
-                            'scraped_at': datetime.now().isoformat()
-                        }
-                        companies.append(company_data)
+                    if len(cells) >= MIN_COLUMNS:
+                        companies.append(row_to_record([cell.text for cell in cells], scraped_at))
                 
                 except Exception as e:
                     self.logger.warning(f"Error extracting data from row: {e}")
@@ -333,116 +508,77 @@ class ROCCompanyCrawler:
             return []
     
     def handle_pagination(self):
-        """Handle pagination if available"""
+        """Turn the page: True once the next page loaded, False on the last page, None when the turn failed"""
         try:
-            # Wait a bit before checking pagination
-            time.sleep(2)
-            
-            # Look for next page button or pagination with more specific selectors
-            next_selectors = [
-                ".dataTables_paginate .paginate_button.next:not(.disabled)",
-                "a.paginate_button.next:not(.disabled)",
-                "button.paginate_button.next:not(.disabled)",
-                ".pagination .next:not(.disabled)",
-                "a[aria-label='Next']:not(.disabled)",
-                "button[aria-label='Next']:not(.disabled)",
-                "//a[contains(@class, 'next') and not(contains(@class, 'disabled'))]",
-                "//button[contains(@class, 'next') and not(contains(@class, 'disabled'))]",
-                "//a[contains(text(), 'Next') and not(contains(@class, 'disabled'))]",
-                "//button[contains(text(), 'Next') and not(contains(@class, 'disabled'))]"
-            ]
-            
-            for selector in next_selectors:
-                try:
-                    if selector.startswith("//"):
-                        next_buttons = self.driver.find_elements(By.XPATH, selector)
-                    else:
-                        next_buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    
-                    for next_button in next_buttons:
-                        if (next_button.is_enabled() and 
-                            next_button.is_displayed() and 
-                            'disabled' not in next_button.get_attribute('class').lower()):
-                            
-                            # Scroll to button
-                            self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-                            time.sleep(1)
-                            
-                            # Click the button
-                            next_button.click()
-                            self.logger.info(f"Clicked next page button with selector: {selector}")
-                            
-                            # Wait for new data to load
-                            time.sleep(3)
-                            
-                            # Verify that new data loaded by checking if URL changed or content updated
-                            if self.wait_for_data_load():
-                                return True
-                            else:
-                                self.logger.warning("Data didn't load after clicking next page")
-                                return False
-                                
-                except Exception as e:
-                    self.logger.debug(f"Failed to click with selector {selector}: {e}")
-                    continue
-            
+            previous_state = self.click_next_page()
+        except Exception as e:
+            self.logger.warning(f"Failed to click the next page button: {e}")
+            return None
+        if previous_state is None:
             self.logger.info("No enabled next page button found")
             return False
         
+        try:
+            # Verify that new data loaded: first CIN or row count must change
+            if self.waiter.wait_page_changed(previous_state) and self.wait_for_data_load():
+                return True
         except Exception as e:
-            self.logger.info(f"No more pages available: {e}")
-            return False
+            self.logger.warning(f"Error waiting for the next page: {e}")
+        self.logger.warning("Data didn't load after clicking next page")
+        return None
+    
+    def click_next_page(self):
+        """Click the first enabled Next button; returns the table state from before the click, or None without one
+
+        A button that is found but cannot be clicked raises, so a failed turn is not taken for the last page.
+        """
+        index, next_button = probe(self.driver, self.NEXT_PAGE_SELECTORS, visible=True, enabled=True,
+                                   exclude_class='disabled')
+        if next_button is None:
+            return None
+        
+        # Scroll to button
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
+        previous_state = self.waiter.table_state()
+        
+        # Click the button
+        next_button.click()
+        self.logger.info(f"Clicked next page button with selector: {self.NEXT_PAGE_SELECTORS[index]}")
+        return previous_state or {}
+    
+    # Next-page controls of DataTables and generic paginators, in order of preference
+    NEXT_PAGE_SELECTORS = [
+        ".dataTables_paginate .paginate_button.next:not(.disabled)",
+        "a.paginate_button.next:not(.disabled)",
+        "button.paginate_button.next:not(.disabled)",
+        ".pagination .next:not(.disabled)",
+        "a[aria-label='Next']:not(.disabled)",
+        "button[aria-label='Next']:not(.disabled)",
+        "//a[contains(@class, 'next') and not(contains(@class, 'disabled'))]",
+        "//button[contains(@class, 'next') and not(contains(@class, 'disabled'))]",
+        "//a[contains(text(), 'Next') and not(contains(@class, 'disabled'))]",
+        "//button[contains(text(), 'Next') and not(contains(@class, 'disabled'))]"
+    ]
     
     def fetch_companies_by_state(self, state_name, max_pages=None):
         """Fetch all companies for a specific state"""
         self.logger.info(f"Starting to fetch companies for state: {state_name}")
         
-        all_companies = []
-        page_count = 0
+        all_companies, page_count = self.resume_state(state_name)
+        if page_count and (self.journal.is_complete(state_name) or
+                           (max_pages and page_count >= max_pages)):
+            self.logger.info(f"Loaded {len(all_companies)} journaled companies for {state_name}")
+            return all_companies
         
         try:
-            # Navigate to the page
-            if not self.navigate_to_page():
-                return []
-            
-            # Select the state
-            if not self.select_state(state_name):
-                return []
-            
-            # Click Preview & Download button
-            if not self.click_preview_download():
-                return []
-            
-            # Wait for data to load
-            if not self.wait_for_data_load():
-                self.logger.warning(f"No data loaded for state: {state_name}")
-                return []
+            # Load (or reuse) the page, select the state and wait for its first page
+            if not self.open_state(state_name):
+                return all_companies
             
-            # Extract data from current page
-            while True:
-                page_count += 1
-                self.logger.info(f"Extracting data from page {page_count}")
-                
-                companies = self.extract_company_data()
-                if companies:
-                    all_companies.extend(companies)
-                    self.logger.info(f"Extracted {len(companies)} companies from page {page_count}")
-                else:
-                    self.logger.warning(f"No companies found on page {page_count}")
-                    break
-                
-                # Check if we've reached max pages
-                if max_pages and page_count >= max_pages:
-                    self.logger.info(f"Reached maximum pages limit: {max_pages}")
-                    break
-                
-                # Try to go to next page
-                if not self.handle_pagination():
-                    self.logger.info("No more pages available")
-                    break
-                
-                # Small delay between pages
-                time.sleep(2)
+            progress = self.start_state_pages(state_name, all_companies, page_count, max_pages)
+            all_companies = progress['companies']
+            while self.read_page(state_name, progress) and self.turn_page(state_name, progress):
+                pass
         
         except Exception as e:
             self.logger.error(f"Error fetching companies for {state_name}: {e}")
@@ -450,41 +586,484 @@ class ROCCompanyCrawler:
         self.logger.info(f"Total companies fetched for {state_name}: {len(all_companies)}")
         return all_companies
     
-    def fetch_all_states_data(self, selected_states=None, max_pages_per_state=None):
+    # The page loop of a state is split into steps so the async crawler can run the
+    # same steps with its page turns awaited on the event loop
+    
+    def start_state_pages(self, state_name, all_companies, page_count, max_pages=None):
+        """Prepare an opened state's table and move past the journaled rows; returns the page loop's progress"""
+        # Fewer, larger pages: switch to the largest page length and plan the page count
+        page_length, total, planned_pages = self.prepare_table(state_name)
+        
+        # Skip the rows a previous run already persisted
+        page_count, skip_rows = self.resume_offset(state_name, page_count, page_length)
+        fetched = self.journal.rows_recorded(state_name) if page_count else 0
+        if page_count and not self.timed_skip(state_name, page_count + 1):
+            self.logger.warning(f"Could not resume {state_name} at page {page_count + 1}, starting over")
+            self.restart_state(state_name)
+            # Emptied in place: the caller may be collecting into this list
+            all_companies.clear()
+            page_count, skip_rows, fetched = 0, 0, 0
+        
+        return {
+            'companies': all_companies,
+            'page': page_count,
+            'skip_rows': skip_rows,
+            'fetched': fetched,
+            'total': total,
+            'planned_pages': planned_pages,
+            'max_pages': max_pages
+        }
+    
+    def read_page(self, state_name, progress):
+        """Extract and record the current page; True when the loop should turn to the next page"""
+        progress['page'] += 1
+        page_count = progress['page']
+        self.logger.info(f"Extracting data from page {page_count}")
+        
+        with self.metrics.span('extract', state=state_name, page=page_count) as span:
+            extracted = self.extract_company_data()
+            span['ok'] = bool(extracted)
+        self.cache_page(state_name, page_count, progress['fetched'] - progress['skip_rows'])
+        
+        if not extracted:
+            self.logger.warning(f"No companies found on page {page_count}")
+            # An empty page ends the state only when the table has nothing more to give
+            if progress['total'] is not None and progress['fetched'] >= progress['total']:
+                self.complete_state(state_name)
+            else:
+                self.interrupt_state(state_name, f"page {page_count} returned no rows")
+            return False
+        
+        # The journal was written with a different page length: drop rows it already has
+        companies, progress['skip_rows'] = extracted[progress['skip_rows']:], 0
+        if companies:
+            # With a streaming sink rows go to disk in record_page instead of memory
+            kept = self.record_page(state_name, page_count, companies)
+            if not self.sink:
+                progress['companies'].extend(kept)
+            self.logger.info(f"Extracted {len(companies)} companies from page {page_count}")
+            if len(kept) < len(companies):
+                self.logger.info(f"Dropped {len(companies) - len(kept)} companies whose CIN was already kept")
+            progress['fetched'] += len(companies)
+            
+            if self.observe_page(state_name, companies):
+                self.logger.info(f"Stopping {state_name} early: reached a run of unchanged known companies")
+                self.complete_state(state_name)
+                return False
+        
+        # Check if we've reached max pages
+        if progress['max_pages'] and page_count >= progress['max_pages']:
+            self.logger.info(f"Reached maximum pages limit: {progress['max_pages']}")
+            return False
+        
+        # The info text said how many pages there are, so no need to look for Next
+        if progress['planned_pages'] and page_count >= progress['planned_pages']:
+            self.logger.info(f"Read all {progress['planned_pages']} planned pages for {state_name}")
+            self.check_coverage(state_name, progress['total'], progress['fetched'])
+            self.complete_state(state_name)
+            return False
+        return True
+    
+    def turn_page(self, state_name, progress):
+        """Go to the next page; True once it has loaded"""
+        with self.rate_limiter.request(self.base_url, self.metrics):
+            with self.metrics.span('paginate', state=state_name, page=progress['page'] + 1) as span:
+                turned = self.handle_pagination()
+                span['ok'] = turned is not None
+        return self.end_page_turn(state_name, progress, turned)
+    
+    def end_page_turn(self, state_name, progress, turned):
+        """Act on a page turn (True, False on the last page, None when it failed); True to read the next page"""
+        if turned:
+            return True
+        if turned is None:
+            # Clicked, but the next page never loaded: not the end of the state
+            self.interrupt_state(state_name, f"page {progress['page'] + 1} did not load")
+        else:
+            self.logger.info("No more pages available")
+            self.check_coverage(state_name, progress['total'], progress['fetched'])
+            self.complete_state(state_name)
+        return False
+    
+    # Largest rows per page extracted in one go; "All" is only chosen below this
+    MAX_PAGE_LENGTH = 5000
+    
+    # Switches the DataTables page-length menu to its largest option and reports
+    # the page length and record total before and after
+    PAGE_LENGTH_SCRIPT = """
+        var cap = arguments[0];
+        var api = null;
+        if (window.jQuery && jQuery.fn.dataTable) {
+            var tables = jQuery.fn.dataTable.tables({visible: true, api: true});
+            if (tables && tables.page && tables.page.info() !== undefined) {
+                api = tables;
+            }
+        }
+        var info = document.querySelector('.dataTables_info');
+        var result = {
+            changed: false,
+            previous: api ? api.page.len() : null,
+            length: null,
+            total: api ? api.page.info().recordsDisplay : null,
+            info: info ? info.innerText : ''
+        };
+        
+        var select = document.querySelector(".dataTables_length select, select[name$='_length']");
+        if (!select) {
+            result.length = result.previous;
+            return result;
+        }
+        if (result.previous === null) {
+            result.previous = parseInt(select.value, 10);
+        }
+        
+        // -1 is the DataTables "All" option
+        var best = null;
+        for (var i = 0; i < select.options.length; i++) {
+            var value = parseInt(select.options[i].value, 10);
+            if (value === -1 && result.total !== null && result.total <= cap) {
+                best = -1;
+                break;
+            }
+            if (value > 0 && value <= cap && (best === null || value > best)) {
+                best = value;
+            }
+        }
+        if (best === null || best === result.previous) {
+            result.length = result.previous;
+            return result;
+        }
+        
+        if (api) {
+            api.page.len(best).draw();
+        } else {
+            select.value = String(best);
+            select.dispatchEvent(new Event('change', {bubbles: true}));
+        }
+        result.changed = true;
+        result.length = best;
+        return result;
+    """
+    
+    # "Showing 1 to 10 of 1,234 entries (filtered from ...)"
+    TABLE_INFO_PATTERN = re.compile(r'of\s+([\d,]+)\s+(?:entries|records|rows)', re.IGNORECASE)
+    
+    def maximize_page_length(self):
+        """Switch the table to its largest page length; returns rows per page (None if unknown)"""
+        try:
+            previous_state = self.waiter.table_state()
+            result = self.driver.execute_script(self.PAGE_LENGTH_SCRIPT, self.MAX_PAGE_LENGTH) or {}
+        except Exception as e:
+            self.logger.warning(f"Could not change the page length: {e}")
+            return None
+        
+        length = result.get('length')
+        if result.get('changed'):
+            self.logger.info(f"Page length {result.get('previous')} -> {'all' if length == -1 else length}")
+            total = result.get('total') or self.parse_table_total(result.get('info'))
+            
+            # Rows only change if the old page did not already hold every record
+            if total is not None and result.get('previous') and total <= result['previous']:
+                self.waiter.wait_processing_done()
+            elif not self.waiter.wait_page_changed(previous_state) or not self.wait_for_data_load():
+                self.logger.warning("Table did not redraw after changing the page length")
+                return None
+        
+        if length == -1:
+            state = self.waiter.table_state()
+            return state['rows'] if state else None
+        return length if length and length > 0 else None
+    
+    def parse_table_total(self, info_text):
+        """Record total from the table info text, or None"""
+        match = self.TABLE_INFO_PATTERN.search(info_text or '')
+        return int(match.group(1).replace(',', '')) if match else None
+    
+    def read_table_total(self):
+        """Total records of the current table from the DataTables API or its info text"""
+        try:
+            result = self.driver.execute_script(self.PAGE_LENGTH_SCRIPT, 0) or {}
+        except Exception as e:
+            self.logger.debug(f"Could not read the table total: {e}")
+            return None
+        if result.get('total') is not None:
+            return int(result['total'])
+        return self.parse_table_total(result.get('info'))
+    
+    def prepare_table(self, state_name):
+        """Maximize the page length and plan the page count; returns (page_length, total, planned_pages)"""
+        with self.rate_limiter.request(self.base_url, self.metrics):
+            with self.metrics.span('page_length', state=state_name) as span:
+                page_length = self.maximize_page_length()
+                span['ok'] = page_length is not None
+        
+        total = self.read_table_total()
+        planned_pages = -(-total // page_length) if total is not None and page_length else None
+        if total is not None:
+            self.logger.info(f"{state_name}: {total} records in {planned_pages or '?'} pages of {page_length or '?'} rows")
+        return page_length, total, planned_pages
+    
+    def check_coverage(self, state_name, total, fetched):
+        """Warn when a fully paged state has fewer rows than the table reported"""
+        if total is not None and fetched < total:
+            self.logger.warning(f"{state_name}: extracted {fetched} of {total} records")
+            return False
+        return True
+    
+    def resume_offset(self, state_name, page_count, page_length):
+        """Pages to skip and leading rows to drop on resume, whatever page length the journal used"""
+        if not page_count or not page_length:
+            return page_count, 0
+        return divmod(self.journal.rows_recorded(state_name), page_length)
+    
+    def resume_state(self, state_name):
+        """Rows and last completed page journaled for a state by an earlier run"""
+        if not self.journal:
+            return [], 0
+        
+        page_count = self.journal.last_page(state_name)
+        if not page_count:
+            return [], 0
+        
+        companies = [CompanyRecord.from_dict(company) for company in self.journal.load_rows(state_name)]
+        self.logger.info(f"Resuming {state_name} after page {page_count} with {len(companies)} journaled companies")
+        
+        # The delta tracker has to see journaled rows too, or they would count as removed
+        self.observe_page(state_name, companies)
+        if self.dedup:
+            self.dedup.remember(state_name, companies)
+        
+        # A streaming sink already received these rows before the interruption
+        if self.sink:
+            companies = []
+        return companies, page_count
+    
+    def cache_page(self, state_name, page_number, offset=None):
+        """Snapshot the current page into the page cache; offset is the index of its first row"""
+        if not self.page_cache:
+            return None
+        try:
+            with self.metrics.span('cache_page', state=state_name, page=page_number):
+                return self.page_cache.put(self.driver.page_source, self.base_url, 'roc',
+                                           state=state_name, page=page_number, offset=offset)
+        except Exception as e:
+            self.logger.warning(f"Could not cache page {page_number} of {state_name}: {e}")
+            return None
+    
+    def record_page(self, state_name, page_number, companies):
+        """Persist progress once a page has been extracted; returns the rows kept after CIN deduplication"""
+        self.metrics.add_rows(len(companies), state=state_name)
+        table_rows = len(companies)
+        if self.dedup:
+            companies = self.dedup.filter_page(state_name, page_number, companies)
+        if not self.sink and not self.journal:
+            return companies
+        with self.metrics.span('record', state=state_name, page=page_number):
+            if self.sink:
+                self.sink.write_page(state_name, companies)
+            if self.journal:
+                # The journal counts table rows, dropped duplicates included, so a resume lands on the right row
+                self.journal.record_page(state_name, page_number, companies, table_rows)
+        return companies
+    
+    def restart_state(self, state_name):
+        """Forget a state's progress so it is crawled again from page 1"""
+        self.journal.reset_state(state_name)
+        if self.dedup:
+            self.dedup.reset_state(state_name)
+    
+    def observe_page(self, state_name, companies):
+        """Classify a page for an incremental crawl; True once the state can stop early"""
+        if not self.delta:
+            return False
+        return self.delta.observe_page(state_name, companies)
+    
+    def complete_state(self, state_name):
+        """Mark a state as finished so a restarted crawl skips it"""
+        if self.journal:
+            self.journal.complete_state(state_name)
+        if self.delta:
+            self.delta.finish_state(state_name)
+    
+    def interrupt_state(self, state_name, reason):
+        """Leave a state open after a failed page, so a later run resumes it and no CIN is tombstoned"""
+        self.logger.warning(f"Leaving {state_name} incomplete: {reason}")
+        if self.delta:
+            self.delta.stop_state(state_name)
+    
+    # Jumps straight to a page through the DataTables API when the page exposes it
+    JUMP_TO_PAGE_SCRIPT = """
+        var target = arguments[0];
+        if (!window.jQuery || !jQuery.fn.dataTable) {
+            return false;
+        }
+        var api = jQuery.fn.dataTable.tables({visible: true, api: true});
+        if (!api || !api.page || api.page.info() === undefined) {
+            return false;
+        }
+        if (target >= api.page.info().pages) {
+            return false;
+        }
+        api.page(target).draw('page');
+        return api.page.info().page === target;
+    """
+    
+    def timed_skip(self, state_name, page_number):
+        with self.metrics.span('skip', state=state_name, page=page_number) as span:
+            span['ok'] = self.skip_to_page(page_number)
+        return span['ok']
+    
+    def skip_to_page(self, page_number):
+        """Move the table to page_number without extracting the pages before it"""
+        previous_state = self.waiter.table_state()
+        
+        try:
+            if self.driver.execute_script(self.JUMP_TO_PAGE_SCRIPT, page_number - 1):
+                self.logger.info(f"Jumped to page {page_number} through the DataTables API")
+                return self.waiter.wait_page_changed(previous_state) is not None
+        except Exception as e:
+            self.logger.debug(f"DataTables page jump unavailable: {e}")
+        
+        # Fast-forward by clicking Next without extracting
+        self.logger.info(f"Fast-forwarding to page {page_number}")
+        for _ in range(page_number - 1):
+            if not self.handle_pagination():
+                return False
+        return True
+    
+    def fetch_all_states_data(self, selected_states=None, max_pages_per_state=None, workers=1):
         """Fetch company data for all states or selected states"""
         states_to_fetch = selected_states if selected_states else self.states
+        
+        if workers and workers > 1:
+            return self.fetch_states_parallel(states_to_fetch, max_pages_per_state, workers)
+        
         all_data = {}
         
         try:
             self.setup_driver()
             
             for state in states_to_fetch:
-                self.logger.info(f"Processing state: {state}")
-                
-                try:
-                    companies = self.fetch_companies_by_state(state, max_pages_per_state)
-                    all_data[state] = companies
-                    
-                    # Save individual state data
-                    if companies:
-                        self.save_to_csv(companies, f"companies_{state.replace(' ', '_').replace('&', 'and')}.csv")
-                        self.logger.info(f"Saved {len(companies)} companies for {state}")
-                    else:
-                        self.logger.warning(f"No companies found for {state}")
-                
-                except Exception as e:
-                    self.logger.error(f"Error processing state {state}: {e}")
-                    all_data[state] = []
-                    continue
+                all_data[state] = self.process_state(state, max_pages_per_state)
                 
-                # Small delay between states
-                time.sleep(3)
+                # Optional delay between states
+                if self.state_delay:
+                    time.sleep(self.state_delay)
         
         finally:
             self.close_driver()
         
         return all_data
     
+    def fetch_states_parallel(self, states, max_pages_per_state=None, workers=4):
+        """Fetch states concurrently, one isolated WebDriver per worker pulling from a shared queue"""
+        work_queue = queue.Queue()
+        for state in states:
+            work_queue.put(state)
+        
+        results = {}
+        results_lock = threading.Lock()
+        workers = min(workers, len(states)) or 1
+        
+        def run_worker(worker_id):
+            crawler = self.spawn_worker()
+            try:
+                crawler.setup_driver()
+            except Exception as e:
+                # Leave the queue to the remaining workers
+                self.logger.error(f"Worker {worker_id} could not start a driver: {e}")
+                return
+            
+            try:
+                while True:
+                    try:
+                        state = work_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    
+                    self.logger.info(f"Worker {worker_id} picked up state: {state}")
+                    companies = crawler.process_state(state, max_pages_per_state)
+                    with results_lock:
+                        results[state] = companies
+                    
+                    if crawler.state_delay and not work_queue.empty():
+                        time.sleep(crawler.state_delay)
+            finally:
+                crawler.close_driver()
+        
+        self.logger.info(f"Crawling {len(states)} states with {workers} parallel workers")
+        threads = [
+            threading.Thread(target=run_worker, args=(i,), name=f"roc-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Merge in the requested order so the result matches the serial path
+        all_data = {}
+        for state in states:
+            if state not in results:
+                self.logger.error(f"State was never processed by any worker: {state}")
+            all_data[state] = results.get(state, [])
+        
+        return all_data
+    
+    def spawn_worker(self):
+        """Create an independent crawler with its own driver for a parallel worker"""
+        worker = ROCCompanyCrawler(headless=self.headless)
+        self.share_settings(worker)
+        return worker
+    
+    def share_settings(self, worker):
+        """Copy crawl settings and shared collaborators onto a worker crawler"""
+        worker.base_url = self.base_url
+        worker.state_delay = self.state_delay
+        worker.wait_timeouts = self.wait_timeouts
+        worker.reuse_session = self.reuse_session
+        worker.browser_profile = self.browser_profile
+        worker.metrics = self.metrics
+        worker.rate_limiter = self.rate_limiter
+        worker.journal = self.journal
+        worker.delta = self.delta
+        worker.sink = self.sink
+        worker.page_cache = self.page_cache
+        worker.dedup = self.dedup
+    
+    def process_state(self, state, max_pages=None):
+        """Fetch one state and write its CSV, returning the companies found"""
+        self.logger.info(f"Processing state: {state}")
+        
+        try:
+            with self.metrics.span('state', state=state):
+                companies = self.fetch_companies_by_state(state, max_pages)
+            
+            self.save_state(state, companies)
+            return companies
+        
+        except Exception as e:
+            self.logger.error(f"Error processing state {state}: {e}")
+            return []
+        
+        finally:
+            if self.sink:
+                self.sink.finish_state(state)
+    
+    def save_state(self, state, companies):
+        """Write a finished state's CSV (a streaming sink has written it page by page)"""
+        if self.sink:
+            count = self.sink.counts.get(state, 0)
+        else:
+            count = len(companies)
+            if companies:
+                self.save_to_csv(companies, f"companies_{state.replace(' ', '_').replace('&', 'and')}.csv")
+        
+        if count:
+            self.logger.info(f"Saved {count} companies for {state}")
+        else:
+            self.logger.warning(f"No companies found for {state}")
+    
     def save_to_csv(self, companies, filename):
         """Save company data to CSV file"""
         if not companies:
@@ -501,10 +1080,12 @@ class ROCCompanyCrawler:
         """Save data to JSON file"""
         try:
             with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+                json.dump(data, f, indent=2, ensure_ascii=False, default=json_default)
             self.logger.info(f"Saved data to {filename}")
+            return True
         except Exception as e:
             self.logger.error(f"Error saving to JSON: {e}")
+            return False
     
     def get_company_statistics(self, companies):
         """Generate statistics for the fetched companies"""
@@ -512,25 +1093,47 @@ class ROCCompanyCrawler:
             return {}
         
         try:
-            df = pd.DataFrame(companies)
-            
-            stats = {
-                'total_companies': len(companies),
-                'companies_by_status': df['company_status'].value_counts().to_dict(),
-                'companies_by_category': df['company_category'].value_counts().to_dict(),
-                'companies_by_roc': df['roc'].value_counts().to_dict(),
-                'top_activities': df['activity_description'].value_counts().head(10).to_dict(),
-                'companies_by_class': df['class_of_company'].value_counts().to_dict()
-            }
-            
-            return stats
+            return compute_statistics(companies)['national']
         except Exception as e:
             self.logger.error(f"Error generating statistics: {e}")
             return {}
 
 def main():
     """Main function to run the crawler"""
-    crawler = ROCCompanyCrawler(headless=False)  # Set to True for headless mode
+    # Set ROC_CRAWLER_JOURNAL to a directory to make the crawl resumable after a crash
+    journal_dir = os.environ.get("ROC_CRAWLER_JOURNAL")
+    journal = CrawlJournal(journal_dir) if journal_dir else None
+    
+    # Set ROC_CRAWLER_INDEX to a CIN index file for an incremental crawl that only
+    # emits new/changed companies and tombstones (see delta_index.py)
+    index_path = os.environ.get("ROC_CRAWLER_INDEX")
+    delta = DeltaTracker(FingerprintIndex.load(index_path)) if index_path else None
+    
+    # Set ROC_CRAWLER_SINK to "ndjson" or "parquet" to stream rows to disk page by page
+    # instead of holding every state in memory until the end
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    sink_kind = os.environ.get("ROC_CRAWLER_SINK")
+    sink = create_sink(sink_kind, f"all_companies_data_{timestamp}.{sink_kind}") if sink_kind else None
+    
+    crawler = ROCCompanyCrawler(headless=False, journal=journal, delta=delta, sink=sink)  # Set to True for headless mode
+    
+    # States share one loaded page by default; ROC_CRAWLER_REUSE_SESSION=0 reloads it for every state
+    crawler.reuse_session = os.environ.get("ROC_CRAWLER_REUSE_SESSION", "1") != "0"
+    
+    # Set ROC_CRAWLER_PAGE_CACHE to a directory to keep every page's DOM for offline re-parsing
+    page_cache_dir = os.environ.get("ROC_CRAWLER_PAGE_CACHE")
+    if page_cache_dir:
+        crawler.page_cache = PageCache(page_cache_dir)
+    
+    # Every row the site lists is kept by default; ROC_CRAWLER_DEDUP=1 drops rows whose CIN was
+    # already kept under another state or page. Set ROC_CRAWLER_DEDUP_SPILL to a SQLite file to
+    # bound the CIN set's memory on very large runs
+    if os.environ.get("ROC_CRAWLER_DEDUP") == "1":
+        crawler.dedup = CinDeduplicator(spill_path=os.environ.get("ROC_CRAWLER_DEDUP_SPILL"))
+    
+    # ROC_CRAWLER_LEAN=0 launches a stock Chrome that downloads images, fonts and trackers
+    if os.environ.get("ROC_CRAWLER_LEAN", "1") == "0":
+        crawler.browser_profile = None
     
     # Example 1: Fetch data for specific states
     selected_states = ["andaman and nicobar islands", "andhra pradesh", "arunachal pradesh", 
@@ -545,36 +1148,74 @@ def main():
     print("Starting ROC Company Data Crawler with Selenium...")
     
     try:
-        # Fetch data for selected states (increase pages per state)
+        # Pages are as large as the site allows and planned from the record total,
+        # so states are crawled completely unless ROC_CRAWLER_MAX_PAGES caps them
+        max_pages = os.environ.get("ROC_CRAWLER_MAX_PAGES")
         all_data = crawler.fetch_all_states_data(
             selected_states=selected_states, 
-            max_pages_per_state=5  # Increased from 2 to 5
+            max_pages_per_state=int(max_pages) if max_pages else None,
+            workers=int(os.environ.get("ROC_CRAWLER_WORKERS", "1"))  # One Chrome per worker
         )
         
-        # Save combined data
-        crawler.save_to_json(all_data, f"all_companies_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        # Save combined data, or only the changes in incremental mode; a streaming
+        # sink has already written the combined output
+        saved = True
+        if sink:
+            sink.close()
+        if delta:
+            saved = crawler.save_to_json(delta.delta(), f"delta_companies_data_{timestamp}.json")
+            if saved:
+                delta.updated_index().save(index_path)
+        elif not sink:
+            saved = crawler.save_to_json(all_data, f"all_companies_data_{timestamp}.json")
         
-        # Generate and display statistics
-        total_companies = 0
-        for state, companies in all_data.items():
-            if companies:
-                stats = crawler.get_company_statistics(companies)
-                print(f"\n=== Statistics for {state.title()} ===")
-                print(f"Total Companies: {stats.get('total_companies', 0)}")
-                print(f"Active Companies: {stats.get('companies_by_status', {}).get('Active', 0)}")
-                if stats.get('companies_by_roc'):
-                    print(f"Top ROC: {list(stats['companies_by_roc'].keys())[0]}")
-                total_companies += len(companies)
+        # Set ROC_CRAWLER_SNAPSHOT=1 to also write a typed, memory-mappable Arrow snapshot
+        if os.environ.get("ROC_CRAWLER_SNAPSHOT") and not delta:
+            from company_snapshot import write_snapshot
+            source = sink.sinks[0].path if sink else all_data
+            if sink_kind == 'parquet':
+                import pyarrow.parquet as pq
+                source = pq.read_table(source).to_pylist()
+            rows = write_snapshot(source, f"all_companies_data_{timestamp}.arrow")
+            print(f"Wrote typed snapshot with {rows} companies")
         
+        # The combined file now holds everything the journal was protecting
+        if journal and saved:
+            journal.clear()
+        
+        # Generate and display statistics for all states in one vectorized pass
+        statistics = compute_statistics(sink.sinks[0].path if sink else all_data)
+        for state, stats in statistics['states'].items():
+            print(f"\n=== Statistics for {state.title()} ===")
+            print(f"Total Companies: {stats.get('total_companies', 0)}")
+            print(f"Active Companies: {stats.get('companies_by_status', {}).get('Active', 0)}")
+            if stats.get('companies_by_roc'):
+                print(f"Top ROC: {list(stats['companies_by_roc'].keys())[0]}")
+        
+        national = statistics['national']
+        paid_up = national['capital']['paid_up_capital']
         print(f"\n=== OVERALL SUMMARY ===")
-        print(f"Total States Processed: {len([s for s, c in all_data.items() if c])}")
-        print(f"Total Companies Scraped: {total_companies}")
+        print(f"Total States Processed: {len(statistics['states'])}")
+        print(f"Total Companies Scraped: {national['total_companies']}")
+        print(f"Active Companies: {national['companies_by_status'].get('Active', 0)}")
+        if paid_up['reported']:
+            print(f"Paid-up Capital: total Rs {paid_up['sum']:,.2f}, median Rs {paid_up['median']:,.2f}")
         
         print("\nCrawling completed successfully!")
         
     except Exception as e:
         print(f"Error during crawling: {e}")
         logging.error(f"Main execution error: {e}")
+    
+    finally:
+        # Per-phase timings for this run, also in Prometheus text format for node_exporter's textfile collector
+        crawler.metrics.export(f"crawl_metrics_{timestamp}.json", f"crawl_metrics_{timestamp}.prom")
+        print(f"\n=== CRAWL TIMINGS ===\n{crawler.metrics.report()}")
+        print(f"Request rates settled at: {json.dumps(crawler.rate_limiter.summary())}")
+        if crawler.dedup:
+            crawler.dedup.save_report(f"duplicate_report_{timestamp}.json")
+            print(f"Dropped {crawler.dedup.duplicates} duplicate companies (see duplicate_report_{timestamp}.json)")
+            crawler.dedup.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
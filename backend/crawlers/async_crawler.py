@@ -0,0 +1,501 @@
+"""asyncio core for running many crawl fetches from one process
+
+Selenium and urllib3 are blocking, so every fetch still runs on a worker
+thread, but scheduling moves to one event loop. State crawls, Wikipedia
+infobox lookups and leadership page scrapes are coroutines that
+AsyncCrawlCore runs under:
+
+    per-host limits     a bounded semaphore per host caps concurrent requests
+                        to it; max_in_flight caps the whole process, and
+                        the shared rate_limiter paces how often each host
+                        is hit
+    async waits         readiness probes run on a thread, the polling
+                        interval sleeps on the loop, so a waiting page holds
+                        no thread
+    cancellation        stop() (or Ctrl+C) cancels every pending coroutine at
+                        its next await; browsers and pools are released in
+                        finally blocks and journaled progress stays on disk
+
+Browser work uses a pool of crawler contexts (one Chrome each); the HTTP
+engine shares one keep-alive pool across all states:
+
+    python async_crawler.py states --fixture --states assam bihar delhi
+    python async_crawler.py states --browser --contexts 4 --max-pages 5
+    python async_crawler.py companies "Tata Consultancy Services" Infosys --drivers 2
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from urllib.parse import urlparse
+
+from crawl_metrics import CrawlMetrics
+from crawl_waits import page_changed
+from rate_limiter import get_shared_limiter
+
+# Concurrent requests allowed per host; anything else gets default_host_limit
+DEFAULT_HOST_LIMITS = {
+    'api.data.gov.in': 8,
+    'www.data.gov.in': 4,
+    'en.wikipedia.org': 8,
+    'www.tcs.com': 2
+}
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCrawlCore:
+    """Event-loop scheduler for blocking fetches with per-host and global limits"""
+
+    def __init__(self, host_limits=None, default_host_limit=4, max_in_flight=32, metrics=None):
+        self.host_limits = dict(DEFAULT_HOST_LIMITS)
+        self.host_limits.update(host_limits or {})
+        self.default_host_limit = default_host_limit
+        self.max_in_flight = max_in_flight
+        self.metrics = metrics or CrawlMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='crawl-io')
+        self._in_flight = asyncio.BoundedSemaphore(max_in_flight)
+        self._host_semaphores = {}
+        self.stopping = asyncio.Event()
+
+    def host_limit(self, host):
+        return self.host_limits.get(host, self.default_host_limit)
+
+    @asynccontextmanager
+    async def slot(self, host=None):
+        """Hold one global slot and, for network work, one slot on host"""
+        if host is None:
+            async with self._in_flight:
+                yield
+            return
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.BoundedSemaphore(self.host_limit(host))
+        # The host slot comes first, so work queued on a busy host holds no global slot other hosts could use
+        async with semaphore:
+            async with self._in_flight:
+                yield
+
+    def check_cancelled(self):
+        """Raise CancelledError once stop() was called, so long loops end at a safe point"""
+        if self.stopping.is_set():
+            raise asyncio.CancelledError("crawl stopped")
+
+    async def call(self, host, function, *args, **kwargs):
+        """Run a blocking call on the worker threads under host's limit (host=None: no network)"""
+        self.check_cancelled()
+        async with self.slot(host):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, partial(function, *args, **kwargs))
+
+    async def wait_until(self, name, probe, predicate, timeout=30, poll_interval=0.1):
+        """Poll probe() on a thread until predicate(value) holds; returns the value or None on timeout"""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        deadline = start + timeout
+        value = None
+        satisfied = False
+        while True:
+            self.check_cancelled()
+            try:
+                value = await loop.run_in_executor(self._executor, probe)
+                satisfied = bool(value) and bool(predicate(value))
+            except Exception as e:
+                logger.debug(f"Wait '{name}' probe failed: {e}")
+            if satisfied or time.perf_counter() >= deadline:
+                break
+            await asyncio.sleep(poll_interval)
+
+        self.metrics.observe(f"wait_{name}", time.perf_counter() - start, satisfied)
+        if not satisfied:
+            logger.warning(f"Wait '{name}' timed out after {timeout}s")
+        return value if satisfied else None
+
+    def stop(self):
+        """Ask every coroutine to stop at its next await"""
+        if not self.stopping.is_set():
+            logger.warning("Stopping crawl, cancelling pending fetches")
+            self.stopping.set()
+
+    async def run(self, coroutines):
+        """Run coroutines concurrently; returns their results in order (None for failures)"""
+        tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+
+        async def cancel_on_stop():
+            await self.stopping.wait()
+            for task in tasks:
+                task.cancel()
+
+        watcher = asyncio.ensure_future(cancel_on_stop())
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            watcher.cancel()
+
+        for index, result in enumerate(results):
+            if isinstance(result, asyncio.CancelledError):
+                results[index] = None
+            elif isinstance(result, Exception):
+                logger.error(f"Crawl task failed: {result}")
+                results[index] = None
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncResourcePool:
+    """Fixed set of blocking resources (crawler contexts, WebDrivers) lent to coroutines"""
+
+    def __init__(self, core, factory, size, closer):
+        self.core = core
+        self.factory = factory
+        self.size = size
+        self.closer = closer
+        self.items = []
+        self._idle = asyncio.Queue()
+
+    async def start(self):
+        """Create the resources concurrently; returns how many started"""
+        results = await asyncio.gather(*(self.core.call(None, self.factory) for _ in range(self.size)),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Could not start a crawl context: {result}")
+            else:
+                self.items.append(result)
+                self._idle.put_nowait(result)
+        if not self.items:
+            raise RuntimeError("No crawl context could be started")
+        return len(self.items)
+
+    @asynccontextmanager
+    async def acquire(self):
+        item = await self._idle.get()
+        try:
+            yield item
+        finally:
+            self._idle.put_nowait(item)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        # Shut down even after stop(), so no Chrome outlives the crawl
+        await asyncio.gather(*(loop.run_in_executor(None, self.closer, item) for item in self.items),
+                             return_exceptions=True)
+        self.items = []
+
+
+# ROC states ----------------------------------------------------------------
+
+async def crawl_state_http(core, crawler, state_name, companies, max_pages=None):
+    """One state over the HTTP engine into companies, pages fetched concurrently within the host limit"""
+    host = urlparse(crawler.resource_url).hostname
+    resumed, pages_done = crawler.resume_state(state_name)
+    companies.extend(resumed)
+    if pages_done and (crawler.journal.is_complete(state_name) or (max_pages and pages_done >= max_pages)):
+        return companies
+
+    with crawler.metrics.span('state', state=state_name):
+        # Continue at the first row the journal does not have, whatever page size wrote it
+        offset_of = crawler.page_offsets(pages_done, crawler.resume_row(state_name, pages_done))
+        total, first_page = await core.call(host, crawler.fetch_page, state_name, pages_done, offset_of(pages_done))
+        crawler.fit_page_size(state_name, total, offset_of(pages_done), first_page)
+        pages = [(pages_done, first_page)]
+        page_count = None
+        if total is not None:
+            page_count = pages_done + 1 + max(0, -(-(total - offset_of(pages_done + 1)) // crawler.page_size))
+        if max_pages:
+            page_count = min(page_count, max_pages) if page_count is not None else max_pages
+        next_page = pages_done + 1
+        ended = False
+        failure = None
+
+        while True:
+            # Pages are recorded in order so the journal holds a contiguous prefix
+            for page, page_companies in pages:
+                ended = await core.call(None, crawler.record_http_page, state_name, companies, page + 1, total,
+                                        offset_of(page), page_companies)
+                if ended is not False:
+                    break
+            if failure is not None and ended is False:
+                raise failure
+            # Only max_pages ends the loop before the last row
+            if ended is not False or (page_count is not None and next_page >= page_count):
+                break
+
+            # One window per host limit, so an early stop wastes at most one window
+            window_end = next_page + core.host_limit(host)
+            if page_count is not None:
+                window_end = min(window_end, page_count)
+            window = list(range(next_page, window_end))
+            results = await asyncio.gather(*(core.call(host, crawler.fetch_page, state_name, page, offset_of(page))
+                                             for page in window), return_exceptions=True)
+            # The pages before a failed one are still recorded, then the failure ends the state
+            pages = []
+            for page, result in zip(window, results):
+                if isinstance(result, BaseException):
+                    failure = result
+                    break
+                pages.append((page, result[1]))
+            next_page = window_end
+
+        if ended:
+            crawler.complete_state(state_name)
+        elif ended is None:
+            crawler.interrupt_state(state_name, f"the API served fewer than its {total} rows")
+
+    logger.info(f"Total companies fetched for {state_name}: {len(companies)}")
+    return companies
+
+
+async def crawl_state_browser(core, contexts, state_name, companies, max_pages=None):
+    """One state in a pooled browser context into companies, with page turns awaited on the loop"""
+    async with contexts.acquire() as crawler:
+        host = urlparse(crawler.base_url).hostname
+        resumed, page_count = crawler.resume_state(state_name)
+        companies.extend(resumed)
+        if page_count and (crawler.journal.is_complete(state_name) or (max_pages and page_count >= max_pages)):
+            return companies
+
+        with crawler.metrics.span('state', state=state_name):
+            if not await core.call(host, crawler.open_state, state_name):
+                return companies
+            # The page loop's steps are the crawler's own; only the page turn is awaited here
+            progress = await core.call(host, crawler.start_state_pages, state_name, companies, page_count, max_pages)
+
+            while await core.call(None, crawler.read_page, state_name, progress):
+                async with crawler.rate_limiter.request_async(crawler.base_url, crawler.metrics) as ticket:
+                    with crawler.metrics.span('paginate', state=state_name, page=progress['page'] + 1) as span:
+                        try:
+                            previous = await core.call(host, crawler.click_next_page)
+                            changed = previous is not None and bool(await core.wait_until(
+                                'page_changed', crawler.waiter.table_state,
+                                lambda table: page_changed(previous, table),
+                                timeout=crawler.waiter.timeouts.get('page_changed', 20)))
+                        except Exception as e:
+                            logger.warning(f"Failed to turn to page {progress['page'] + 1} of {state_name}: {e}")
+                            previous, changed = {}, False
+                        # A missing Next button is the last page, a table that never redraws is the site
+                        turned = False if previous is None else (True if changed else None)
+                        span['ok'] = ticket['ok'] = turned is not None
+                if not crawler.end_page_turn(state_name, progress, turned):
+                    break
+
+    logger.info(f"Total companies fetched for {state_name}: {len(companies)}")
+    return companies
+
+
+async def save_state_after(crawler, state_name, crawl):
+    """Await crawl(companies), then write the state's CSV / close its sink file like process_state
+
+    The crawl fills companies as pages are recorded, so a state that fails
+    partway still saves every row that reached the journal and the sink.
+    """
+    companies = []
+    try:
+        await crawl(companies)
+        return companies
+    except Exception as e:
+        # Like the serial crawl: the state stays open in the journal and keeps the rows it got
+        logger.error(f"Error fetching companies for {state_name}: {e}")
+        return companies
+    finally:
+        # Runs after a cancellation too, so no awaitable that checks stop()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, crawler.save_state, state_name, companies)
+        if crawler.sink:
+            crawler.sink.finish_state(state_name)
+
+
+async def crawl_states(core, crawler, states, max_pages=None, contexts=0):
+    """Crawl states concurrently; contexts > 0 uses that many browser contexts, 0 the HTTP engine"""
+    crawler.metrics = core.metrics
+    if not contexts:
+        crawler.max_concurrency = max(crawler.max_concurrency, core.host_limit(urlparse(crawler.resource_url).hostname))
+        await core.call(None, crawler.setup_driver)
+        try:
+            results = await core.run(
+                save_state_after(crawler, state, partial(crawl_state_http, core, crawler, state, max_pages=max_pages))
+                for state in states
+            )
+        finally:
+            crawler.close_driver()
+        return dict(zip(states, [result or [] for result in results]))
+
+    def start_context():
+        worker = crawler.spawn_worker()
+        worker.setup_driver()
+        return worker
+
+    pool = AsyncResourcePool(core, start_context, min(contexts, len(states)), lambda worker: worker.close_driver())
+    await pool.start()
+    try:
+        results = await core.run(
+            save_state_after(crawler, state, partial(crawl_state_browser, core, pool, state, max_pages=max_pages))
+            for state in states
+        )
+    finally:
+        await pool.close()
+    return dict(zip(states, [result or [] for result in results]))
+
+
+# Company enrichment (sel.py) -------------------------------------------------
+
+async def fetch_company_profile(core, drivers, title):
+    """Infobox fields and board members for one Wikipedia title"""
+    import sel  # Selenium helpers; imported lazily so the ROC paths do not need them
+
+    async with drivers.acquire() as driver:
+        with core.metrics.span('wikipedia_load', company=title) as span:
+            infobox = await core.call('en.wikipedia.org', sel.get_wikipedia_infobox_selenium, title, driver)
+            span['ok'] = infobox is not None
+        if not infobox:
+            return {"company": title, "error": "Infobox not found"}
+
+        with core.metrics.span('infobox_extract', company=title):
+            index = await core.call(None, sel.extract_infobox_index_selenium, infobox)
+        with core.metrics.span('board_members', company=title):
+            board_members = await core.call(None, sel.extract_board_members_selenium, driver)
+
+    profile = {"company": title, **sel.infobox_profile(index), "board_members_wikipedia": board_members}
+    core.metrics.add_rows(sum(len(value) for value in profile.values() if isinstance(value, list)), company=title)
+    return profile
+
+
+async def fetch_leadership(core, drivers):
+    """The TCS leadership page"""
+    import sel
+
+    async with drivers.acquire() as driver:
+        with core.metrics.span('tcs_leadership') as span:
+            leaders = await core.call('www.tcs.com', sel.scrape_tcs_leadership_selenium, driver)
+            span['ok'] = bool(leaders)
+    return leaders
+
+
+async def crawl_companies(core, titles, drivers=2, headless=True, leadership=True):
+    """Profiles for several titles (plus the TCS leadership page) over a pool of drivers"""
+    import sel
+
+    pool = AsyncResourcePool(core, partial(sel.setup_driver, headless, ['wikipedia', 'tcs'], False),
+                             min(drivers, len(titles) + leadership), lambda driver: driver.quit())
+    await pool.start()
+    try:
+        coroutines = [fetch_company_profile(core, pool, title) for title in titles]
+        if leadership:
+            coroutines.append(fetch_leadership(core, pool))
+        results = await core.run(coroutines)
+    finally:
+        await pool.close()
+
+    profiles = dict(zip(titles, results))
+    if leadership:
+        profiles["board_members_tcs_official"] = results[-1] or []
+    return profiles
+
+
+async def run_with_signals(core, coroutine):
+    """Run coroutine with Ctrl+C/SIGTERM mapped to a cooperative stop"""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, core.stop)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C raises KeyboardInterrupt instead
+    try:
+        return await coroutine
+    finally:
+        core.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ROC and company crawls as coroutines on one event loop")
+    parser.add_argument("--max-in-flight", type=int, default=32, help="blocking fetches running at once")
+    parser.add_argument("--host-limit", action="append", default=[], metavar="HOST=N",
+                        help="concurrent requests allowed per host (repeatable)")
+    parser.add_argument("--metrics", help="write per-phase timings to METRICS.json and METRICS.prom")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    states_parser = commands.add_parser("states", help="crawl ROC states")
+    states_parser.add_argument("--states", nargs="+", help="states to fetch (default: all)")
+    states_parser.add_argument("--max-pages", type=int)
+    states_parser.add_argument("--browser", action="store_true", help="drive Chrome instead of the HTTP engine")
+    states_parser.add_argument("--contexts", type=int, default=4, help="browser contexts with --browser")
+    states_parser.add_argument("--fixture", action="store_true", help="serve recorded fixtures locally (HTTP engine)")
+    states_parser.add_argument("--latency", type=float, default=0.0, help="fixture server latency per request")
+    states_parser.add_argument("--page-size", type=int, default=1000)
+    states_parser.add_argument("--journal", help="directory of a resumable crawl journal")
+    states_parser.add_argument("--dedup", action="store_true", help="drop rows whose CIN was already fetched")
+    states_parser.add_argument("--page-cache", help="directory keeping page snapshots for offline re-parsing (--browser)")
+
+    companies_parser = commands.add_parser("companies", help="crawl Wikipedia profiles")
+    companies_parser.add_argument("titles", nargs="+")
+    companies_parser.add_argument("--drivers", type=int, default=2)
+    companies_parser.add_argument("--show", action="store_true", help="run Chrome with a window")
+    companies_parser.add_argument("--no-leadership", action="store_true", help="skip the TCS leadership page")
+    args = parser.parse_args()
+
+    host_limits = {}
+    for entry in args.host_limit:
+        host, _, limit = entry.partition('=')
+        host_limits[host] = int(limit)
+
+    async def run():
+        core = AsyncCrawlCore(host_limits=host_limits, max_in_flight=args.max_in_flight)
+        start = time.perf_counter()
+        if args.command == "companies":
+            result = await run_with_signals(core, crawl_companies(
+                core, args.titles, args.drivers, not args.show, not args.no_leadership))
+            print(json.dumps(result, indent=2))
+        else:
+            result = await run_states(core, args)
+            rows = sum(len(companies) for companies in result.values())
+            elapsed = time.perf_counter() - start
+            print(f"Fetched {rows} companies across {len(result)} states in {elapsed:.3f}s "
+                  f"({rows / elapsed if elapsed else 0:.0f} rows/sec)")
+        print(core.metrics.report())
+        print(f"Request rates: {json.dumps(get_shared_limiter().summary())}")
+        if args.metrics:
+            core.metrics.export(f"{args.metrics}.json", f"{args.metrics}.prom")
+
+    async def run_states(core, args):
+        from crawl_journal import CrawlJournal
+        from MasterDataCrawler import ROCCompanyCrawler
+        from roc_http_engine import ROCHttpCrawler
+
+        journal = CrawlJournal(args.journal) if args.journal else None
+        server = None
+        if args.browser:
+            from page_cache import PageCache
+            crawler = ROCCompanyCrawler(headless=True, journal=journal)
+            crawler.page_cache = PageCache(args.page_cache) if args.page_cache else None
+        else:
+            resource_url = None
+            if args.fixture:
+                from fixture_server import FixtureServer
+                server = FixtureServer(latency=args.latency).start()
+                resource_url = server.resource_url
+            crawler = ROCHttpCrawler(resource_url=resource_url, page_size=args.page_size, journal=journal)
+        if args.dedup:
+            from cin_dedup import CinDeduplicator
+            crawler.dedup = CinDeduplicator()
+        try:
+            states = args.states or crawler.states
+            return await run_with_signals(core, crawl_states(
+                core, crawler, states, args.max_pages, args.contexts if args.browser else 0))
+        finally:
+            if crawler.dedup:
+                print(f"Dropped {crawler.dedup.duplicates} duplicate companies")
+            if server:
+                server.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark serial vs parallel state crawling in ROCCompanyCrawler
+
+By default the browser is simulated: driver startup and each state fetch are
+replaced by fixed latencies so the scheduling overhead and scaling of the
+worker pool can be measured offline. Pass --live to run real Chrome workers
+against data.gov.in instead.
+
+    python bench_parallel_states.py --states 12 --workers 1 2 4 8
+    python bench_parallel_states.py --live --states 4 --workers 1 2 --max-pages 1
+"""
+import argparse
+import time
+
+from MasterDataCrawler import ROCCompanyCrawler
+
+
+class SimulatedCrawler(ROCCompanyCrawler):
+    """Crawler whose WebDriver and per-state fetch are replaced by sleeps"""
+
+    def __init__(self, headless=True, startup_latency=1.0, state_latency=2.0, rows_per_state=50):
+        super().__init__(headless=headless)
+        self.startup_latency = startup_latency
+        self.state_latency = state_latency
+        self.rows_per_state = rows_per_state
+        self.state_delay = 0
+
+    def setup_driver(self):
+        time.sleep(self.startup_latency)
+
+    def close_driver(self):
+        pass
+
+    def fetch_companies_by_state(self, state_name, max_pages=None):
+        time.sleep(self.state_latency)
+        return [{'cin': f"SIM{i:06d}", 'state': state_name} for i in range(self.rows_per_state)]
+
+    def save_to_csv(self, companies, filename):
+        pass
+
+    def spawn_worker(self):
+        return SimulatedCrawler(
+            headless=self.headless,
+            startup_latency=self.startup_latency,
+            state_latency=self.state_latency,
+            rows_per_state=self.rows_per_state
+        )
+
+
+def run_once(crawler, states, workers, max_pages):
+    """Run one crawl and return (elapsed seconds, total rows)"""
+    start = time.perf_counter()
+    all_data = crawler.fetch_all_states_data(
+        selected_states=states,
+        max_pages_per_state=max_pages,
+        workers=workers
+    )
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(len(companies) for companies in all_data.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=int, default=12, help="number of states to crawl")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-pages", type=int, default=1)
+    parser.add_argument("--live", action="store_true", help="use real Chrome against data.gov.in")
+    parser.add_argument("--startup-latency", type=float, default=1.0)
+    parser.add_argument("--state-latency", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.live:
+        crawler = ROCCompanyCrawler(headless=True)
+    else:
+        crawler = SimulatedCrawler(
+            startup_latency=args.startup_latency,
+            state_latency=args.state_latency
+        )
+    states = crawler.states[:args.states]
+
+    print(f"{'workers':>8} {'seconds':>10} {'rows':>8} {'speedup':>8}")
+    baseline = None
+    for workers in args.workers:
+        elapsed, rows = run_once(crawler, states, workers, args.max_pages)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.2f} {rows:>8} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
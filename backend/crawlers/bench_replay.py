@@ -0,0 +1,192 @@
+"""Replay benchmark for the Selenium crawlers against the local fixture server
+
+Runs ROCCompanyCrawler and sel.crawl_company_selenium in a real (headless)
+Chrome against fixture_server's stand-ins for the data.gov.in ROC page, a
+Wikipedia article and the TCS leadership page, so throughput can be measured
+without touching the live sites. The same titles are also fetched by the
+browserless wikipedia_http client for comparison. Page sizes of the ROC table, row counts and
+the latency of page loads and table draws are configurable. Each crawl
+reports rows/sec and its per-phase timings; a saved baseline turns the run
+into a regression check (exit status 1 when rows/sec drops by more than the
+tolerance):
+
+    python bench_replay.py --states 4 --rows-per-state 2000 --page-sizes 10 100 1000
+    python bench_replay.py --latency 0.2 --page-latency 0.5 --workers 2
+    python bench_replay.py --save-baseline replay_baseline.json
+    python bench_replay.py --baseline replay_baseline.json --tolerance 0.2
+"""
+import argparse
+import json
+import sys
+import time
+
+import sel
+from MasterDataCrawler import ROCCompanyCrawler
+from crawl_metrics import CrawlMetrics
+from fixture_pages import DEFAULT_PAGE_SIZES
+from fixture_server import FixtureServer, load_fixture_records, synthetic_records
+from wikipedia_http import WikipediaHttpClient
+
+
+class ReplayCrawler(ROCCompanyCrawler):
+    """ROCCompanyCrawler that keeps its results in memory instead of writing CSVs"""
+
+    def save_to_csv(self, companies, filename):
+        pass
+
+    def spawn_worker(self):
+        worker = ReplayCrawler(headless=self.headless)
+        self.share_settings(worker)
+        return worker
+
+
+def phase_summary(metrics):
+    """Count, total and mean seconds per phase"""
+    return {
+        phase: {'count': stats['count'], 'total_seconds': stats['total_seconds'], 'mean_seconds': stats['mean_seconds']}
+        for phase, stats in metrics.to_dict()['phases'].items()
+    }
+
+
+def run_roc(server, states, workers=1, max_pages=None, headless=True):
+    """Crawl states from the fixture ROC page; returns the run summary"""
+    crawler = ReplayCrawler(headless=headless)
+    crawler.base_url = server.roc_url
+    start = time.perf_counter()
+    all_data = crawler.fetch_all_states_data(selected_states=states, max_pages_per_state=max_pages,
+                                             workers=workers)
+    elapsed = time.perf_counter() - start
+
+    rows = sum(len(companies) for companies in all_data.values())
+    expected = sum(len(server.state_rows().get(state, [])) for state in states)
+    return {
+        'rows': rows,
+        'expected_rows': expected if not max_pages else None,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 2) if elapsed else None,
+        'page_loads': crawler.page_loads,
+        'phases': phase_summary(crawler.metrics),
+        'report': crawler.metrics.report()
+    }
+
+
+def run_companies(server, titles, headless=True):
+    """Crawl company profiles from the fixture Wikipedia and leadership pages"""
+    sel.WIKIPEDIA_BASE_URL = server.wikipedia_url
+    sel.TCS_LEADERSHIP_URL = server.leadership_url
+    metrics = CrawlMetrics()
+    start = time.perf_counter()
+    results = [sel.crawl_company_selenium(title, metrics, headless=headless) for title in titles]
+    elapsed = time.perf_counter() - start
+
+    rows = metrics.to_dict()['rows_total']
+    return {
+        'rows': rows,
+        'errors': sum(1 for result in results if 'error' in result),
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 2) if elapsed else None,
+        'phases': phase_summary(metrics),
+        'report': metrics.report()
+    }
+
+
+def run_companies_http(server, titles, repeat=20):
+    """Fetch the same profiles browserless from the fixture parse API"""
+    client = WikipediaHttpClient(server.wikipedia_url, server.wikipedia_api_url)
+    start = time.perf_counter()
+    results = list(client.company_profiles(titles * repeat))
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    rows = client.metrics.to_dict()['rows_total']
+    return {
+        'rows': rows,
+        'errors': sum(1 for result in results if 'error' in result),
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 2) if elapsed else None,
+        'phases': phase_summary(client.metrics),
+        'report': client.metrics.report()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for crawls whose rows/sec fell more than tolerance below the baseline"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get('rows_per_second') or result.get('rows_per_second') is None:
+            continue
+        ratio = result['rows_per_second'] / reference['rows_per_second']
+        print(f"{name}: {result['rows_per_second']:.1f} rows/s vs baseline "
+              f"{reference['rows_per_second']:.1f} ({ratio - 1:+.1%})")
+        if ratio < 1 - tolerance:
+            regressions.append(f"{name} throughput fell {1 - ratio:.1%}")
+
+        # Slower phases point at where a regression came from
+        for phase, stats in result['phases'].items():
+            before = reference.get('phases', {}).get(phase)
+            if before and before['mean_seconds'] and stats['mean_seconds'] > before['mean_seconds'] * (1 + tolerance):
+                print(f"  {phase}: mean {before['mean_seconds']:.3f}s -> {stats['mean_seconds']:.3f}s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=int, default=2, help="number of states to crawl")
+    parser.add_argument("--rows-per-state", type=int, default=500, help="synthetic rows per state (0: recorded rows)")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=list(DEFAULT_PAGE_SIZES),
+                        help="length menu of the ROC table")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per table draw")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="seconds per page load")
+    parser.add_argument("--render-delay", type=float, default=0.5, help="seconds before the leadership page renders")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--max-pages", type=int)
+    parser.add_argument("--companies", nargs="*", default=["Tata Consultancy Services"],
+                        help="Wikipedia titles to crawl (none to skip)")
+    parser.add_argument("--show", action="store_true", help="run Chrome with a window")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline")
+    parser.add_argument("--baseline", help="compare against a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed rows/sec drop against the baseline")
+    args = parser.parse_args()
+
+    records = load_fixture_records()
+    if args.rows_per_state:
+        records = synthetic_records(records, args.rows_per_state)
+
+    results = {}
+    with FixtureServer(records=records, latency=args.latency, page_latency=args.page_latency,
+                       page_sizes=args.page_sizes, render_delay=args.render_delay) as server:
+        states = sorted(server.state_rows())[:args.states]
+        print(f"Replaying {len(states)} states, page sizes {args.page_sizes}, "
+              f"latency {args.latency}s per draw / {args.page_latency}s per page at {server.url}")
+        if states:
+            results['roc'] = run_roc(server, states, args.workers, args.max_pages, not args.show)
+        if args.companies:
+            results['companies'] = run_companies(server, args.companies, not args.show)
+            results['companies_http'] = run_companies_http(server, args.companies)
+        requests = server.request_count
+
+    for name, result in results.items():
+        print(f"\n=== {name} ===")
+        print(result.pop('report'))
+        expected = result.get('expected_rows')
+        if expected is not None and result['rows'] != expected:
+            print(f"Incomplete: {result['rows']} of {expected} rows")
+    print(f"\nFixture server handled {requests} requests")
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regression: " + "; ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark compute_statistics against the per-state value_counts loop
+
+Synthetic companies are generated directly as a typed frame (37 states,
+realistic category cardinalities, log-normal capitals). The legacy column
+times what main() used to do, one filtered frame and five value_counts per
+state, extended with the same capital summaries so both produce the same
+output (and without even counting the cost of building each frame from dicts).
+
+    python bench_statistics.py --rows 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from MasterDataCrawler import ROCCompanyCrawler
+from company_schema import CAPITAL_FIELDS
+from company_statistics import COUNT_DIMENSIONS, QUANTILES, compute_statistics
+
+STATUSES = ['Active', 'Strike Off', 'Under process of striking off', 'Amalgamated',
+            'Inactive for e-filing', 'Converted to LLP', 'Dormant', 'Under liquidation']
+CATEGORIES = ['Company limited by shares', 'Company limited by guarantee', 'Unlimited company']
+CLASSES = ['Private', 'Public', 'One Person Company']
+ROCS = [f"ROC {name}" for name in ['Delhi', 'Mumbai', 'Chennai', 'Kolkata', 'Bangalore', 'Hyderabad',
+                                     'Ahmedabad', 'Pune', 'Kanpur', 'Jaipur', 'Patna', 'Shillong',
+                                     'Ernakulam', 'Cuttack', 'Gwalior', 'Chandigarh', 'Goa', 'Jammu']]
+ACTIVITIES = [f"Activity {i}" for i in range(60)]
+
+
+def _categorical(rng, values, rows, skew=1.2):
+    """Zipf-like categorical column"""
+    weights = 1 / np.arange(1, len(values) + 1) ** skew
+    codes = rng.choice(len(values), size=rows, p=weights / weights.sum())
+    return pd.Categorical.from_codes(codes, values)
+
+
+def synthetic_frame(rows, seed=0):
+    """Typed frame shaped like build_frame output"""
+    rng = np.random.default_rng(seed)
+    authorized = (rng.lognormal(mean=13.5, sigma=2.0, size=rows) * 100).astype('int64')
+    paid_up = (authorized * rng.uniform(0.1, 1.0, size=rows)).astype('int64')
+    missing = rng.random(rows) < 0.02
+    return pd.DataFrame({
+        'state': _categorical(rng, ROCCompanyCrawler.STATES, rows, skew=0.6),
+        'company_status': _categorical(rng, STATUSES, rows),
+        'company_category': _categorical(rng, CATEGORIES, rows, skew=3),
+        'roc': _categorical(rng, ROCS, rows, skew=0.8),
+        'class_of_company': _categorical(rng, CLASSES, rows, skew=2),
+        'activity_description': _categorical(rng, ACTIVITIES, rows, skew=0.9),
+        'authorized_capital': pd.Series(authorized, dtype='Int64').mask(missing),
+        'paid_up_capital': pd.array(paid_up, dtype='Int64'),
+        'date_of_incorporation': pd.to_datetime('1950-01-01') +
+        pd.to_timedelta(rng.integers(0, 27000, size=rows), unit='D')
+    })
+
+
+def legacy_statistics(frame):
+    """The old main(): a frame and five value_counts per state, plus capital summaries"""
+    results = {}
+    for state in frame['state'].cat.categories:
+        df = frame[frame['state'] == state]
+        if df.empty:
+            continue
+        results[state] = {
+            'total_companies': len(df),
+            **{key: df[column].value_counts().to_dict() for key, column in COUNT_DIMENSIONS.items()},
+            'capital': {}
+        }
+        for column in CAPITAL_FIELDS:
+            rupees = df[column].dropna().astype('float64') / 100
+            quantiles = rupees.quantile(list(QUANTILES.values())).tolist() if len(rupees) else [None] * len(QUANTILES)
+            results[state]['capital'][column] = {
+                'sum': rupees.sum(), 'reported': len(rupees), 'mean': rupees.mean() if len(rupees) else None,
+                **dict(zip(QUANTILES, quantiles))
+            }
+    return results
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'engine s':>10} {'legacy s':>10} {'speedup':>8}")
+    for rows in args.rows:
+        frame = synthetic_frame(rows)
+        engine_seconds, stats = timed(compute_statistics, frame)
+        assert stats['national']['total_companies'] == rows
+        if args.skip_legacy:
+            print(f"{rows:>12,} {engine_seconds:>10.2f} {'-':>10} {'-':>8}")
+            continue
+        legacy_seconds, _ = timed(legacy_statistics, frame)
+        print(f"{rows:>12,} {engine_seconds:>10.2f} {legacy_seconds:>10.2f} {legacy_seconds / engine_seconds:>7.1f}x")
+        del frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""Lean Chrome profiles for the Selenium crawlers
+
+The crawlers only read text from the DOM, so images, fonts, media, ads and
+analytics are wasted latency and bandwidth. A profile per crawl target
+decides what is kept:
+
+    hosts         allow-list; every other host fails DNS resolution inside
+                  Chrome (--host-resolver-rules), which drops third-party
+                  ads, trackers and embeds without listing them
+    allow_types   resource types kept for the target; the rest are blocked
+                  by URL pattern through the DevTools protocol
+                  (Network.setBlockedURLs), switchable per navigation;
+                  images are also disabled in Blink for every profile
+
+Stylesheets are kept everywhere: extraction relies on rendered visibility.
+NetworkReport reads Chrome's performance log to count the requests and bytes
+that were loaded and the requests that were blocked. To measure what a
+profile saves against a stock browser:
+
+    python browser_profile.py roc
+    python browser_profile.py wikipedia --url https://en.wikipedia.org/wiki/Infosys
+"""
+import argparse
+import json
+import logging
+import time
+from urllib.parse import urlparse
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+# URL patterns per resource type (Network.setBlockedURLs wildcards)
+RESOURCE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.avif*', '*.bmp*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.m4a*', '*.wav*'],
+    'script': ['*.js', '*.js?*'],
+    'stylesheet': ['*.css', '*.css?*']
+}
+
+# Third-party beacons that can be served from an allowed host or a CDN path
+TRACKER_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*/collect?*', '*/beacon/*'
+]
+
+# Hosts every profile can reach (the offline fixture server)
+LOCAL_HOSTS = ['localhost', '127.0.0.1']
+
+TARGET_PROFILES = {
+    # The ROC table is rendered by DataTables, so scripts have to run
+    'roc': {
+        'hosts': ['data.gov.in', '*.data.gov.in', '*.nic.in', 'code.jquery.com', 'cdn.jsdelivr.net',
+                  'cdnjs.cloudflare.com', 'ajax.googleapis.com'],
+        'allow_types': ['script', 'stylesheet']
+    },
+    # Infoboxes and sections are server-rendered HTML
+    'wikipedia': {
+        'hosts': ['en.wikipedia.org'],
+        'allow_types': ['stylesheet']
+    },
+    # The leadership page is assembled client-side
+    'tcs': {
+        'hosts': ['www.tcs.com', '*.tcs.com'],
+        'allow_types': ['script', 'stylesheet']
+    }
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _profile(target):
+    if target not in TARGET_PROFILES:
+        raise ValueError(f"Unknown browser profile: {target}")
+    return TARGET_PROFILES[target]
+
+
+def blocked_patterns(target):
+    """URL patterns blocked while crawling target"""
+    allowed = _profile(target)['allow_types']
+    patterns = list(TRACKER_PATTERNS)
+    for resource_type, type_patterns in RESOURCE_PATTERNS.items():
+        if resource_type not in allowed:
+            patterns.extend(type_patterns)
+    return patterns
+
+
+def host_resolver_rules(targets):
+    """--host-resolver-rules value that only resolves the targets' hosts"""
+    hosts = list(LOCAL_HOSTS)
+    for target in targets:
+        hosts.extend(host for host in _profile(target)['hosts'] if host not in hosts)
+    return 'MAP * ~NOTFOUND, ' + ', '.join(f"EXCLUDE {host}" for host in hosts)
+
+
+def apply_lean_options(chrome_options, targets, network_log=True):
+    """Restrict a launch to the targets' hosts; network_log enables the accounting NetworkReport reads
+
+    Chrome keeps the performance log until it is read, so a driver nobody
+    collects a NetworkReport from should be launched without it.
+    """
+    chrome_options.add_argument(f"--host-resolver-rules={host_resolver_rules(targets)}")
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    if network_log:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return chrome_options
+
+
+def use_target(driver, target):
+    """Switch the blocked URL patterns to target's profile before navigating there"""
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_patterns(target)})
+        return True
+    except Exception as e:
+        logger.warning(f"Could not apply the {target} network profile: {e}")
+        return False
+
+
+class NetworkReport:
+    """Request and byte counts from Chrome's performance log"""
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = 0
+        self.blocked_by_type = {}
+        self.blocked_hosts = {}
+        self._pending = {}
+
+    def collect(self, driver):
+        """Drain the performance log into the counters"""
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.debug(f"Performance log unavailable: {e}")
+            return self
+
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+
+            if method == 'Network.requestWillBeSent':
+                self._pending[params['requestId']] = (params['request']['url'], params.get('type', 'Other'))
+            elif method == 'Network.loadingFinished':
+                if self._pending.pop(params['requestId'], None):
+                    self.requests += 1
+                    self.bytes += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed':
+                url, resource_type = self._pending.pop(params['requestId'], ('', params.get('type', 'Other')))
+                # setBlockedURLs reports "inspector"; unresolved hosts fail DNS
+                if params.get('blockedReason') or 'ERR_NAME_NOT_RESOLVED' in params.get('errorText', ''):
+                    self.blocked += 1
+                    self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+                    host = urlparse(url).hostname or ''
+                    self.blocked_hosts[host] = self.blocked_hosts.get(host, 0) + 1
+        return self
+
+    def summary(self):
+        top_hosts = sorted(self.blocked_hosts.items(), key=lambda item: -item[1])[:10]
+        return {
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'blocked_requests': self.blocked,
+            'blocked_by_type': self.blocked_by_type,
+            'top_blocked_hosts': dict(top_hosts)
+        }
+
+
+DEFAULT_URLS = {
+    'roc': 'https://www.data.gov.in/resource/registrars-companies-roc-wise-company-master-data',
+    'wikipedia': 'https://en.wikipedia.org/wiki/Tata_Consultancy_Services',
+    'tcs': 'https://www.tcs.com/who-we-are/leadership'
+}
+
+
+def measure_load(url, target=None, headless=True):
+    """Load url once in a stock (target=None) or lean browser; returns (seconds, NetworkReport)"""
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    if target:
+        apply_lean_options(chrome_options, [target])
+    else:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        if target:
+            use_target(driver, target)
+        start = time.perf_counter()
+        driver.get(url)
+        seconds = time.perf_counter() - start
+        return seconds, NetworkReport().collect(driver)
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a lean browser profile with a stock Chrome load")
+    parser.add_argument("target", choices=sorted(TARGET_PROFILES))
+    parser.add_argument("--url", help="page to load (defaults to the target's crawl page)")
+    parser.add_argument("--show", action="store_true", help="run Chrome with a window")
+    args = parser.parse_args()
+
+    url = args.url or DEFAULT_URLS[args.target]
+    stock_seconds, stock = measure_load(url, None, not args.show)
+    lean_seconds, lean = measure_load(url, args.target, not args.show)
+
+    print(f"{'':>8} {'load s':>8} {'requests':>9} {'bytes':>12} {'blocked':>8}")
+    print(f"{'stock':>8} {stock_seconds:>8.2f} {stock.requests:>9} {stock.bytes:>12,} {stock.blocked:>8}")
+    print(f"{'lean':>8} {lean_seconds:>8.2f} {lean.requests:>9} {lean.bytes:>12,} {lean.blocked:>8}")
+    print(f"Saved {stock.requests - lean.requests} requests and {stock.bytes - lean.bytes:,} bytes")
+    print(json.dumps(lean.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
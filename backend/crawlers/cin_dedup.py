@@ -0,0 +1,160 @@
+"""Crawl-time CIN deduplication across states and pages
+
+A company can be listed under more than one state filter, and a site that
+re-sorts between page loads repeats rows across page boundaries. CinDeduplicator
+remembers every CIN kept in the run (with the state it was first kept under)
+and drops later rows with the same CIN before they are journaled, written
+to a sink, kept in all_data or imported.
+
+The set is exact. For very large runs it can spill to SQLite: once more than
+memory_limit CINs are held in memory they are moved to the spill database, and
+each page's remaining candidates are looked up there in one batched query.
+
+The run's duplicates are summarized in report(): counts per state, per
+(first state -> state) pair, and a sample of dropped rows.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+# SQLite's default limit on host parameters in one statement
+LOOKUP_BATCH = 900
+
+
+class CinDeduplicator:
+    """Exact set of CINs kept in a run, optionally spilling to SQLite past memory_limit"""
+
+    def __init__(self, spill_path=None, memory_limit=1000000, sample_size=100):
+        self.spill_path = spill_path
+        self.memory_limit = memory_limit
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._memory = {}
+        self._spilled = 0
+        self._db = None
+        self.kept = 0
+        self.duplicates = 0
+        self.by_state = {}
+        self.pairs = {}
+        self.samples = []
+
+    def _connect(self):
+        if self._db is None:
+            # A spill file from an earlier run would make its CINs look like duplicates
+            if os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+            self._db = sqlite3.connect(self.spill_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=OFF")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute("CREATE TABLE seen (cin TEXT PRIMARY KEY, state TEXT) WITHOUT ROWID")
+        return self._db
+
+    def _spill(self):
+        """Move the in-memory CINs to the spill database"""
+        db = self._connect()
+        db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", self._memory.items())
+        db.commit()
+        self._spilled += len(self._memory)
+        self._memory = {}
+
+    def _spilled_states(self, cins):
+        """First state of each CIN found in the spill database"""
+        if not self._spilled or not cins:
+            return {}
+        found = {}
+        cins = list(cins)
+        for start in range(0, len(cins), LOOKUP_BATCH):
+            batch = cins[start:start + LOOKUP_BATCH]
+            query = f"SELECT cin, state FROM seen WHERE cin IN ({','.join('?' * len(batch))})"
+            found.update(self._db.execute(query, batch))
+        return found
+
+    def filter_page(self, state, page, companies):
+        """Rows of a page whose CIN was not kept before; rows without a CIN are kept"""
+        with self._lock:
+            state = sys.intern(state)
+            memory = self._memory
+            spilled = self._spilled_states({company.get('cin') for company in companies
+                                            if company.get('cin') and company.get('cin') not in memory})
+
+            unique = []
+            for company in companies:
+                cin = company.get('cin')
+                if not cin:
+                    unique.append(company)
+                    continue
+                first_state = memory.get(cin) or spilled.get(cin)
+                if first_state is None:
+                    memory[cin] = state
+                    unique.append(company)
+                else:
+                    self._record_duplicate(cin, first_state, state, page)
+
+            self.kept += len(unique)
+            if self.spill_path and len(memory) > self.memory_limit:
+                self._spill()
+            return unique
+
+    def remember(self, state, companies):
+        """Register rows that are already stored (e.g. reloaded from a journal) without filtering them"""
+        with self._lock:
+            state = sys.intern(state)
+            for company in companies:
+                cin = company.get('cin')
+                if cin and cin not in self._memory:
+                    self._memory[cin] = state
+                    self.kept += 1
+            if self.spill_path and len(self._memory) > self.memory_limit:
+                self._spill()
+
+    def reset_state(self, state):
+        """Forget the CINs first kept under a state, before it is crawled again from page 1"""
+        with self._lock:
+            forgotten = [cin for cin, first_state in self._memory.items() if first_state == state]
+            for cin in forgotten:
+                del self._memory[cin]
+            self.kept -= len(forgotten)
+            if self._spilled:
+                removed = self._db.execute("DELETE FROM seen WHERE state = ?", (state,)).rowcount
+                self._db.commit()
+                self._spilled -= removed
+                self.kept -= removed
+
+    def _record_duplicate(self, cin, first_state, state, page):
+        self.duplicates += 1
+        self.by_state[state] = self.by_state.get(state, 0) + 1
+        pair = f"{first_state} -> {state}"
+        self.pairs[pair] = self.pairs.get(pair, 0) + 1
+        if len(self.samples) < self.sample_size:
+            self.samples.append({'cin': cin, 'first_state': first_state, 'state': state, 'page': page})
+
+    def report(self):
+        """Kept and dropped counts for the run, with where the duplicates came from"""
+        with self._lock:
+            return {
+                'generated_at': datetime.now().isoformat(),
+                'kept': self.kept,
+                'duplicates': self.duplicates,
+                'spilled': self._spilled,
+                'duplicates_by_state': dict(sorted(self.by_state.items(), key=lambda item: -item[1])),
+                'duplicates_by_pair': dict(sorted(self.pairs.items(), key=lambda item: -item[1])),
+                'samples': list(self.samples)
+            }
+
+    def save_report(self, path):
+        """Write report() as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def close(self):
+        """Drop the spill database"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+                os.remove(self.spill_path)
+            self._memory = {}
+            self._spilled = 0
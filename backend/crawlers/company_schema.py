@@ -0,0 +1,193 @@
+"""Column layout of the ROC company master table shared by the crawler paths"""
+import json
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+
+# Order of the <td> cells in the data.gov.in preview table
+COMPANY_FIELDS = [
+    'cin',
+    'company_name',
+    'roc',
+    'company_category',
+    'company_sub_category',
+    'class_of_company',
+    'authorized_capital',
+    'paid_up_capital',
+    'date_of_incorporation',
+    'registered_office_address',
+    'listing_status',
+    'company_status',
+    'state',
+    'country_of_incorporation',
+    'company_type_code',
+    'activity_description'
+]
+
+# Text columns that hold rupee amounts
+CAPITAL_FIELDS = ['authorized_capital', 'paid_up_capital']
+
+# Rows with fewer cells are headers, "no data" placeholders or child rows
+MIN_COLUMNS = 10
+
+
+def row_to_company(cells, scraped_at=None):
+    """Map a list of cell texts to the company dict schema"""
+    company = {}
+    for index, field in enumerate(COMPANY_FIELDS):
+        company[field] = cells[index].strip() if len(cells) > index else ''
+    company['scraped_at'] = scraped_at or datetime.now().isoformat()
+    return company
+
+
+# Columns with far fewer distinct values than rows (categories, codes, capital
+# amounts, dates); their values are interned so a million rows share the strings
+INTERNED_FIELDS = {
+    'roc',
+    'company_category',
+    'company_sub_category',
+    'class_of_company',
+    'authorized_capital',
+    'paid_up_capital',
+    'date_of_incorporation',
+    'listing_status',
+    'company_status',
+    'state',
+    'country_of_incorporation',
+    'company_type_code',
+    'activity_description'
+}
+
+_INTERNED = [field in INTERNED_FIELDS for field in COMPANY_FIELDS]
+_RECORD_FIELDS = COMPANY_FIELDS + ['scraped_at']
+_RECORD_INDEX = {field: index for index, field in enumerate(_RECORD_FIELDS)}
+
+
+class CompanyRecord(Mapping):
+    """Company row in slots instead of a dict; reads like the company dict and to_dict() is lossless"""
+
+    __slots__ = tuple(_RECORD_FIELDS)
+
+    def __init__(self, values, scraped_at):
+        intern = sys.intern
+        for field, value, interned in zip(COMPANY_FIELDS, values, _INTERNED):
+            # Only strings can be interned; nulls from Parquet or old journals are kept as they are
+            setattr(self, field, intern(value) if interned and type(value) is str else value)
+        # Shared by every row of a page rather than one string per row
+        self.scraped_at = scraped_at
+
+    @classmethod
+    def from_cells(cls, cells, scraped_at):
+        """Record from a list of cell texts"""
+        count = len(cells)
+        return cls([cells[index].strip() if count > index else '' for index in range(len(COMPANY_FIELDS))],
+                   scraped_at)
+
+    @classmethod
+    def from_dict(cls, company):
+        """Record from a company dict, e.g. a row loaded back from a journal"""
+        scraped_at = company.get('scraped_at') or ''
+        return cls([company.get(field, '') for field in COMPANY_FIELDS],
+                   sys.intern(scraped_at) if type(scraped_at) is str else scraped_at)
+
+    def __getitem__(self, key):
+        if key not in _RECORD_INDEX:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(_RECORD_FIELDS)
+
+    def __len__(self):
+        return len(_RECORD_FIELDS)
+
+    def __reduce__(self):
+        # Pickled as plain values so an unpickled record is interned again
+        return CompanyRecord, ([getattr(self, field) for field in COMPANY_FIELDS], self.scraped_at)
+
+    def __repr__(self):
+        return f"CompanyRecord({self.to_dict()!r})"
+
+    def to_dict(self):
+        """The company dict schema, in field order"""
+        return {field: getattr(self, field) for field in _RECORD_FIELDS}
+
+
+def row_to_record(cells, scraped_at=None):
+    """Map a list of cell texts to a CompanyRecord"""
+    return CompanyRecord.from_cells(cells, scraped_at or datetime.now().isoformat())
+
+
+def json_default(value):
+    """json.dump default hook that writes CompanyRecords as company dicts"""
+    if isinstance(value, CompanyRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Field names used by the data.gov.in API/CSV export for each company field.
+# The first alias is the canonical API name, the rest are accepted variants.
+API_FIELD_ALIASES = {
+    'cin': ['CIN', 'CORPORATE_IDENTIFICATION_NUMBER'],
+    'company_name': ['CompanyName', 'COMPANY_NAME'],
+    'roc': ['CompanyROCcode', 'REGISTRAR_OF_COMPANIES', 'ROC'],
+    'company_category': ['CompanyCategory', 'COMPANY_CATEGORY'],
+    'company_sub_category': ['CompanySubCategory', 'COMPANY_SUB_CATEGORY'],
+    'class_of_company': ['CompanyClass', 'COMPANY_CLASS', 'CLASS_OF_COMPANY'],
+    'authorized_capital': ['AuthorizedCapital', 'AUTHORIZED_CAP', 'AUTHORISED_CAPITAL'],
+    'paid_up_capital': ['PaidupCapital', 'PAIDUP_CAPITAL', 'PAID_UP_CAPITAL'],
+    'date_of_incorporation': ['CompanyRegistrationdate_date', 'DATE_OF_REGISTRATION', 'DATE_OF_INCORPORATION'],
+    'registered_office_address': ['Registered_Office_Address', 'REGISTERED_OFFICE_ADDRESS'],
+    'listing_status': ['Listingstatus', 'LISTING_STATUS'],
+    'company_status': ['CompanyStatus', 'COMPANY_STATUS'],
+    'state': ['CompanyStateCode', 'REGISTERED_STATE', 'STATE'],
+    'country_of_incorporation': ['CompanyIndian/Foreign Company', 'COUNTRY_OF_INCORPORATION'],
+    'company_type_code': ['nic_code', 'INDUSTRIAL_CLASS', 'COMPANY_TYPE_CODE'],
+    'activity_description': ['CompanyIndustrialClassification', 'PRINCIPAL_BUSINESS_ACTIVITY', 'ACTIVITY_DESCRIPTION']
+}
+
+
+def _normalize_key(key):
+    """Lowercase a column name and drop everything but letters and digits"""
+    return ''.join(ch for ch in key.lower() if ch.isalnum())
+
+
+# Normalized API name (and our own field name) -> company field
+_API_LOOKUP = {}
+for _field, _aliases in API_FIELD_ALIASES.items():
+    _API_LOOKUP[_normalize_key(_field)] = _field
+    for _alias in _aliases:
+        _API_LOOKUP[_normalize_key(_alias)] = _field
+
+
+def record_to_company(record, scraped_at=None):
+    """Map one API record (dict keyed by API column names) to the company dict schema"""
+    company = dict.fromkeys(COMPANY_FIELDS, '')
+    for key, value in record.items():
+        field = _API_LOOKUP.get(_normalize_key(key))
+        if field and value is not None:
+            company[field] = str(value).strip()
+    company['scraped_at'] = scraped_at or datetime.now().isoformat()
+    return company
+
+
+def company_to_record(company):
+    """Map a company dict back to canonical API column names"""
+    return {API_FIELD_ALIASES[field][0]: company.get(field, '') for field in COMPANY_FIELDS}
+
+
+def iter_companies(source):
+    """Companies from a {state: [...]} dict, a list, or a .json/.ndjson file path"""
+    if isinstance(source, dict):
+        for companies in source.values():
+            yield from companies
+    elif isinstance(source, str):
+        with open(source, encoding='utf-8') as f:
+            if source.endswith('.ndjson'):
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from iter_companies(json.load(f))
+    else:
+        yield from source
@@ -0,0 +1,195 @@
+"""Typed columnar snapshot of the company master data
+
+The crawler keeps every value as text ("1000000.00", "N/A", "2009-06-18"),
+so every consumer reparses it. A snapshot stores the same companies as an
+uncompressed Arrow IPC file with real types:
+
+    authorized_capital, paid_up_capital   int64, in paise (null for N/A)
+    date_of_incorporation                 date32
+    scraped_at                            timestamp[us]
+    roc, company_status, class_of_company,
+    state, company_category               dictionary-encoded strings
+    authorized_capital_missing,
+    paid_up_capital_missing               text of a capital with no amount
+                                          ("N/A", ""), so it converts back as is
+
+Companies are written in record batches of batch_size rows, so converting
+a large crawl never holds more than one batch of columns. Reads are
+memory-mapped, so selecting a few columns only pages in those columns.
+pyarrow is required for this module.
+
+    python company_snapshot.py all_companies_data_20250607_220834.json companies.arrow
+"""
+import argparse
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from company_schema import CAPITAL_FIELDS, COMPANY_FIELDS, iter_companies
+
+DATE_FIELDS = ['date_of_incorporation']
+CATEGORICAL_FIELDS = ['roc', 'company_status', 'class_of_company', 'state', 'company_category']
+MISSING_FIELDS = {field: f"{field}_missing" for field in CAPITAL_FIELDS}
+
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        (field,
+         pa.int64() if field in CAPITAL_FIELDS else
+         pa.date32() if field in DATE_FIELDS else
+         pa.dictionary(pa.int32(), pa.string()) if field in CATEGORICAL_FIELDS else
+         pa.string())
+        for field in COMPANY_FIELDS
+    ] + [('scraped_at', pa.timestamp('us'))] +
+    [(MISSING_FIELDS[field], pa.dictionary(pa.int32(), pa.string())) for field in CAPITAL_FIELDS],
+    metadata={b'capital_unit': b'paise'}
+)
+
+_DATE_FORMATS = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y']
+
+
+def parse_capital_paise(text):
+    """'1,000,000.50' -> 100000050; blanks and 'N/A' -> None"""
+    if text is None:
+        return None
+    cleaned = str(text).replace(',', '').strip()
+    if not cleaned or cleaned.upper() in ('N/A', 'NA', '-'):
+        return None
+    try:
+        return int((Decimal(cleaned) * 100).to_integral_value())
+    except InvalidOperation:
+        return None
+
+
+def parse_date(text):
+    """Parse the date formats seen on data.gov.in; None when unparseable"""
+    if not text:
+        return None
+    if isinstance(text, date):
+        return text
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_timestamp(text):
+    try:
+        return datetime.fromisoformat(text) if text else None
+    except ValueError:
+        return None
+
+
+def _dictionary_array(values, dictionary):
+    """Encode values against a dictionary that only grows, so each batch's dictionary extends the previous one"""
+    indices = []
+    for value in values:
+        if value is None:
+            indices.append(None)
+            continue
+        index = dictionary.get(value)
+        if index is None:
+            index = dictionary[value] = len(dictionary)
+        indices.append(index)
+    return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(list(dictionary), pa.string()))
+
+
+def companies_to_batch(companies, dictionaries=None):
+    """Convert company dicts to a typed Arrow record batch; dictionaries carries the encodings between batches"""
+    dictionaries = {} if dictionaries is None else dictionaries
+    columns = {field: [] for field in SNAPSHOT_SCHEMA.names}
+    for company in companies:
+        for field in COMPANY_FIELDS:
+            value = company.get(field, '')
+            if field in CAPITAL_FIELDS:
+                text, value = value, parse_capital_paise(value)
+                # Keep the text of a missing amount, "N/A" and "" convert back differently
+                columns[MISSING_FIELDS[field]].append(text if value is None else None)
+            elif field in DATE_FIELDS:
+                value = parse_date(value)
+            columns[field].append(value)
+        columns['scraped_at'].append(parse_timestamp(company.get('scraped_at')))
+
+    arrays = []
+    for field in SNAPSHOT_SCHEMA:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(_dictionary_array(columns[field.name], dictionaries.setdefault(field.name, {})))
+        else:
+            arrays.append(pa.array(columns[field.name], field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=SNAPSHOT_SCHEMA)
+
+
+def companies_to_table(companies):
+    """Convert company dicts to a typed Arrow table"""
+    return pa.Table.from_batches([companies_to_batch(companies)], schema=SNAPSHOT_SCHEMA)
+
+
+def write_snapshot(source, path, batch_size=65536):
+    """Write companies (see company_schema.iter_companies) to an Arrow IPC snapshot file; returns the row count"""
+    companies = iter(iter_companies(source))
+    dictionaries = {}
+    rows = 0
+    # Batches add to the categorical dictionaries as deltas instead of replacing them
+    options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    with pa.OSFile(path, 'wb') as sink:
+        with ipc.new_file(sink, SNAPSHOT_SCHEMA, options=options) as writer:
+            while True:
+                chunk = list(islice(companies, batch_size))
+                if not chunk:
+                    break
+                writer.write_batch(companies_to_batch(chunk, dictionaries))
+                rows += len(chunk)
+    return rows
+
+
+def read_snapshot(path, columns=None):
+    """Memory-map a snapshot and return an Arrow table with only the requested columns"""
+    source = pa.memory_map(path, 'r')
+    table = ipc.open_file(source).read_all()
+    return table.select(columns) if columns else table
+
+
+def read_snapshot_pandas(path, columns=None):
+    """Snapshot columns as a pandas DataFrame (categoricals for dictionary columns)"""
+    return read_snapshot(path, columns).to_pandas()
+
+
+def table_to_companies(table):
+    """Convert snapshot rows back to the crawler's string-valued company dicts"""
+    companies = []
+    for row in table.to_pylist():
+        company = {}
+        for field in COMPANY_FIELDS:
+            value = row.get(field)
+            if field in CAPITAL_FIELDS:
+                if value is None:
+                    value = row.get(MISSING_FIELDS[field])
+                else:
+                    # Format the magnitude, so -150 paise is -1.50 and not -2.50
+                    sign = '-' if value < 0 else ''
+                    value = f"{sign}{abs(value) // 100}.{abs(value) % 100:02d}"
+            elif field in DATE_FIELDS:
+                value = value.isoformat() if value else ''
+            company[field] = value if value is not None else ''
+        scraped_at = row.get('scraped_at')
+        company['scraped_at'] = scraped_at.isoformat() if scraped_at else ''
+        companies.append(company)
+    return companies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert crawler output to a typed columnar snapshot")
+    parser.add_argument("source", help="all_companies_data_*.json or .ndjson file")
+    parser.add_argument("snapshot", help="Arrow IPC file to write")
+    args = parser.parse_args()
+
+    rows = write_snapshot(args.source, args.snapshot)
+    print(f"Wrote {rows} companies to {args.snapshot}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Vectorized company statistics for all states at once
+
+build_frame turns any crawler output into one typed pandas DataFrame:
+categorical columns, capitals in paise as nullable int64 and dates as
+datetimes. compute_statistics then derives the national rollup and every
+state's breakdown from bincounts and sorts keyed on the categorical state
+codes of that single frame, instead of one DataFrame and five value_counts
+per state.
+"""
+import numpy as np
+import pandas as pd
+
+from company_schema import CAPITAL_FIELDS, iter_companies
+
+# Output key -> column, matching ROCCompanyCrawler.get_company_statistics
+COUNT_DIMENSIONS = {
+    'companies_by_status': 'company_status',
+    'companies_by_category': 'company_category',
+    'companies_by_roc': 'roc',
+    'companies_by_class': 'class_of_company',
+    'top_activities': 'activity_description'
+}
+
+CATEGORY_COLUMNS = ['state'] + list(COUNT_DIMENSIONS.values())
+STAT_COLUMNS = CATEGORY_COLUMNS + CAPITAL_FIELDS + ['date_of_incorporation']
+QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+# Capitals below 2**56 paise (about 7 * 10**14 rupees) pack with a state code into one int64
+PAISE_BITS = 56
+
+
+def build_frame(source):
+    """One typed frame from all_data, a company list, a DataFrame or a .json/.ndjson/.parquet/.arrow file"""
+    if isinstance(source, pd.DataFrame):
+        frame = source
+    elif isinstance(source, str) and source.endswith('.arrow'):
+        from company_snapshot import read_snapshot_pandas
+        frame = read_snapshot_pandas(source, columns=STAT_COLUMNS)
+    elif isinstance(source, str) and source.endswith('.parquet'):
+        frame = pd.read_parquet(source, columns=STAT_COLUMNS)
+    else:
+        frame = pd.DataFrame.from_records(iter_companies(source), columns=STAT_COLUMNS)
+    return typed_frame(frame)
+
+
+def typed_frame(frame):
+    """Cast the statistics columns to category / int64 paise / datetime"""
+    typed = pd.DataFrame(index=frame.index)
+    for column in CATEGORY_COLUMNS:
+        values = frame[column] if column in frame else pd.Series('', index=frame.index)
+        typed[column] = values if isinstance(values.dtype, pd.CategoricalDtype) else values.fillna('').astype('category')
+
+    for column in CAPITAL_FIELDS:
+        values = frame[column] if column in frame else pd.Series(dtype='object', index=frame.index)
+        if pd.api.types.is_numeric_dtype(values):
+            typed[column] = values.astype('Int64')
+        else:
+            rupees = pd.to_numeric(values.astype('string').str.replace(',', '', regex=False), errors='coerce')
+            typed[column] = (rupees * 100).round().astype('Int64')
+
+    if 'date_of_incorporation' in frame:
+        typed['date_of_incorporation'] = pd.to_datetime(frame['date_of_incorporation'], errors='coerce')
+    return typed
+
+
+def _paise(series):
+    """Nullable paise column as an int64 array plus its missing-value mask"""
+    return series.to_numpy(dtype='int64', na_value=0), series.isna().to_numpy()
+
+
+def _codes(column):
+    """Integer category codes (-1 for missing) and the category labels"""
+    return column.cat.codes.to_numpy(), list(column.cat.categories)
+
+
+def _count_matrix(state_codes, state_count, column):
+    """states x categories matrix of row counts, from a single bincount"""
+    codes, labels = _codes(column)
+    flat = state_codes.astype('int64') * len(labels) + codes
+    # typed_frame fills blanks, so codes are only missing for hand-built frames
+    if codes.min(initial=0) < 0 or state_codes.min(initial=0) < 0:
+        flat = flat[(codes >= 0) & (state_codes >= 0)]
+    matrix = np.bincount(flat, minlength=state_count * len(labels))
+    return matrix.reshape(state_count, len(labels)), labels
+
+
+def _count_dict(counts, labels, top_n=None):
+    """{label: count} for non-zero counts, largest first"""
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    if top_n is not None:
+        order = order[:top_n]
+    return {labels[i]: int(counts[i]) for i in order}
+
+
+def _sorted_quantiles(ordered, offset=0):
+    """Linear-interpolated QUANTILES in rupees of a sorted int64 paise array (minus offset)"""
+    if not len(ordered):
+        return {name: None for name in QUANTILES}
+    result = {}
+    for name, q in QUANTILES.items():
+        position = q * (len(ordered) - 1)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        value = ordered[lower] - offset + (ordered[upper] - ordered[lower]) * (position - lower)
+        result[name] = float(value) / 100
+    return result
+
+
+def _grouped_quantiles(paise, group_codes, group_count):
+    """Per-group QUANTILES from one sort of (group, paise) keys packed into int64"""
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(group_codes, minlength=group_count))))
+    if group_count <= 1 << (63 - PAISE_BITS) and (not len(paise) or
+                                                   (paise.min() >= 0 and paise.max() < 1 << PAISE_BITS)):
+        # Sorting the packed keys orders by group, then value, without the
+        # random-access gather an argsort would need
+        keys = np.sort((group_codes.astype('int64') << PAISE_BITS) | paise)
+        return [_sorted_quantiles(keys[bounds[group]:bounds[group + 1]], group << PAISE_BITS)
+                for group in range(group_count)]
+
+    # Negative or huge capitals: bucket by group (a stable radix argsort), then sort each bucket
+    bucketed = paise[np.argsort(group_codes, kind='stable')]
+    return [_sorted_quantiles(np.sort(bucketed[bounds[group]:bounds[group + 1]]))
+            for group in range(group_count)]
+
+
+def _capital_summary(series, state_codes, state_count):
+    """National and per-state sum/mean/count/quantiles (rupees) of one paise column"""
+    paise, missing = _paise(series)
+    valid = ~missing & (state_codes >= 0)
+    paise, codes = paise[valid], state_codes[valid]
+    counts = np.bincount(codes, minlength=state_count)
+    sums = np.bincount(codes, weights=paise, minlength=state_count) / 100
+
+    national = {'sum': float(sums.sum()), 'reported': int(counts.sum())}
+    national['mean'] = national['sum'] / national['reported'] if national['reported'] else None
+    national.update(_sorted_quantiles(np.sort(paise)))
+
+    per_state = []
+    for state, quantiles in enumerate(_grouped_quantiles(paise, codes, state_count)):
+        entry = {'sum': float(sums[state]), 'reported': int(counts[state])}
+        entry['mean'] = float(sums[state] / counts[state]) if counts[state] else None
+        entry.update(quantiles)
+        per_state.append(entry)
+    return national, per_state
+
+
+def compute_statistics(source, top_n=10):
+    """National and per-state statistics from one frame: {'national': {...}, 'states': {...}}"""
+    frame = source if isinstance(source, pd.DataFrame) and 'state' in source and \
+        isinstance(source['state'].dtype, pd.CategoricalDtype) else build_frame(source)
+
+    # Every aggregate below is a bincount or a sort over the state codes,
+    # so the whole nation is processed in one vectorized pass per column
+    state_codes, state_labels = _codes(frame['state'])
+    state_count = len(state_labels)
+    totals = np.bincount(state_codes[state_codes >= 0], minlength=state_count)
+
+    matrices = {key: _count_matrix(state_codes, state_count, frame[column])
+                for key, column in COUNT_DIMENSIONS.items()}
+    capital = {column: _capital_summary(frame[column], state_codes, state_count)
+               for column in CAPITAL_FIELDS}
+
+    # Per-ROC company counts and paid-up capital
+    roc_codes, roc_labels = _codes(frame['roc'])
+    paid_up, _ = _paise(frame['paid_up_capital'])
+    valid = (roc_codes >= 0) & (state_codes >= 0)
+    flat = state_codes[valid].astype('int64') * len(roc_labels) + roc_codes[valid]
+    roc_paid_up = np.bincount(flat, weights=paid_up[valid],
+                              minlength=state_count * len(roc_labels)).reshape(state_count, len(roc_labels)) / 100
+    roc_counts = matrices['companies_by_roc'][0]
+
+    def roc_breakdown(counts, sums):
+        return {
+            roc_labels[i]: {'companies': int(counts[i]), 'paid_up_capital_sum': float(sums[i])}
+            for i in np.argsort(-counts, kind='stable') if counts[i]
+        }
+
+    states = {}
+    for index, state in enumerate(state_labels):
+        if not totals[index]:
+            continue
+        entry = {'total_companies': int(totals[index])}
+        for key, (matrix, labels) in matrices.items():
+            entry[key] = _count_dict(matrix[index], labels, top_n if key == 'top_activities' else None)
+        entry['capital'] = {column: capital[column][1][index] for column in CAPITAL_FIELDS}
+        entry['roc_breakdown'] = roc_breakdown(roc_counts[index], roc_paid_up[index])
+        states[state] = entry
+
+    # The national rollup is the column sums of the per-state matrices
+    national = {'total_companies': int(totals.sum())}
+    for key, (matrix, labels) in matrices.items():
+        national[key] = _count_dict(matrix.sum(axis=0), labels, top_n if key == 'top_activities' else None)
+    national['capital'] = {column: capital[column][0] for column in CAPITAL_FIELDS}
+    national['roc_breakdown'] = roc_breakdown(roc_counts.sum(axis=0), roc_paid_up.sum(axis=0))
+
+    return {'national': national, 'states': states}
@@ -0,0 +1,137 @@
+"""Durable progress journal for resumable ROC crawls
+
+The journal directory holds journal.json (per state: last completed page,
+rows persisted, completed flag) and one append-only NDJSON file per state
+with the rows of every completed page. Rows are appended and fsynced before
+the journal is atomically rewritten, so after a crash the journal never
+claims more rows than are on disk; any extra trailing rows from a page that
+was not recorded are discarded when the state is reloaded or before its
+first page of a new run is appended.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+from company_schema import json_default
+
+
+def state_slug(state):
+    """File-system friendly name for a state, matching the per-state CSV names"""
+    return state.replace(' ', '_').replace('&', 'and')
+
+
+class CrawlJournal:
+    """Records completed states, the last completed page per state and the rows persisted"""
+
+    def __init__(self, directory='crawl_journal'):
+        self.directory = directory
+        self.path = os.path.join(directory, 'journal.json')
+        self.rows_directory = os.path.join(directory, 'rows')
+        self._lock = threading.Lock()
+        # States whose rows file was cut back to the journal in this process
+        self._trimmed = set()
+        os.makedirs(self.rows_directory, exist_ok=True)
+        self.states = self._load()
+
+    def _load(self):
+        """Read journal.json, or start empty"""
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f).get('states', {})
+
+    def _write(self):
+        """Atomically replace journal.json with the current progress"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'states': self.states, 'updated_at': datetime.now().isoformat()}, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def _rows_path(self, state):
+        return os.path.join(self.rows_directory, f"{state_slug(state)}.ndjson")
+
+    def _entry(self, state):
+        return self.states.setdefault(state, {'last_page': 0, 'rows': 0, 'completed': False})
+
+    def last_page(self, state):
+        """Last page of a state whose rows are safely on disk (0 if none)"""
+        with self._lock:
+            return self.states.get(state, {}).get('last_page', 0)
+
+    def rows_recorded(self, state):
+        """Table rows covered by a state's recorded pages (stored rows plus dropped duplicates)"""
+        with self._lock:
+            entry = self.states.get(state, {})
+            return entry.get('table_rows', entry.get('rows', 0))
+
+    def is_complete(self, state):
+        with self._lock:
+            return self.states.get(state, {}).get('completed', False)
+
+    def record_page(self, state, page, companies, table_rows=None):
+        """Persist a page's rows, then mark the page as completed; table_rows also counts dropped duplicates"""
+        with self._lock:
+            entry = self._entry(state)
+            if state not in self._trimmed:
+                # Rows of a page that crashed before being recorded must not precede this one
+                self._trim_rows(state)
+            with open(self._rows_path(state), 'a', encoding='utf-8') as f:
+                for company in companies:
+                    f.write(json.dumps(company, ensure_ascii=False, default=json_default) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+            entry['last_page'] = page
+            entry['table_rows'] = entry.get('table_rows', entry['rows']) + \
+                (len(companies) if table_rows is None else table_rows)
+            entry['rows'] += len(companies)
+            self._write()
+
+    def complete_state(self, state):
+        """Mark a state as fully crawled"""
+        with self._lock:
+            self._entry(state)['completed'] = True
+            self._write()
+
+    def load_rows(self, state):
+        """Rows persisted for a state, dropping any written after the last recorded page"""
+        with self._lock:
+            return self._trim_rows(state)
+
+    def _trim_rows(self, state):
+        """Read the journaled rows of a state and truncate any written after them; call with the lock held"""
+        self._trimmed.add(state)
+        expected = self.states.get(state, {}).get('rows', 0)
+        path = self._rows_path(state)
+        if not os.path.exists(path):
+            return []
+
+        rows = []
+        keep = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if len(rows) == expected:
+                    break
+                rows.append(json.loads(line))
+                keep += len(line)
+
+        # Truncate rows from a page that crashed before being recorded
+        with open(path, 'r+b') as f:
+            f.truncate(keep)
+        return rows
+
+    def reset_state(self, state):
+        """Forget a state's progress so it is crawled again from page 1"""
+        with self._lock:
+            self.states.pop(state, None)
+            if os.path.exists(self._rows_path(state)):
+                os.remove(self._rows_path(state))
+            self._write()
+
+    def clear(self):
+        """Forget all progress once a run has finished"""
+        for state in list(self.states):
+            self.reset_state(state)
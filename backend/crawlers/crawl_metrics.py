@@ -0,0 +1,239 @@
+"""Per-phase timing and throughput metrics for the crawlers
+
+Every crawl phase (navigate, select_state, preview, wait_data, extract,
+paginate, ...) runs inside a span tagged with the state and page it works
+on. Spans are aggregated into one latency histogram per phase, rows are
+counted per label set, and the whole run is exported at the end as JSON or
+in the Prometheus text exposition format:
+
+    metrics = CrawlMetrics()
+    with metrics.span('extract', state='assam', page=3) as span:
+        companies = crawler.extract_company_data()
+        span['ok'] = bool(companies)
+    metrics.add_rows(len(companies), state='assam')
+    metrics.export('crawl_metrics.json', 'crawl_metrics.prom')
+
+CrawlMetrics is thread-safe so parallel workers can share one instance. A
+phase's total time adds up its spans, so parallel workers can push it past
+the run time; its share of the run is the wall-clock time during which at
+least one of its spans was open.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Histogram upper bounds in seconds, from a DOM probe to a slow page load
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Busy intervals older than this (or than the phase's longest span, if longer)
+# are folded into a running total instead of being kept for merging
+BUSY_HORIZON = 600.0
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels) + '}'
+
+
+class CrawlMetrics:
+    """Phase histograms, row counters and a bounded log of tagged spans"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_spans=50000):
+        self.buckets = tuple(buckets)
+        self.max_spans = max_spans
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = {}
+        self.rows = {}
+        self.spans = []
+        self.dropped_spans = 0
+
+    @contextmanager
+    def span(self, phase, **tags):
+        """Time a block as one span of phase; set span['ok'] = False to count a failure"""
+        span = {'ok': True}
+        start = time.perf_counter()
+        try:
+            yield span
+        except Exception:
+            span['ok'] = False
+            raise
+        finally:
+            self.observe(phase, time.perf_counter() - start, bool(span['ok']), **tags)
+
+    def observe(self, phase, seconds, ok=True, **tags):
+        """Record a finished span"""
+        with self._lock:
+            stats = self.phases.get(phase)
+            if stats is None:
+                stats = self.phases[phase] = {
+                    'count': 0, 'failures': 0, 'sum': 0.0, 'max': 0.0,
+                    'buckets': [0] * len(self.buckets), 'busy': deque(), 'settled': 0.0
+                }
+            stats['count'] += 1
+            stats['sum'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            now = time.perf_counter()
+            self._add_busy(stats, now - seconds, now)
+            if not ok:
+                stats['failures'] += 1
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stats['buckets'][index] += 1
+                    break
+
+            if len(self.spans) < self.max_spans:
+                self.spans.append(dict(tags, phase=phase, seconds=round(seconds, 6), ok=ok,
+                                       offset=round(time.perf_counter() - self._started - seconds, 6)))
+            else:
+                self.dropped_spans += 1
+
+    def _add_busy(self, stats, start, end):
+        """Merge a span into the phase's busy intervals, so overlapping spans count once"""
+        busy = stats['busy']
+        # Spans are observed as they end, so only the newest intervals can overlap this one
+        while busy and busy[-1][1] >= start:
+            previous_start, _ = busy.pop()
+            start = min(start, previous_start)
+        busy.append((start, end))
+        horizon = max(BUSY_HORIZON, stats['max'])
+        while len(busy) > 1 and busy[0][1] < end - horizon:
+            old_start, old_end = busy.popleft()
+            stats['settled'] += old_end - old_start
+
+    def _wall_seconds(self, stats):
+        """Run time during which at least one span of the phase was open"""
+        return stats['settled'] + sum(end - start for start, end in stats['busy'])
+
+    def add_rows(self, count, **labels):
+        """Count extracted rows under a label set (e.g. state='assam')"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.rows[key] = self.rows.get(key, 0) + count
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def quantile(self, phase, q):
+        """Estimate a latency quantile from a phase histogram (linear within a bucket)"""
+        stats = self.phases.get(phase)
+        if not stats or not stats['count']:
+            return None
+        rank = q * stats['count']
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, stats['buckets']):
+            if count and cumulative + count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        # Beyond the last bucket the best estimate is the observed maximum
+        return stats['max']
+
+    def to_dict(self):
+        """Run summary for JSON export"""
+        with self._lock:
+            elapsed = self.elapsed()
+            total_rows = sum(self.rows.values())
+            phases = {}
+            for phase, stats in sorted(self.phases.items(), key=lambda item: -item[1]['sum']):
+                phases[phase] = {
+                    'count': stats['count'],
+                    'failures': stats['failures'],
+                    'total_seconds': round(stats['sum'], 6),
+                    'mean_seconds': round(stats['sum'] / stats['count'], 6),
+                    'max_seconds': round(stats['max'], 6),
+                    # total_seconds adds up overlapping spans (parallel workers); the share of the run
+                    # counts the wall-clock time the phase was active at all
+                    'wall_seconds': round(self._wall_seconds(stats), 6),
+                    'share_of_run': round(min(self._wall_seconds(stats) / elapsed, 1.0), 4) if elapsed else None,
+                    'histogram': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'],
+                                          stats['buckets'] + [stats['count'] - sum(stats['buckets'])]))
+                }
+            rows = {','.join(f"{key}={value}" for key, value in labels) or 'all': count
+                    for labels, count in self.rows.items()}
+            spans = list(self.spans)
+
+        for phase, summary in phases.items():
+            summary['p50_seconds'] = self.quantile(phase, 0.5)
+            summary['p90_seconds'] = self.quantile(phase, 0.9)
+            summary['p99_seconds'] = self.quantile(phase, 0.99)
+
+        return {
+            'started_at': self.started_at,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_total': total_rows,
+            'rows_per_second': round(total_rows / elapsed, 3) if elapsed else None,
+            'rows': rows,
+            'phases': phases,
+            'spans': spans,
+            'dropped_spans': self.dropped_spans
+        }
+
+    def to_prometheus(self, prefix='roc_crawler'):
+        """Prometheus text exposition of the phase histograms and row counters"""
+        with self._lock:
+            elapsed = self.elapsed()
+            lines = [
+                f"# HELP {prefix}_phase_seconds Time spent in each crawl phase",
+                f"# TYPE {prefix}_phase_seconds histogram"
+            ]
+            for phase, stats in sorted(self.phases.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats['buckets']):
+                    cumulative += count
+                    lines.append(f"{prefix}_phase_seconds_bucket"
+                                 f"{_labels([('phase', phase), ('le', bound)])} {cumulative}")
+                lines.append(f"{prefix}_phase_seconds_bucket{_labels([('phase', phase), ('le', '+Inf')])} {stats['count']}")
+                lines.append(f"{prefix}_phase_seconds_sum{_labels([('phase', phase)])} {stats['sum']:.6f}")
+                lines.append(f"{prefix}_phase_seconds_count{_labels([('phase', phase)])} {stats['count']}")
+
+            lines += [f"# HELP {prefix}_phase_failures_total Spans that failed or timed out",
+                      f"# TYPE {prefix}_phase_failures_total counter"]
+            for phase, stats in sorted(self.phases.items()):
+                lines.append(f"{prefix}_phase_failures_total{_labels([('phase', phase)])} {stats['failures']}")
+
+            lines += [f"# HELP {prefix}_rows_total Rows extracted",
+                      f"# TYPE {prefix}_rows_total counter"]
+            for labels, count in sorted(self.rows.items()):
+                lines.append(f"{prefix}_rows_total{_labels(labels)} {count}")
+
+            total_rows = sum(self.rows.values())
+            lines += [f"# HELP {prefix}_rows_per_second Rows extracted per second of run time",
+                      f"# TYPE {prefix}_rows_per_second gauge",
+                      f"{prefix}_rows_per_second {total_rows / elapsed if elapsed else 0:.6f}",
+                      f"# HELP {prefix}_run_seconds Wall-clock duration of the run",
+                      f"# TYPE {prefix}_run_seconds gauge",
+                      f"{prefix}_run_seconds {elapsed:.6f}"]
+        return '\n'.join(lines) + '\n'
+
+    def export(self, json_path=None, prometheus_path=None, prefix='roc_crawler'):
+        """Write the JSON summary and/or the Prometheus exposition"""
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, 'w', encoding='utf-8') as f:
+                f.write(self.to_prometheus(prefix))
+
+    def report(self, limit=8):
+        """Short text table of the slowest phases by total time"""
+        summary = self.to_dict()
+        lines = [f"{'phase':<24} {'count':>7} {'total s':>9} {'wall s':>8} {'mean s':>8} {'p90 s':>8} {'share':>6}"]
+        for phase, stats in list(summary['phases'].items())[:limit]:
+            p90 = stats['p90_seconds'] or 0
+            share = stats['share_of_run'] or 0
+            lines.append(f"{phase:<24} {stats['count']:>7} {stats['total_seconds']:>9.2f} {stats['wall_seconds']:>8.2f} "
+                         f"{stats['mean_seconds']:>8.3f} {p90:>8.3f} {share:>6.1%}")
+        lines.append(f"{summary['rows_total']} rows in {summary['elapsed_seconds']:.1f}s "
+                     f"({summary['rows_per_second'] or 0:.1f} rows/s)")
+        return '\n'.join(lines)
@@ -0,0 +1,226 @@
+"""Streaming output sinks for crawled company rows
+
+Rows are handed to a sink page by page as they are extracted, so nothing has
+to be held in memory until the end of a run. Every sink exposes the same
+three calls:
+
+    write_page(state, companies)   append one page of rows
+    finish_state(state)            the state has no more pages in this run
+    close()                        flush, fsync and release files
+
+Sinks are thread-safe so the parallel state workers can share one.
+"""
+import csv
+import json
+import logging
+import os
+import threading
+
+from company_schema import COMPANY_FIELDS, json_default
+from crawl_journal import state_slug
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+# Column order of every row written by the sinks
+ROW_FIELDS = COMPANY_FIELDS + ['scraped_at']
+
+
+class CompanySink:
+    """Base sink: keeps per-state row counts and fsync batching"""
+
+    def __init__(self, fsync_every=1000):
+        self.fsync_every = fsync_every
+        self.counts = {}
+        self._rows_since_sync = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def write_page(self, state, companies):
+        with self._lock:
+            self._write(state, companies)
+            self.counts[state] = self.counts.get(state, 0) + len(companies)
+            self._rows_since_sync += len(companies)
+            if self.fsync_every and self._rows_since_sync >= self.fsync_every:
+                self._sync()
+                self._rows_since_sync = 0
+
+    def finish_state(self, state):
+        with self._lock:
+            self._finish_state(state)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, state, companies):
+        raise NotImplementedError
+
+    def _sync(self):
+        pass
+
+    def _finish_state(self, state):
+        pass
+
+    def _close(self):
+        self._sync()
+
+
+def _fsync(handle):
+    handle.flush()
+    os.fsync(handle.fileno())
+
+
+class NDJSONSink(CompanySink):
+    """Appends one JSON object per company to a single newline-delimited file"""
+
+    def __init__(self, path, fsync_every=1000):
+        super().__init__(fsync_every)
+        self.path = path
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _write(self, state, companies):
+        for company in companies:
+            self._file.write(json.dumps(company, ensure_ascii=False, default=json_default) + '\n')
+
+    def _sync(self):
+        if not self._file.closed:
+            _fsync(self._file)
+
+    def _close(self):
+        if not self._file.closed:
+            _fsync(self._file)
+            self._file.close()
+            self.logger.info(f"Closed {self.path} with {sum(self.counts.values())} companies")
+
+
+class ParquetSink(CompanySink):
+    """Buffers rows into Parquet row groups of row_group_size rows"""
+
+    def __init__(self, path, row_group_size=50000):
+        if pq is None:
+            raise ImportError("pyarrow is required for Parquet output (pip install pyarrow)")
+        # A row group is the unit of durability here, so sync once per group
+        super().__init__(fsync_every=None)
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = pa.schema([(field, pa.string()) for field in ROW_FIELDS])
+        self._file = open(path, 'wb')
+        self._writer = pq.ParquetWriter(self._file, self.schema, compression='zstd')
+        self._buffer = {field: [] for field in ROW_FIELDS}
+        self._buffered = 0
+
+    def _write(self, state, companies):
+        for company in companies:
+            for field in ROW_FIELDS:
+                self._buffer[field].append(company.get(field, ''))
+        self._buffered += len(companies)
+        if self._buffered >= self.row_group_size:
+            self._flush_row_group()
+
+    def _flush_row_group(self):
+        if not self._buffered:
+            return
+        table = pa.table(self._buffer, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        _fsync(self._file)
+        self._buffer = {field: [] for field in ROW_FIELDS}
+        self._buffered = 0
+
+    def _close(self):
+        if self._writer is None:
+            return
+        self._flush_row_group()
+        self._writer.close()
+        self._writer = None
+        _fsync(self._file)
+        self._file.close()
+        self.logger.info(f"Closed {self.path} with {sum(self.counts.values())} companies")
+
+
+class StateCSVSink(CompanySink):
+    """Writes companies_<state>.csv files page by page, one open file per active state"""
+
+    def __init__(self, directory='.', fsync_every=1000):
+        super().__init__(fsync_every)
+        self.directory = directory
+        self._files = {}
+
+    def path_for(self, state):
+        return os.path.join(self.directory, f"companies_{state_slug(state)}.csv")
+
+    def _write(self, state, companies):
+        # Like save_to_csv, states without companies get no file
+        if not companies:
+            return
+        if state not in self._files:
+            handle = open(self.path_for(state), 'w', newline='', encoding='utf-8')
+            writer = csv.DictWriter(handle, fieldnames=ROW_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            self._files[state] = (handle, writer)
+        self._files[state][1].writerows(companies)
+
+    def _sync(self):
+        for handle, _ in self._files.values():
+            _fsync(handle)
+
+    def _finish_state(self, state):
+        if state in self._files:
+            handle, _ = self._files.pop(state)
+            _fsync(handle)
+            handle.close()
+            self.logger.info(f"Saved {self.counts.get(state, 0)} companies to {self.path_for(state)}")
+
+    def _close(self):
+        for state in list(self._files):
+            self._finish_state(state)
+
+
+class MultiSink:
+    """Fans every call out to several sinks (e.g. combined NDJSON plus per-state CSV)"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    @property
+    def counts(self):
+        return self.sinks[0].counts if self.sinks else {}
+
+    def write_page(self, state, companies):
+        for sink in self.sinks:
+            sink.write_page(state, companies)
+
+    def finish_state(self, state):
+        for sink in self.sinks:
+            sink.finish_state(state)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_sink(kind, combined_path, csv_directory='.'):
+    """Combined NDJSON or Parquet output plus per-state CSVs"""
+    if kind == 'parquet':
+        combined = ParquetSink(combined_path)
+    elif kind == 'ndjson':
+        combined = NDJSONSink(combined_path)
+    else:
+        raise ValueError(f"Unknown sink type: {kind}")
+    return MultiSink(combined, StateCSVSink(csv_directory))
@@ -0,0 +1,201 @@
+"""Readiness-condition waits for the ROC crawler
+
+Instead of sleeping for a fixed time after every click, the crawler polls the
+page for the condition it actually needs (rows present, DataTables no longer
+processing, first CIN changed after a page turn). Every wait has its own
+timeout and the time it really took is recorded per condition name, and
+also as a wait_<name> phase when a CrawlMetrics instance is attached.
+"""
+import time
+import logging
+
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    TimeoutException,
+    NoSuchElementException,
+    StaleElementReferenceException
+)
+
+# Snapshot of the data table taken in one round trip: row count, first-row CIN,
+# the "no data" placeholder text and whether the DataTables "Processing..."
+# indicator is showing
+TABLE_STATE_SCRIPT = """
+    var selectors = arguments[0];
+    var body = null;
+    for (var i = 0; i < selectors.length && !body; i++) {
+        body = document.querySelector(selectors[i]);
+    }
+    var rows = body ? body.querySelectorAll('tr') : [];
+    var dataRows = 0;
+    var firstCin = '';
+    var empty = body ? body.querySelector('td.dataTables_empty') : null;
+    for (var r = 0; r < rows.length; r++) {
+        var cells = rows[r].querySelectorAll('td');
+        if (cells.length > 1) {
+            if (!dataRows) {
+                firstCin = cells[0].innerText.trim();
+            }
+            dataRows++;
+        }
+    }
+    var processing = false;
+    var indicators = document.querySelectorAll('.dataTables_processing');
+    for (var p = 0; p < indicators.length; p++) {
+        var style = window.getComputedStyle(indicators[p]);
+        if (style.display !== 'none' && style.visibility !== 'hidden' &&
+                indicators[p].getClientRects().length > 0) {
+            processing = true;
+        }
+    }
+    return {found: !!body, rows: dataRows, first_cin: firstCin, processing: processing,
+            empty: empty ? empty.innerText.trim() : null};
+"""
+
+def processing_done(state):
+    """Table predicate: the DataTables processing indicator is gone"""
+    return not state['processing']
+
+
+def table_ready(state):
+    """Table predicate: at least one data row and no processing indicator"""
+    return state['rows'] > 0 and not state['processing']
+
+
+def page_changed(previous, state):
+    """Table predicate: rows are showing and differ from a previous table state"""
+    if state['processing'] or not state['rows']:
+        return False
+    if not previous or not previous.get('rows'):
+        return True
+    return state['first_cin'] != previous['first_cin'] or state['rows'] != previous['rows']
+
+
+def table_refreshed(previous, state):
+    """Table predicate: new rows are showing, or the table settled on a different "no data" placeholder"""
+    if page_changed(previous, state):
+        return True
+    if state['processing'] or state['rows'] or state.get('empty') is None:
+        return False
+    # A state without companies replaces the rows (or the initial placeholder) with an empty table
+    return bool(previous) and (previous.get('rows', 0) > 0 or previous.get('empty') != state['empty'])
+
+
+DEFAULT_TABLE_SELECTORS = [
+    "tbody[role='rowgroup']",
+    "table tbody",
+    ".data-table tbody",
+    "#DataTables_Table_0 tbody"
+]
+
+
+class ReadinessWaiter:
+    """Polls the page for readiness conditions and records how long each wait took"""
+
+    # Per-condition timeouts in seconds; anything not listed uses default_timeout
+    DEFAULT_TIMEOUTS = {
+        'table_ready': 30,
+        'data_table': 30,
+        'processing_done': 30,
+        'page_changed': 20,
+        'table_refreshed': 20,
+        'popup_closed': 3
+    }
+
+    def __init__(self, driver, timeouts=None, default_timeout=30, poll_interval=0.1,
+                 table_selectors=None, metrics=None):
+        self.driver = driver
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        self.timeouts.update(timeouts or {})
+        self.default_timeout = default_timeout
+        self.poll_interval = poll_interval
+        self.table_selectors = table_selectors or DEFAULT_TABLE_SELECTORS
+        self.metrics = metrics
+        self.logger = logging.getLogger(__name__)
+        self.stats = {}
+
+    def wait_for(self, name, condition, timeout=None):
+        """Wait until condition(driver) is truthy; return its value, or None on timeout"""
+        if timeout is None:
+            timeout = self.timeouts.get(name, self.default_timeout)
+
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(
+                self.driver,
+                timeout,
+                poll_frequency=self.poll_interval,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+            ).until(condition)
+        except TimeoutException:
+            result = None
+
+        elapsed = time.perf_counter() - start
+        self.record(name, elapsed, result is not None)
+        if result is None:
+            self.logger.warning(f"Wait '{name}' timed out after {elapsed:.2f}s")
+        else:
+            self.logger.debug(f"Wait '{name}' satisfied in {elapsed:.3f}s")
+        return result
+
+    def record(self, name, elapsed, satisfied):
+        """Add one wait duration to the per-condition statistics"""
+        stats = self.stats.setdefault(name, {
+            'count': 0, 'timeouts': 0, 'total_seconds': 0.0, 'max_seconds': 0.0, 'last_seconds': 0.0
+        })
+        stats['count'] += 1
+        stats['total_seconds'] += elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        stats['last_seconds'] = elapsed
+        if not satisfied:
+            stats['timeouts'] += 1
+        if self.metrics:
+            self.metrics.observe(f"wait_{name}", elapsed, satisfied)
+
+    def summary(self):
+        """Per-condition wait statistics including the mean duration"""
+        summary = {}
+        for name, stats in self.stats.items():
+            summary[name] = dict(stats, mean_seconds=stats['total_seconds'] / stats['count'])
+        return summary
+
+    def table_state(self):
+        """Current row count, first-row CIN and processing flag of the data table"""
+        return self.driver.execute_script(TABLE_STATE_SCRIPT, self.table_selectors)
+
+    # Conditions -----------------------------------------------------------
+
+    def _table_condition(self, predicate):
+        """Wrap a predicate on the table state as a WebDriverWait condition"""
+        def condition(driver):
+            state = self.table_state()
+            return state if state and predicate(state) else False
+        return condition
+
+    def wait_processing_done(self):
+        """Wait for the DataTables processing indicator to disappear"""
+        return self.wait_for('processing_done', self._table_condition(processing_done))
+
+    def wait_table_ready(self):
+        """Wait for at least one data row with no processing indicator"""
+        return self.wait_for('table_ready', self._table_condition(table_ready))
+
+    def wait_page_changed(self, previous):
+        """Wait for the row count or first-row CIN to differ from a previous table state"""
+        return self.wait_for('page_changed', self._table_condition(
+            lambda state: page_changed(previous, state)
+        ))
+
+    def wait_table_refreshed(self, previous):
+        """Wait for a previous table state to be replaced by new rows or by an empty table"""
+        return self.wait_for('table_refreshed', self._table_condition(
+            lambda state: table_refreshed(previous, state)
+        ))
+
+    def wait_element_hidden(self, name, element):
+        """Wait for an element to be removed or hidden"""
+        def hidden(driver):
+            try:
+                return not element.is_displayed()
+            except StaleElementReferenceException:
+                return True
+        return self.wait_for(name, hidden)
@@ -0,0 +1,173 @@
+"""CIN fingerprint index for incremental (delta) ROC crawls
+
+The index maps every CIN seen in the previous snapshot to its state and a
+hash of its content fields. During a crawl DeltaTracker classifies each
+extracted CIN as new, changed or unchanged, once however many states list
+it. It signals the crawler to stop
+paginating a state after a run of unchanged known rows, which relies on the
+site listing companies in a stable order with new registrations first. Only
+new and changed rows are emitted, and states crawled to the last page also
+yield tombstones for CINs that disappeared.
+
+Build an index from an existing snapshot:
+
+    python delta_index.py all_companies_data_20250607_220834.json cin_index.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+from company_schema import COMPANY_FIELDS
+
+
+def company_fingerprint(company):
+    """Stable hash of a company's content fields (scrape time excluded)"""
+    content = '\x1f'.join(str(company.get(field, '')) for field in COMPANY_FIELDS)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+class FingerprintIndex:
+    """CIN -> (state, content fingerprint) from a previous snapshot"""
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    @classmethod
+    def from_snapshot(cls, path):
+        """Build an index from an all_companies_data_*.json snapshot"""
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        entries = {}
+        for state, companies in data.items():
+            for company in companies:
+                if company.get('cin'):
+                    entries[company['cin']] = [state, company_fingerprint(company)]
+        return cls(entries)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or start empty if it does not exist yet"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls(json.load(f)['entries'])
+
+    def save(self, path):
+        """Atomically write the index"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated_at': datetime.now().isoformat(), 'entries': self.entries}, f)
+        os.replace(temp_path, path)
+
+    def cins_for_state(self, state):
+        return {cin for cin, (entry_state, _) in self.entries.items() if entry_state == state}
+
+
+class DeltaTracker:
+    """Classifies crawled rows against a FingerprintIndex and decides when to stop a state"""
+
+    def __init__(self, index, stop_after_unchanged=50):
+        self.index = index
+        self.stop_after_unchanged = stop_after_unchanged
+        self._lock = threading.Lock()
+        self.new = {}
+        self.changed = {}
+        self.tombstones = {}
+        self.stopped_early = set()
+        self.unchanged_counts = {}
+        self._seen = {}
+        self._classified = set()
+        self._unchanged_run = {}
+
+    def observe_page(self, state, companies):
+        """Classify a page of rows; returns True once the state should stop paginating"""
+        with self._lock:
+            seen = self._seen.setdefault(state, set())
+            run = self._unchanged_run.get(state, 0)
+
+            for company in companies:
+                cin = company.get('cin')
+                if not cin:
+                    continue
+                seen.add(cin)
+                # A CIN listed under several states (or re-read after a restart) is classified
+                # once, under the state that listed it first, as deduplicated output keeps it
+                if cin in self._classified:
+                    continue
+                self._classified.add(cin)
+                fingerprint = company_fingerprint(company)
+                previous = self.index.entries.get(cin)
+
+                if previous is None:
+                    self.new.setdefault(state, []).append(company)
+                    run = 0
+                elif previous[1] != fingerprint:
+                    self.changed.setdefault(state, []).append(company)
+                    run = 0
+                else:
+                    self.unchanged_counts[state] = self.unchanged_counts.get(state, 0) + 1
+                    run += 1
+
+            self._unchanged_run[state] = run
+            if self.stop_after_unchanged and run >= self.stop_after_unchanged:
+                self.stopped_early.add(state)
+                return True
+            return False
+
+    def stop_state(self, state):
+        """Record that a state was not read to its last page, so it gets no tombstones"""
+        with self._lock:
+            self.stopped_early.add(state)
+
+    def finish_state(self, state):
+        """Record tombstones for a state that was read to its last page"""
+        with self._lock:
+            if state in self.stopped_early:
+                return
+            seen = self._seen.get(state, set())
+            missing = sorted(self.index.cins_for_state(state) - seen)
+            if missing:
+                self.tombstones[state] = missing
+
+    def delta(self):
+        """New and changed rows plus tombstones, in the combined-output layout"""
+        with self._lock:
+            return {
+                'generated_at': datetime.now().isoformat(),
+                'new': self.new,
+                'changed': self.changed,
+                'tombstones': self.tombstones,
+                'stopped_early': sorted(self.stopped_early),
+                'unchanged_counts': self.unchanged_counts
+            }
+
+    def updated_index(self):
+        """The previous index with this run's new, changed and removed CINs applied"""
+        with self._lock:
+            entries = dict(self.index.entries)
+            for rows_by_state in (self.new, self.changed):
+                for state, companies in rows_by_state.items():
+                    for company in companies:
+                        entries[company['cin']] = [state, company_fingerprint(company)]
+            for cins in self.tombstones.values():
+                for cin in cins:
+                    entries.pop(cin, None)
+            return FingerprintIndex(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a CIN fingerprint index from a crawl snapshot")
+    parser.add_argument("snapshot", help="all_companies_data_*.json file")
+    parser.add_argument("index", help="index file to write")
+    args = parser.parse_args()
+
+    index = FingerprintIndex.from_snapshot(args.snapshot)
+    index.save(args.index)
+    print(f"Indexed {len(index.entries)} companies into {args.index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+"""HTML pages served by the fixture server in place of the crawled sites
+
+Self-contained stand-ins (no external scripts or stylesheets) that expose the
+structure the Selenium crawlers depend on:
+
+    roc_page          data.gov.in ROC master data page: a welcome popup with a
+                      modal backdrop, the CompanyStateCode dropdown, the
+                      Preview & Download button and a DataTables-style table
+                      (length menu, info text, processing indicator,
+                      Previous/Next paging) whose rows are fetched from
+                      ROC_DATA_PATH per draw, like server-side DataTables
+    wikipedia_page    a company article with an infobox (Key people,
+                      Subsidiaries, Revenue, Founders, Headquarters) and a
+                      Board of directors section
+    wikipedia_parse   the same article's content as the MediaWiki parse API
+                      returns it (action=parse, formatversion=2)
+    leadership_page   the TCS leadership page, whose entries are inserted by
+                      a script after load
+"""
+import html
+import json
+
+ROC_PAGE_PATH = '/resource/registrars-companies-roc-wise-company-master-data'
+ROC_DATA_PATH = '/roc-data'
+WIKIPEDIA_PATH = '/wiki/'
+WIKIPEDIA_API_PATH = '/w/api.php'
+LEADERSHIP_PATH = '/who-we-are/leadership'
+
+# Length menu of the ROC table; the crawler picks the largest
+DEFAULT_PAGE_SIZES = (10, 25, 50, 100)
+
+ROC_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Registrars of Companies (ROC)-wise Company Master Data | Open Government Data</title>
+<style>
+  body { font-family: sans-serif; margin: 0; }
+  .modal { position: fixed; top: 20%; left: 30%; width: 40%; background: #fff; z-index: 1050; padding: 1em; }
+  .modal-backdrop { position: fixed; inset: 0; background: rgba(0, 0, 0, 0.5); z-index: 1040; }
+  .hidden { display: none !important; }
+  .dataTables_processing { position: absolute; top: 40%; left: 40%; padding: 1em; background: #eee; }
+  .paginate_button { cursor: pointer; margin: 0 0.3em; }
+  .paginate_button.disabled { color: #aaa; cursor: default; }
+  .dataTables_wrapper { position: relative; }
+</style>
+</head>
+<body>
+<div class="modal show" id="welcome-popup" role="dialog">
+  <div class="modal-header">
+    <h4>Welcome to Open Government Data Platform India</h4>
+    <button type="button" class="close" data-dismiss="modal" aria-label="Close">&times;</button>
+  </div>
+  <div class="modal-body">Datasets are published by ministries and departments.</div>
+</div>
+<div class="modal-backdrop show" id="welcome-backdrop"></div>
+
+<h1>Registrars of Companies (ROC)-wise Company Master Data</h1>
+<form id="filters" onsubmit="return false;">
+  <label for="CompanyStateCode">State</label>
+  <select id="CompanyStateCode" name="CompanyStateCode">
+    <option value="">- Any -</option>
+    __STATE_OPTIONS__
+  </select>
+  <button type="button" id="preview-download" class="btn btn-primary">Preview &amp; Download</button>
+</form>
+
+<div class="dataTables_wrapper" id="DataTables_Table_0_wrapper">
+  <div class="dataTables_length" id="DataTables_Table_0_length">
+    <label>Show <select name="DataTables_Table_0_length" aria-controls="DataTables_Table_0">
+      __LENGTH_OPTIONS__
+    </select> entries</label>
+  </div>
+  <div class="dataTables_processing hidden" id="DataTables_Table_0_processing">Processing...</div>
+  <table id="DataTables_Table_0" class="data-table display">
+    <thead><tr>__HEADER_CELLS__</tr></thead>
+    <tbody role="rowgroup"><tr class="odd"><td colspan="__COLUMN_COUNT__" class="dataTables_empty">Select a state and click Preview</td></tr></tbody>
+  </table>
+  <div class="dataTables_info" id="DataTables_Table_0_info" role="status">Showing 0 to 0 of 0 entries</div>
+  <div class="dataTables_paginate paging_simple_numbers" id="DataTables_Table_0_paginate">
+    <a class="paginate_button previous disabled" aria-label="Previous" id="DataTables_Table_0_previous">Previous</a>
+    <span class="page-number"></span>
+    <a class="paginate_button next disabled" aria-label="Next" id="DataTables_Table_0_next">Next</a>
+  </div>
+</div>
+
+<script>
+(function () {
+  var table = {state: null, start: 0, length: __DEFAULT_LENGTH__, total: 0, draw: 0};
+  var body = document.querySelector('#DataTables_Table_0 tbody');
+  var processing = document.getElementById('DataTables_Table_0_processing');
+  var info = document.getElementById('DataTables_Table_0_info');
+  var previous = document.getElementById('DataTables_Table_0_previous');
+  var next = document.getElementById('DataTables_Table_0_next');
+  var pageNumber = document.querySelector('.dataTables_paginate .page-number');
+  var lengthMenu = document.querySelector("select[name='DataTables_Table_0_length']");
+
+  document.querySelector('#welcome-popup .close').addEventListener('click', function () {
+    document.getElementById('welcome-popup').classList.add('hidden');
+    document.getElementById('welcome-backdrop').classList.add('hidden');
+  });
+  document.addEventListener('keydown', function (event) {
+    if (event.key === 'Escape') {
+      document.getElementById('welcome-popup').classList.add('hidden');
+      document.getElementById('welcome-backdrop').classList.add('hidden');
+    }
+  });
+
+  function escapeHtml(value) {
+    return String(value).replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+  }
+
+  function render(data) {
+    table.total = data.total;
+    var parts = [];
+    for (var r = 0; r < data.rows.length; r++) {
+      parts.push('<tr class="' + (r % 2 ? 'even' : 'odd') + '">');
+      for (var c = 0; c < data.rows[r].length; c++) {
+        parts.push('<td>' + escapeHtml(data.rows[r][c]) + '</td>');
+      }
+      parts.push('</tr>');
+    }
+    if (!data.rows.length) {
+      parts.push('<tr class="odd"><td colspan="__COLUMN_COUNT__" class="dataTables_empty">No data available in table</td></tr>');
+    }
+    body.innerHTML = parts.join('');
+
+    var first = data.total ? table.start + 1 : 0;
+    var last = table.start + data.rows.length;
+    info.textContent = 'Showing ' + first.toLocaleString('en-US') + ' to ' + last.toLocaleString('en-US') +
+        ' of ' + data.total.toLocaleString('en-US') + ' entries';
+    previous.classList.toggle('disabled', table.start === 0);
+    next.classList.toggle('disabled', last >= data.total);
+    pageNumber.textContent = data.total ? String(Math.floor(table.start / table.length) + 1) : '';
+  }
+
+  function draw() {
+    var draw = ++table.draw;
+    processing.classList.remove('hidden');
+    var url = '__DATA_PATH__?state=' + encodeURIComponent(table.state) +
+        '&start=' + table.start + '&length=' + table.length;
+    fetch(url).then(function (response) {
+      return response.json();
+    }).then(function (data) {
+      // A newer draw supersedes this one, as in DataTables
+      if (draw !== table.draw) {
+        return;
+      }
+      render(data);
+      processing.classList.add('hidden');
+    });
+  }
+
+  document.getElementById('preview-download').addEventListener('click', function () {
+    table.state = document.getElementById('CompanyStateCode').value;
+    table.start = 0;
+    draw();
+  });
+  lengthMenu.addEventListener('change', function () {
+    table.length = parseInt(lengthMenu.value, 10);
+    table.start = 0;
+    if (table.state !== null) {
+      draw();
+    }
+  });
+  previous.addEventListener('click', function () {
+    if (!previous.classList.contains('disabled')) {
+      table.start = Math.max(0, table.start - table.length);
+      draw();
+    }
+  });
+  next.addEventListener('click', function () {
+    if (!next.classList.contains('disabled')) {
+      table.start += table.length;
+      draw();
+    }
+  });
+})();
+</script>
+</body>
+</html>
+"""
+
+WIKIPEDIA_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>__TITLE__ - Wikipedia</title></head>
+<body>
+<h1 id="firstHeading">__TITLE__</h1>
+<div id="mw-content-text"><div class="mw-parser-output">
+<table class="infobox vcard">
+<tbody>
+<tr><th colspan="2" class="infobox-above">__TITLE__</th></tr>
+<tr><th scope="row" class="infobox-label">Type</th><td class="infobox-data">Public</td></tr>
+<tr><th scope="row" class="infobox-label">Founded</th><td class="infobox-data">1 April 1968</td></tr>
+<tr><th scope="row" class="infobox-label">Founders</th><td class="infobox-data"><div class="plainlist"><ul>__FOUNDERS__</ul></div></td></tr>
+<tr><th scope="row" class="infobox-label">Headquarters</th><td class="infobox-data">Mumbai, Maharashtra, India</td></tr>
+<tr><th scope="row" class="infobox-label">Key people</th><td class="infobox-data"><div class="plainlist"><ul>__KEY_PEOPLE__</ul></div></td></tr>
+<tr><th scope="row" class="infobox-label">Revenue</th><td class="infobox-data"><span class="increase">&#9650;</span> US$30.2 billion (2024)<sup class="reference">[1]</sup></td></tr>
+<tr><th scope="row" class="infobox-label">Number of employees</th><td class="infobox-data">601,546 (2024)</td></tr>
+<tr><th scope="row" class="infobox-label">Subsidiaries</th><td class="infobox-data"><div class="plainlist"><ul>__SUBSIDIARIES__</ul></div></td></tr>
+</tbody>
+</table>
+<p><b>__TITLE__</b> is a multinational information technology services and consulting company.</p>
+<h2 id="History">History</h2>
+<p>The company was founded in 1968.</p>
+<h2 id="Board_of_directors">Board of directors</h2>
+__BOARD__
+<h2 id="References">References</h2>
+<ol class="references"><li>Annual report</li></ol>
+</div></div>
+</body>
+</html>
+"""
+
+LEADERSHIP_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Leadership | TCS</title></head>
+<body>
+<div class="leadership-section" id="leadership"></div>
+<script>
+(function () {
+  var leaders = __LEADERS__;
+  // Entries arrive after load, like the client-rendered original
+  setTimeout(function () {
+    var section = document.getElementById('leadership');
+    var parts = [];
+    for (var i = 0; i < leaders.length; i++) {
+      parts.push('<div class="leader"><h2 class="intro-heading">' + leaders[i].role + '</h2>' +
+          '<h3 class="intro-description">' + leaders[i].name + ' Read more about ' + leaders[i].name + '</h3></div>');
+    }
+    section.innerHTML = parts.join('');
+  }, __RENDER_DELAY_MS__);
+})();
+</script>
+</body>
+</html>
+"""
+
+KEY_PEOPLE = [("N. Chandrasekaran", "Chairman"), ("K. Krithivasan", "CEO & MD"), ("Samir Seksaria", "CFO")]
+FOUNDERS = ["J. R. D. Tata", "F. C. Kohli"]
+SUBSIDIARIES = ["TCS e-Serve", "Tata America International Corporation", "Diligenta", "CMC Limited"]
+BOARD = [("N. Chandrasekaran", "Chairman"), ("K. Krithivasan", "Managing Director"),
+         ("Aarthi Subramanian", "Executive Director"), ("Hanne Sorensen", "Independent Director")]
+LEADERS = [("Chief Executive Officer and Managing Director", "K. Krithivasan"),
+           ("Chief Financial Officer", "Samir Seksaria"),
+           ("Chief Operating Officer", "Aarthi Subramanian"),
+           ("Chief Human Resources Officer", "Sudeep Kunnumal")]
+
+
+def roc_page(states, columns, page_sizes=DEFAULT_PAGE_SIZES):
+    """The ROC master data page with a dropdown option per state"""
+    options = '\n    '.join(f'<option value="{html.escape(state)}">{html.escape(state)}</option>'
+                           for state in states)
+    lengths = '\n      '.join(f'<option value="{size}">{size}</option>' for size in page_sizes)
+    page = ROC_PAGE_TEMPLATE
+    for placeholder, value in (
+        ('__STATE_OPTIONS__', options),
+        ('__LENGTH_OPTIONS__', lengths),
+        ('__HEADER_CELLS__', ''.join(f'<th>{html.escape(column)}</th>' for column in columns)),
+        ('__COLUMN_COUNT__', str(len(columns))),
+        ('__DEFAULT_LENGTH__', str(page_sizes[0])),
+        ('__DATA_PATH__', ROC_DATA_PATH)
+    ):
+        page = page.replace(placeholder, value)
+    return page
+
+
+def wikipedia_page(title):
+    """A company article for any title"""
+    page = WIKIPEDIA_TEMPLATE
+    for placeholder, value in (
+        ('__TITLE__', html.escape(title)),
+        ('__FOUNDERS__', ''.join(f'<li><a href="#">{name}</a></li>' for name in FOUNDERS)),
+        ('__KEY_PEOPLE__', ''.join(f'<li><a href="#">{name}</a><br>({role})</li>' for name, role in KEY_PEOPLE)),
+        ('__SUBSIDIARIES__', ''.join(f'<li>{name}</li>' for name in SUBSIDIARIES)),
+        ('__BOARD__', '<ul>' + ''.join(f'<li>{name} - {role}</li>' for name, role in BOARD) + '</ul>')
+    ):
+        page = page.replace(placeholder, value)
+    return page
+
+
+def wikipedia_parse(title):
+    """Parse API payload for an article: its mw-parser-output fragment, without the page chrome"""
+    page = wikipedia_page(title)
+    start = page.index('<div class="mw-parser-output">')
+    end = page.rindex('</div></div>') + len('</div>')
+    return {'parse': {'title': title, 'text': page[start:end]}}
+
+
+def leadership_page(render_delay=0.5):
+    """The leadership page; entries are rendered render_delay seconds after load"""
+    leaders = json.dumps([{'role': role, 'name': name} for role, name in LEADERS])
+    return (LEADERSHIP_TEMPLATE
+            .replace('__LEADERS__', leaders)
+            .replace('__RENDER_DELAY_MS__', str(int(render_delay * 1000))))
@@ -0,0 +1,317 @@
+"""Local stand-in for data.gov.in that serves recorded company fixtures
+
+Serves the ROC company master resource the way the data.gov.in API does
+(offset/limit paging, filters[<field>]=value, format=json|csv), backed by a
+recorded crawl such as data/all_companies_data.json or by synthetic rows.
+Used to exercise and benchmark the HTTP engine offline.
+
+It also serves the pages the Selenium crawlers drive (fixture_pages.py): the
+ROC master data page with its dropdown, popup and DataTables paging, a
+Wikipedia company article (and its MediaWiki parse API output, read by
+wikipedia_http.py) and the TCS leadership page, so the browser paths can be
+replayed by bench_replay.py. Every response carries an ETag and Last-Modified,
+and conditional requests get a 304, so http_cache.py can be exercised too:
+
+    python fixture_server.py --port 8765 --latency 0.05
+    python fixture_server.py --synthetic 5000 --page-sizes 10 100 1000
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from company_schema import API_FIELD_ALIASES, COMPANY_FIELDS, company_to_record
+from fixture_pages import (DEFAULT_PAGE_SIZES, LEADERSHIP_PATH, ROC_DATA_PATH, ROC_PAGE_PATH, WIKIPEDIA_API_PATH,
+                           WIKIPEDIA_PATH, leadership_page, roc_page, wikipedia_page, wikipedia_parse)
+
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'all_companies_data.json')
+
+# Path the fixture resource is served under, mirroring api.data.gov.in
+RESOURCE_PATH = '/resource/roc-company-master'
+
+
+def load_fixture_records(path=DEFAULT_FIXTURE):
+    """Load a recorded crawl ({state: [company, ...]}) as API records"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+
+    records = []
+    for state, companies in data.items():
+        for company in companies:
+            record = company_to_record(company)
+            record[API_FIELD_ALIASES['state'][0]] = company.get('state') or state
+            records.append(record)
+    return records
+
+
+def synthetic_records(records, rows_per_state):
+    """rows_per_state records for every state in records, cycling the recorded rows under new CINs"""
+    state_field = API_FIELD_ALIASES['state'][0]
+    cin_field = API_FIELD_ALIASES['cin'][0]
+    by_state = {}
+    for record in records:
+        by_state.setdefault(record[state_field], []).append(record)
+
+    synthetic = []
+    for state_index, (state, templates) in enumerate(sorted(by_state.items())):
+        for index in range(rows_per_state):
+            record = dict(templates[index % len(templates)])
+            record[cin_field] = f"U{state_index:02d}{index:08d}SYN{index % 1000:03d}"
+            synthetic.append(record)
+    return synthetic
+
+
+class FixtureServer:
+    """Threaded HTTP server serving API records from memory"""
+
+    def __init__(self, records=None, fixture_path=DEFAULT_FIXTURE, host='127.0.0.1', port=0,
+                 latency=0.0, page_latency=0.0, page_sizes=DEFAULT_PAGE_SIZES, render_delay=0.5):
+        self.records = records if records is not None else load_fixture_records(fixture_path)
+        self.latency = latency
+        self.page_latency = page_latency
+        self.page_sizes = tuple(page_sizes)
+        self.render_delay = render_delay
+        self.request_count = 0
+        self.not_modified_count = 0
+        # Validators of every response; fixture content never changes while the server runs
+        self.last_modified = formatdate(time.time(), usegmt=True)
+        self._state_rows = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def resource_url(self):
+        return self.url + RESOURCE_PATH
+
+    @property
+    def roc_url(self):
+        return self.url + ROC_PAGE_PATH
+
+    @property
+    def wikipedia_url(self):
+        return self.url + WIKIPEDIA_PATH
+
+    @property
+    def wikipedia_api_url(self):
+        return self.url + WIKIPEDIA_API_PATH
+
+    @property
+    def leadership_url(self):
+        return self.url + LEADERSHIP_PATH
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fixture-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down and release the port"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def filter_records(self, filters):
+        """Records whose fields match every filter value, case-insensitively"""
+        if not filters:
+            return self.records
+        wanted = {field: value.lower() for field, value in filters.items()}
+        return [
+            record for record in self.records
+            if all(str(record.get(field, '')).lower() == value for field, value in wanted.items())
+        ]
+
+    def render_page(self, query):
+        """Build the (content type, body) for one resource request"""
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['10'])[0])
+        response_format = query.get('format', ['json'])[0]
+        filters = {
+            key[len('filters['):-1]: values[0]
+            for key, values in query.items()
+            if key.startswith('filters[') and key.endswith(']')
+        }
+
+        matching = self.filter_records(filters)
+        page = matching[offset:offset + limit]
+
+        if response_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=[API_FIELD_ALIASES[f][0] for f in COMPANY_FIELDS])
+            writer.writeheader()
+            writer.writerows(page)
+            return 'text/csv; charset=utf-8', buffer.getvalue().encode('utf-8')
+
+        body = {
+            'status': 'ok',
+            'total': len(matching),
+            'count': len(page),
+            'limit': str(limit),
+            'offset': str(offset),
+            'field': [{'id': API_FIELD_ALIASES[f][0], 'name': f} for f in COMPANY_FIELDS],
+            'records': page
+        }
+        return 'application/json', json.dumps(body).encode('utf-8')
+
+    def state_rows(self):
+        """Table cells per lowercase state, in COMPANY_FIELDS order, built once"""
+        if self._state_rows is None:
+            names = [API_FIELD_ALIASES[field][0] for field in COMPANY_FIELDS]
+            state_rows = {}
+            for record in self.records:
+                state = str(record.get(API_FIELD_ALIASES['state'][0], '')).lower()
+                state_rows.setdefault(state, []).append([str(record.get(name, '')) for name in names])
+            self._state_rows = state_rows
+        return self._state_rows
+
+    def render_table_page(self, query):
+        """One draw of the ROC table: total and rows for state, start and length"""
+        state = query.get('state', [''])[0].lower()
+        start = int(query.get('start', ['0'])[0])
+        length = int(query.get('length', ['10'])[0])
+        rows = self.state_rows().get(state, [])
+        page = rows[start:] if length < 0 else rows[start:start + length]
+        return 'application/json', json.dumps({'total': len(rows), 'rows': page}).encode('utf-8')
+
+    def render_wikipedia_api(self, query):
+        """action=parse response for page=<title>, or the API's missingtitle error"""
+        title = query.get('page', [''])[0]
+        if not title:
+            body = {'error': {'code': 'missingtitle', 'info': "The page you specified doesn't exist."}}
+        else:
+            body = wikipedia_parse(title.replace('_', ' '))
+        return 'application/json; charset=utf-8', json.dumps(body).encode('utf-8')
+
+    def render_document(self, path):
+        """(content type, body) of an HTML page, or None for an unknown path"""
+        if path == ROC_PAGE_PATH:
+            columns = [field.replace('_', ' ').title() for field in COMPANY_FIELDS]
+            page = roc_page(sorted(self.state_rows()), columns, self.page_sizes)
+        elif path.startswith(WIKIPEDIA_PATH) and len(path) > len(WIKIPEDIA_PATH):
+            page = wikipedia_page(unquote(path[len(WIKIPEDIA_PATH):]).replace('_', ' '))
+        elif path == LEADERSHIP_PATH:
+            page = leadership_page(self.render_delay)
+        else:
+            return None
+        return 'text/html; charset=utf-8', page.encode('utf-8')
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; avoid Nagle stalls on keep-alive
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+
+                parsed = urlparse(self.path)
+                path = parsed.path.rstrip('/')
+                renders = {
+                    RESOURCE_PATH: server.render_page,
+                    ROC_DATA_PATH: server.render_table_page,
+                    WIKIPEDIA_API_PATH: server.render_wikipedia_api
+                }
+                if path in renders:
+                    # Data requests pay the API latency, page loads the document latency
+                    if server.latency:
+                        time.sleep(server.latency)
+                    content_type, body = renders[path](parse_qs(parsed.query))
+                else:
+                    if server.page_latency:
+                        time.sleep(server.page_latency)
+                    document = server.render_document(path)
+                    if document is None:
+                        self.send_error(404)
+                        return
+                    content_type, body = document
+
+                etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                if self.not_modified(etag):
+                    with server._lock:
+                        server.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', server.last_modified)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', server.last_modified)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def not_modified(self, etag):
+                """Whether a conditional request's validators match; If-None-Match wins when both are sent"""
+                if_none_match = self.headers.get('If-None-Match')
+                if if_none_match:
+                    return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+                if_modified_since = self.headers.get('If-Modified-Since')
+                if if_modified_since:
+                    try:
+                        return parsedate_to_datetime(if_modified_since) >= parsedate_to_datetime(server.last_modified)
+                    except (TypeError, ValueError):
+                        return False
+                return False
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded ROC fixtures over HTTP")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every data response")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="seconds added to every HTML page load")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=list(DEFAULT_PAGE_SIZES),
+                        help="length menu of the ROC table")
+    parser.add_argument("--synthetic", type=int, help="serve this many synthetic rows per state")
+    args = parser.parse_args()
+
+    records = load_fixture_records(args.fixture)
+    if args.synthetic:
+        records = synthetic_records(records, args.synthetic)
+    server = FixtureServer(records=records, port=args.port, latency=args.latency,
+                           page_latency=args.page_latency, page_sizes=args.page_sizes)
+    print(f"Serving {len(server.records)} records at {server.resource_url}")
+    print(f"ROC page: {server.roc_url}, Wikipedia: {server.wikipedia_url}<Title> (API {server.wikipedia_api_url}), "
+          f"leadership: {server.leadership_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
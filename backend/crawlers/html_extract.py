@@ -0,0 +1,484 @@
+"""Browserless extraction from saved HTML
+
+Regex-tokenizer versions of the crawler's DOM readers (see MarkupScanner
+below), used to re-run extraction over cached page snapshots (page_cache.py)
+and to read Wikipedia over plain HTTP (wikipedia_http.py) without a browser:
+
+    extract_table_rows     cell texts of the ROC preview table, the same rows
+                           ROCCompanyCrawler.EXTRACT_TABLE_SCRIPT returns
+    extract_companies      those rows mapped to the company dict schema
+    extract_infobox_field  the entries of one Wikipedia infobox field, like
+                           sel.extract_infobox_field_selenium
+    infobox_index          infobox rows (from either path) as one normalized
+                           label -> entries mapping; infobox_profile reads
+                           the company fields from it by lookup
+    extract_board_members  the "Board of directors" section as name/role
+                           entries, like sel.extract_board_members_selenium
+
+Text is read the way innerText renders it: runs of whitespace collapse,
+<br> and block elements break lines, and cells hidden with an inline
+display:none read as empty.
+
+The input is a browser-serialized DOM (driver.page_source) or MediaWiki
+output, so every element is closed and well nested. That lets MarkupScanner
+tokenize with one regex and leave attributes as raw strings; it is several
+times faster than html.parser.HTMLParser on large tables and has the same
+handler interface.
+"""
+import html as html_entities
+import re
+
+from company_schema import MIN_COLUMNS, row_to_company
+
+# Elements whose boundaries start a new line in innerText
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset', 'figcaption',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main',
+    'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul'
+}
+
+# Elements with no closing tag
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Content that innerText never shows
+SKIPPED_TAGS = {'script', 'style', 'template', 'noscript'}
+
+# Comments, doctype/processing instructions, or a start/end tag with its raw attributes
+_TOKEN = re.compile(r'<(?:!--.*?-->|[!?][^>]*>|(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>)',
+                    re.DOTALL)
+_HIDDEN = re.compile(r'(?:^|\s)hidden(?=[\s=/]|$)|style\s*=\s*(?:"[^"]*|\'[^\']*)display\s*:\s*none', re.IGNORECASE)
+_SPACES = re.compile(r'[ \t\r\n\f]+')
+_ATTRIBUTES = {}
+
+
+def _hidden(attrs):
+    return bool(_HIDDEN.search(attrs))
+
+
+def attribute(attrs, name):
+    """Value of one attribute in a raw attribute string, or None"""
+    pattern = _ATTRIBUTES.get(name)
+    if pattern is None:
+        pattern = _ATTRIBUTES[name] = re.compile(
+            rf'(?:^|\s){name}\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+    match = pattern.search(attrs)
+    if not match:
+        return None
+    return html_entities.unescape(next(value for value in match.groups() if value is not None))
+
+
+class MarkupScanner:
+    """Regex tokenizer calling HTMLParser-style handlers; attrs is the raw attribute string"""
+
+    def feed(self, markup):
+        position = 0
+        search = _TOKEN.search
+        while True:
+            match = search(markup, position)
+            if not match:
+                break
+            if match.start() > position:
+                self.handle_data(markup[position:match.start()])
+            position = match.end()
+
+            tag = match.group(2)
+            if not tag:
+                continue
+            tag = tag.lower()
+            if match.group(1):
+                self.handle_endtag(tag)
+                continue
+
+            attrs = match.group(3)
+            if attrs.endswith('/'):
+                self.handle_startendtag(tag, attrs)
+            else:
+                self.handle_starttag(tag, attrs)
+
+            # Script and style bodies are raw text that may contain "<"
+            if tag in ('script', 'style'):
+                end = markup.find(f'</{tag}', position)
+                if end != -1:
+                    position = end
+        if position < len(markup):
+            self.handle_data(markup[position:])
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, or a self-closed element of inline SVG/MathML
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def close(self):
+        pass
+
+
+class TextCollector:
+    """innerText-like text of one element, built from parser events"""
+
+    def __init__(self):
+        self.parts = []
+
+    def data(self, text):
+        self.parts.append(text)
+
+    def line_break(self):
+        self.parts.append('\n')
+
+    def text(self):
+        text = ''.join(self.parts)
+        if '&' in text:
+            text = html_entities.unescape(text)
+        lines = [_SPACES.sub(' ', line).strip() for line in text.split('\n')]
+        return '\n'.join(line for line in lines if line)
+
+
+class TableRowParser(MarkupScanner):
+    """Rows of cell texts for every <tbody> in a serialized DOM (all end tags present)"""
+
+    def __init__(self):
+        self.bodies = []
+        self._body = None
+        self._row = None
+        self._cell = None
+        self._cell_tag = None
+        self._cell_depth = 0
+        self._skip_depth = 0
+        self._hidden_cell = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._skip_depth:
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = 1
+            return
+
+        if tag == 'tbody' and self._body is None:
+            self._body = {'role': attribute(attrs, 'role'), 'rows': []}
+        elif tag == 'tr' and self._body is not None and self._cell is None:
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None and self._cell is None:
+            self._cell = TextCollector()
+            self._cell_depth = 1
+            self._hidden_cell = tag == 'td' and _hidden(attrs)
+            self._cell_tag = tag
+        elif self._cell is not None:
+            if tag not in VOID_TAGS:
+                self._cell_depth += 1
+            if tag == 'br' or tag in BLOCK_TAGS:
+                self._cell.line_break()
+
+    def handle_endtag(self, tag):
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+
+        if self._cell is not None:
+            if tag in VOID_TAGS:
+                return
+            self._cell_depth -= 1
+            if tag in BLOCK_TAGS:
+                self._cell.line_break()
+            if self._cell_depth == 0:
+                self._close_cell()
+            return
+        if tag == 'tr' and self._row is not None:
+            self._body['rows'].append(self._row)
+            self._row = None
+        elif tag == 'tbody' and self._body is not None:
+            self.bodies.append(self._body)
+            self._body = None
+
+    def handle_data(self, data):
+        if self._cell is not None and not self._skip_depth:
+            self._cell.data(data)
+
+    def _close_cell(self):
+        # Only <td> cells are read, as in the extraction script
+        if self._cell_tag == 'td':
+            self._row.append('' if self._hidden_cell else self._cell.text())
+        self._cell = None
+
+    def close(self):
+        if self._body is not None:
+            if self._row is not None:
+                self._body['rows'].append(self._row)
+            self.bodies.append(self._body)
+            self._body = None
+
+
+def extract_table_rows(html):
+    """Cell texts of the ROC table body (DataTables' rowgroup first, else the first <tbody>)"""
+    parser = TableRowParser()
+    parser.feed(html)
+    parser.close()
+    if not parser.bodies:
+        return None
+    for body in parser.bodies:
+        if body['role'] == 'rowgroup':
+            return body['rows']
+    return parser.bodies[0]['rows']
+
+
+def extract_companies(html, scraped_at=None):
+    """Company dicts from a snapshot of the ROC preview page"""
+    rows = extract_table_rows(html) or []
+    return [row_to_company(cells, scraped_at) for cells in rows if len(cells) >= MIN_COLUMNS]
+
+
+class InfoboxParser(MarkupScanner):
+    """(header text, data text) pairs of the first table.infobox"""
+
+    def __init__(self):
+        self.rows = []
+        self._table_depth = 0
+        self._done = False
+        self._header = None
+        self._data = None
+        self._current = None
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if self._skip_depth:
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        if tag in SKIPPED_TAGS or (self._table_depth and _hidden(attrs)):
+            self._skip_depth = 0 if tag in VOID_TAGS else 1
+            return
+
+        if tag == 'table':
+            classes = (attribute(attrs, 'class') or '').split()
+            if self._table_depth or 'infobox' in classes:
+                self._table_depth += 1
+            return
+        if not self._table_depth:
+            return
+
+        # Only the infobox's own rows; nested tables are read as text
+        if tag == 'tr' and self._table_depth == 1:
+            self._header, self._data, self._current = None, None, None
+        elif tag == 'th' and self._table_depth == 1 and self._header is None:
+            self._current = self._header = TextCollector()
+        elif tag == 'td' and self._table_depth == 1 and self._data is None:
+            self._current = self._data = TextCollector()
+        elif self._current is not None and (tag == 'br' or tag in BLOCK_TAGS):
+            self._current.line_break()
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if not self._table_depth:
+            return
+
+        if tag == 'table':
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._done = True
+            elif self._current is not None:
+                self._current.line_break()
+        elif self._table_depth == 1 and tag in ('th', 'td'):
+            self._current = None
+        elif self._table_depth == 1 and tag == 'tr':
+            if self._header is not None and self._data is not None:
+                self.rows.append((self._header.text(), self._data.text()))
+            self._header, self._data, self._current = None, None, None
+        elif self._current is not None and tag in BLOCK_TAGS:
+            self._current.line_break()
+
+    def handle_data(self, data):
+        if self._current is not None and not self._skip_depth and not self._done:
+            self._current.data(data)
+
+
+def extract_infobox_rows(html):
+    """(label, text) rows of a Wikipedia page's infobox"""
+    parser = InfoboxParser()
+    parser.feed(html)
+    parser.close()
+    return parser.rows
+
+
+def extract_infobox_field(html, label, rows=None):
+    """Entries of the first infobox row whose header contains label"""
+    for header, text in rows if rows is not None else extract_infobox_rows(html):
+        if label.lower() in header.lower():
+            return [entry.strip() for entry in text.split('\n') if entry.strip()]
+    return []
+
+
+# Profile keys read from the infobox, with the row label each comes from
+INFOBOX_PROFILE_FIELDS = {
+    'employees_key_people': 'Key people',
+    'subsidiaries': 'Subsidiaries'
+}
+
+
+def normalize_label(label):
+    return _SPACES.sub(' ', label.replace('\xa0', ' ')).strip().lower()
+
+
+def infobox_index(rows):
+    """Normalized label -> entries for (header, text) infobox rows; the first row of a label wins"""
+    index = {}
+    for header, text in rows:
+        label = normalize_label(header)
+        if label and label not in index:
+            index[label] = [entry.strip() for entry in text.split('\n') if entry.strip()]
+    return index
+
+
+def infobox_lookup(index, label):
+    """Entries of the first label containing label, in infobox order like the row-by-row lookup"""
+    label = normalize_label(label)
+    for key, entries in index.items():
+        if label in key:
+            return entries
+    return []
+
+
+def infobox_profile(index):
+    """The company profile fields of an infobox index; key people are grouped with their roles"""
+    profile = {key: infobox_lookup(index, label) for key, label in INFOBOX_PROFILE_FIELDS.items()}
+    profile['employees_key_people'] = group_name_roles(profile['employees_key_people'])
+    return profile
+
+
+def group_name_roles(flat_list):
+    """Group names with their roles"""
+    grouped = []
+    i = 0
+    while i < len(flat_list):
+        name = flat_list[i]
+        role = None
+        if i + 1 < len(flat_list) and flat_list[i + 1].startswith("("):
+            role = flat_list[i + 1].strip("()")
+            i += 2
+        else:
+            i += 1
+        grouped.append({
+            "name": name,
+            "role": role if role else "Unknown"
+        })
+    return grouped
+
+
+class SectionParser(MarkupScanner):
+    """Texts of the elements following the first h2/h3 whose text contains a title, up to the next heading
+
+    Like walking nextElementSibling from the heading. A heading wrapped in the
+    newer <div class="mw-heading"> markup is walked from its wrapper instead.
+    """
+
+    def __init__(self, title):
+        self.title = title.lower()
+        self.sections = []
+        self._stack = []
+        self._heading = None
+        self._heading_depth = None
+        self._anchor_depth = None
+        self._current = None
+        self._skip_depth = 0
+        self._done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        if self._skip_depth:
+            if tag not in VOID_TAGS:
+                self._skip_depth += 1
+            return
+        in_section = self._current is not None or len(self._stack) == self._anchor_depth
+        if tag in SKIPPED_TAGS or (in_section and _hidden(attrs)):
+            self._skip_depth = 0 if tag in VOID_TAGS else 1
+            return
+
+        wrapper = tag == 'div' and 'mw-heading' in (attribute(attrs, 'class') or '')
+        if self._anchor_depth is not None and len(self._stack) == self._anchor_depth:
+            # A sibling of the anchor: the next heading ends the section
+            if tag in ('h2', 'h3') or wrapper:
+                self._done = True
+                return
+            self._current = TextCollector()
+            self.sections.append(self._current)
+        elif self._current is not None and (tag == 'br' or tag in BLOCK_TAGS):
+            self._current.line_break()
+
+        if tag in VOID_TAGS:
+            return
+        self._stack.append((tag, wrapper))
+        if tag in ('h2', 'h3') and self._anchor_depth is None and self._heading is None:
+            self._heading = TextCollector()
+            self._heading_depth = len(self._stack)
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, _ = self._stack.pop()
+            if open_tag == tag:
+                break
+
+        depth = len(self._stack)
+        if self._heading is not None and depth < self._heading_depth:
+            if self.title in self._heading.text().lower():
+                # Walk from the mw-heading wrapper when there is one
+                wrapped = self._stack and self._stack[-1][1]
+                self._anchor_depth = depth - 1 if wrapped else depth
+            self._heading = None
+        elif self._anchor_depth is not None:
+            if depth < self._anchor_depth:
+                # The section's parent closed
+                self._done = True
+            elif depth == self._anchor_depth:
+                self._current = None
+            elif self._current is not None and tag in BLOCK_TAGS:
+                self._current.line_break()
+
+    def handle_data(self, data):
+        if self._skip_depth or self._done:
+            return
+        if self._heading is not None:
+            self._heading.data(data)
+        elif self._current is not None:
+            self._current.data(data)
+
+
+def extract_section_texts(html, title):
+    """innerText of each element in the section under the heading containing title"""
+    parser = SectionParser(title)
+    parser.feed(html)
+    parser.close()
+    return [section.text() for section in parser.sections]
+
+
+def board_members_from_text(texts):
+    """Name/role entries from "Name - Role" lines; a line without a dash has an empty role"""
+    members = []
+    for text in texts:
+        for line in text.split('\n'):
+            if not line.strip():
+                continue
+            if '-' in line:
+                name, role = line.split('-', 1)
+                members.append({"name": name.strip(), "role": role.strip()})
+            else:
+                members.append({"name": line.strip(), "role": ""})
+    return members
+
+
+def extract_board_members(html):
+    """Board of directors entries of a Wikipedia page"""
+    return board_members_from_text(extract_section_texts(html, 'board of directors'))
@@ -0,0 +1,313 @@
+"""Persistent HTTP cache with conditional revalidation for the enrichment crawlers
+
+Wikipedia articles and the TCS leadership page rarely change between runs,
+so HttpCache keeps each GET response on disk with its ETag and Last-Modified
+validators:
+
+    entries/ab/abcd....json      url, validators, fetch and validation times,
+                                 content type, and results derived from the body
+    entries/ab/abcd....body.gz   gzip-compressed response body
+
+A response younger than ttl seconds is served without a request (a hit).
+An older one is revalidated with If-None-Match / If-Modified-Since; a 304
+answer refreshes it without transferring the body again. A server without
+working validators that resends the same body refreshes it the same way,
+taking the validators of the new response.
+
+Results derived from a body (e.g. a profile scraped from the page in Chrome)
+can be stored next to it with set_derived(). They are dropped when the body
+changes, so a caller can skip its browser work while the page is unchanged.
+A page assembled by scripts can change while its HTML does not, so results
+from such a page are read with a max_age after which they are scraped again.
+
+    python http_cache.py stats http_cache
+    python http_cache.py clear http_cache
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from urllib.parse import urlencode
+
+from http_session import get_shared_pool
+from rate_limiter import THROTTLE_STATUSES, get_shared_limiter
+
+
+def cache_key(url, fields=None):
+    """Identity of a GET: the URL with its query fields in a stable order"""
+    if fields:
+        url = f"{url}?{urlencode(sorted(fields.items()))}"
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class CachedResponse:
+    """Status, body and headers of a GET, with where the body came from
+
+    source is 'hit' (fresh in the cache), 'revalidated' (a 304, or the same body
+    resent by a server without working validators), 'changed' (a new body
+    replaced a stale entry), 'miss' (no entry) or 'uncached' (a response that is
+    not stored, such as an error status). digest identifies the stored body, so
+    derived results can be read and stored for exactly this body.
+    """
+
+    def __init__(self, status, data, headers, source, digest=None):
+        self.status = status
+        self.data = data
+        self.headers = headers
+        self.source = source
+        self.digest = digest
+
+    @property
+    def unchanged(self):
+        """True when the body is the one stored by an earlier request"""
+        return self.source in ('hit', 'revalidated')
+
+
+class HttpCache:
+    """On-disk GET cache with ETag/Last-Modified revalidation and a freshness TTL"""
+
+    def __init__(self, directory='http_cache', ttl=3600, pool=None, compresslevel=6):
+        self.directory = directory
+        self.ttl = ttl
+        self.pool = pool
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        # Held while an entry's files are read or replaced, so its meta and body always match
+        self._entry_lock = threading.Lock()
+        # not_modified counts revalidations that found the stored body current:
+        # 304 answers and identical bodies resent in full
+        self.counters = {
+            'hits': 0,
+            'misses': 0,
+            'revalidations': 0,
+            'not_modified': 0,
+            'changed': 0,
+            'uncached': 0,
+            'bytes_downloaded': 0,
+            'bytes_from_cache': 0
+        }
+        os.makedirs(os.path.join(directory, 'entries'), exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, 'entries', key[:2], key)
+        return f"{base}.json", f"{base}.body.gz"
+
+    def _write(self, path, data):
+        # Write under a unique name and rename, so a reader never sees half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _load_meta(self, key):
+        meta_path, body_path = self._paths(key)
+        if not os.path.exists(meta_path) or not os.path.exists(body_path):
+            return None
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            return None
+
+    def _save_meta(self, key, meta):
+        self._write(self._paths(key)[0], json.dumps(meta).encode('utf-8'))
+
+    def _load_body(self, key):
+        with open(self._paths(key)[1], 'rb') as f:
+            return gzip.decompress(f.read())
+
+    def _load_entry(self, key):
+        """(meta, body) of an entry read together, or (None, None)"""
+        with self._entry_lock:
+            meta = self._load_meta(key)
+            if meta is None:
+                return None, None
+            return meta, self._load_body(key)
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self.counters[name] += value
+
+    def _send(self, url, fields, headers):
+        """Rate-limited GET over the shared pool; the default sender"""
+        limiter = get_shared_limiter()
+        pool = self.pool or get_shared_pool()
+        with limiter.request(url) as ticket:
+            response = pool.request('GET', url, fields=fields, headers=headers)
+            ticket['ok'] = response.status not in THROTTLE_STATUSES
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            limiter.pause(url, int(retry_after))
+        return response
+
+    def get(self, url, fields=None, send=None):
+        """CachedResponse for a GET, served from disk while fresh and revalidated once stale
+
+        send(url, fields, headers) performs the request and returns a urllib3
+        response; by default it is a rate-limited GET over the shared pool.
+        """
+        send = send or self._send
+        key = cache_key(url, fields)
+        meta, body = self._load_entry(key)
+
+        if meta and time.time() - meta['validated_at'] < self.ttl:
+            self._count(hits=1, bytes_from_cache=len(body))
+            return CachedResponse(200, body, self._headers(meta), 'hit', meta['digest'])
+
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        response = send(url, fields, headers or None)
+
+        if meta and response.status == 304:
+            # The server may send updated validators with a 304
+            meta = self._refresh(key, meta, response.headers, complete=False)
+            self._count(revalidations=1, not_modified=1, bytes_from_cache=len(body))
+            return CachedResponse(200, body, self._headers(meta), 'revalidated', meta['digest'])
+
+        data = response.data
+        self._count(bytes_downloaded=len(data), revalidations=1 if meta else 0, misses=0 if meta else 1)
+        if response.status != 200 or 'no-store' in (response.headers.get('Cache-Control') or ''):
+            self._count(uncached=1)
+            return CachedResponse(response.status, data, response.headers, 'uncached')
+
+        digest = hashlib.sha256(data).hexdigest()
+        if meta and meta['digest'] == digest:
+            # The same body resent in full: keep what was derived from it, and take the
+            # response's validators so the next revalidation can be answered with a 304
+            self._refresh(key, meta, response.headers, complete=True)
+            self._count(not_modified=1)
+            return CachedResponse(200, data, response.headers, 'revalidated', digest)
+
+        self._store(key, url, fields, data, digest, response.headers)
+        self._count(changed=1 if meta else 0)
+        return CachedResponse(200, data, response.headers, 'changed' if meta else 'miss', digest)
+
+    def _headers(self, meta):
+        headers = {'ETag': meta.get('etag'), 'Last-Modified': meta.get('last_modified'),
+                   'Content-Type': meta.get('content_type')}
+        return {name: value for name, value in headers.items() if value}
+
+    def _refresh(self, key, meta, headers, complete):
+        """Mark an entry revalidated with the response's validators; complete replaces absent ones too
+
+        An entry replaced by another request in the meantime is left alone.
+        """
+        with self._entry_lock:
+            current = self._load_meta(key)
+            if current is None or current['digest'] != meta['digest']:
+                return meta
+            for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified'),
+                                  ('content_type', 'Content-Type')):
+                if complete or headers.get(header):
+                    current[field] = headers.get(header)
+            current['validated_at'] = time.time()
+            self._save_meta(key, current)
+            return current
+
+    def _store(self, key, url, fields, body, digest, headers):
+        """Store a new body; results derived from the old one are dropped with it"""
+        now = time.time()
+        with self._entry_lock:
+            # Meta first: until the body lands, a reader sees the new digest with nothing derived
+            self._save_meta(key, {
+                'url': url,
+                'fields': fields,
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'content_type': headers.get('Content-Type'),
+                'digest': digest,
+                'bytes': len(body),
+                'fetched_at': now,
+                'validated_at': now,
+                'derived': {},
+                'derived_at': {}
+            })
+            self._write(self._paths(key)[1], gzip.compress(body, self.compresslevel))
+
+    def derived(self, url, name, fields=None, digest=None, max_age=None):
+        """A result stored with set_derived for the current body of url (and that body is digest), or None
+
+        With max_age, a result stored more than max_age seconds ago counts as missing.
+        """
+        with self._entry_lock:
+            meta = self._load_meta(cache_key(url, fields))
+        if meta is None or (digest and meta['digest'] != digest):
+            return None
+        if max_age is not None and time.time() - meta.get('derived_at', {}).get(name, 0) >= max_age:
+            return None
+        return meta['derived'].get(name)
+
+    def set_derived(self, url, name, value, fields=None, digest=None):
+        """Store a JSON-serializable result derived from the current body of url; digest names that body
+
+        Returns False when there is no entry or its body is no longer the one digest names.
+        """
+        key = cache_key(url, fields)
+        with self._entry_lock:
+            meta = self._load_meta(key)
+            if meta is None or (digest and meta['digest'] != digest):
+                return False
+            meta['derived'][name] = value
+            meta.setdefault('derived_at', {})[name] = time.time()
+            self._save_meta(key, meta)
+        return True
+
+    def stats(self):
+        """Request counters of this process, with the hit ratio over all lookups"""
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = stats['hits'] + stats['misses'] + stats['revalidations']
+        served = stats['hits'] + stats['not_modified']
+        stats['hit_ratio'] = round(served / lookups, 3) if lookups else None
+        return stats
+
+    def disk_usage(self):
+        """Entry and byte counts of the cache directory"""
+        entries = 0
+        body_bytes = 0
+        stored_bytes = 0
+        for root, _, files in os.walk(os.path.join(self.directory, 'entries')):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith('.json'):
+                    entries += 1
+                    try:
+                        with open(path, encoding='utf-8') as f:
+                            body_bytes += json.load(f).get('bytes', 0)
+                    except ValueError:
+                        continue
+                stored_bytes += os.path.getsize(path)
+        return {'entries': entries, 'body_bytes': body_bytes, 'stored_bytes': stored_bytes}
+
+    def clear(self):
+        """Remove every entry"""
+        shutil.rmtree(os.path.join(self.directory, 'entries'), ignore_errors=True)
+        os.makedirs(os.path.join(self.directory, 'entries'), exist_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear an HTTP cache directory")
+    parser.add_argument("command", choices=["stats", "clear"])
+    parser.add_argument("directory")
+    args = parser.parse_args()
+
+    cache = HttpCache(args.directory)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {args.directory}")
+    else:
+        print(json.dumps(cache.disk_usage(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
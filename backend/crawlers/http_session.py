@@ -0,0 +1,41 @@
+"""Pooled keep-alive HTTP connections shared by the browserless crawler engines
+
+urllib3 is already installed as a dependency of selenium, so the HTTP engines
+use its PoolManager directly: connections are kept alive and reused per host,
+and one manager is safe to share between worker threads.
+"""
+import threading
+
+import urllib3
+
+# Same identity the Selenium crawlers present
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def create_pool(max_connections=10, timeout=30, retries=2):
+    """Create a keep-alive connection pool with retries on transient errors"""
+    return urllib3.PoolManager(
+        num_pools=20,
+        maxsize=max_connections,
+        block=True,
+        headers={'User-Agent': USER_AGENT, 'Accept-Encoding': 'gzip, deflate'},
+        timeout=urllib3.Timeout(connect=min(timeout, 10), read=timeout),
+        retries=urllib3.Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+    )
+
+
+def get_shared_pool():
+    """Process-wide pool for callers that do not manage their own"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = create_pool()
+        return _shared_pool
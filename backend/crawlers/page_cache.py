@@ -0,0 +1,207 @@
+"""Content-addressed cache of fetched page snapshots with offline re-parse
+
+The crawlers can store the DOM of every page they extract from, so a
+changed field mapping is applied by re-parsing the cache instead of
+browsing the sites again:
+
+    objects/ab/abcd...html.gz   gzip-compressed HTML named by its SHA-256; a
+                                page seen twice is stored once
+    index.ndjson                one line per fetch: digest, url, kind
+                                ('roc', 'wikipedia'), state, page, key, the
+                                offset of the page's first row and the fetch
+                                time
+
+Re-parsing runs html_extract's parsers (a regex tokenizer, MarkupScanner,
+not a browser) over a process pool and writes the same {state: [company,
+...]} JSON the crawler saves, with each row's scraped_at set to the time its
+page was fetched:
+
+    python page_cache.py reparse page_cache --workers 4 --output companies.json
+    python page_cache.py reparse page_cache --kind wikipedia --output infoboxes.json
+    python page_cache.py stats page_cache
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from html_extract import extract_companies, extract_infobox_rows, infobox_index
+
+
+def object_path(directory, digest):
+    return os.path.join(directory, 'objects', digest[:2], f"{digest}.html.gz")
+
+
+def read_object(directory, digest):
+    """HTML of a stored snapshot"""
+    with open(object_path(directory, digest), 'rb') as f:
+        return gzip.decompress(f.read()).decode('utf-8')
+
+
+class PageCache:
+    """Append-only store of compressed page snapshots indexed by URL, state and page"""
+
+    def __init__(self, directory='page_cache', compresslevel=6):
+        self.directory = directory
+        self.compresslevel = compresslevel
+        self.index_path = os.path.join(directory, 'index.ndjson')
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+
+    def object_path(self, digest):
+        return object_path(self.directory, digest)
+
+    def put(self, html, url, kind, state=None, page=None, key=None, offset=None):
+        """Store a snapshot and index it; returns its digest"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write under a unique name and rename, so a reader never sees half an object
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(gzip.compress(data, self.compresslevel))
+            os.replace(temp_path, path)
+
+        entry = {
+            'digest': digest,
+            'url': url,
+            'kind': kind,
+            'state': state,
+            'page': page,
+            'key': key,
+            'offset': offset,
+            'bytes': len(data),
+            'fetched_at': datetime.now().isoformat()
+        }
+        with self._lock:
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+        return digest
+
+    def get(self, digest):
+        """HTML of a stored snapshot"""
+        return read_object(self.directory, digest)
+
+    def entries(self, kind=None):
+        """Latest index entry per (kind, url, state, row offset or page, key), in fetch order"""
+        if not os.path.exists(self.index_path):
+            return []
+
+        latest = {}
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash can leave a torn last line
+                    continue
+                if kind and entry['kind'] != kind:
+                    continue
+                # Rows are placed by offset, so runs with different page lengths do not overwrite each other
+                position = entry['offset'] if entry.get('offset') is not None else entry['page']
+                identity = (entry['kind'], entry['url'], entry['state'], position, entry['key'])
+                latest.pop(identity, None)
+                latest[identity] = entry
+        return list(latest.values())
+
+    def stats(self):
+        """Entry, object and byte counts of the cache"""
+        entries = self.entries()
+        digests = {entry['digest'] for entry in entries}
+        stored = sum(os.path.getsize(self.object_path(digest)) for digest in digests
+                     if os.path.exists(self.object_path(digest)))
+        kinds = {}
+        for entry in entries:
+            kinds[entry['kind']] = kinds.get(entry['kind'], 0) + 1
+        return {
+            'entries': len(entries),
+            'objects': len(digests),
+            'html_bytes': sum(entry['bytes'] for entry in entries),
+            'stored_bytes': stored,
+            'by_kind': kinds
+        }
+
+
+def _parse_entry(task):
+    """Parse one snapshot in a pool worker; returns (entry, result)"""
+    directory, entry = task
+    html = read_object(directory, entry['digest'])
+    if entry['kind'] == 'roc':
+        return entry, extract_companies(html, entry['fetched_at'])
+    return entry, infobox_index(extract_infobox_rows(html))
+
+
+def _assemble_state(pages):
+    """Rows of one state from its pages, dropping overlaps between runs with different page lengths"""
+    companies = []
+    for entry, page_companies in sorted(pages, key=lambda item: (item[0]['offset'] or 0, item[0]['page'] or 0)):
+        offset = entry['offset']
+        if offset is not None and offset < len(companies):
+            page_companies = page_companies[len(companies) - offset:]
+        companies.extend(page_companies)
+    return companies
+
+
+def reparse(cache, kind='roc', workers=None, chunksize=4):
+    """Re-run extraction over every cached page of a kind on a process pool"""
+    entries = cache.entries(kind)
+    tasks = [(cache.directory, entry) for entry in entries]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_parse_entry, tasks, chunksize=chunksize))
+
+    if kind != 'roc':
+        return {entry['key'] or entry['url']: rows for entry, rows in results}
+
+    by_state = {}
+    for entry, companies in results:
+        by_state.setdefault(entry['state'], []).append((entry, companies))
+    return {state: _assemble_state(pages) for state, pages in by_state.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract data from cached page snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    reparse_parser = commands.add_parser("reparse", help="re-run extraction over the cache")
+    reparse_parser.add_argument("directory")
+    reparse_parser.add_argument("--kind", choices=["roc", "wikipedia"], default="roc")
+    reparse_parser.add_argument("--workers", type=int, help="parser processes (default: one per CPU)")
+    reparse_parser.add_argument("--output", help="JSON file to write (default: reparsed_<kind>_<timestamp>.json)")
+
+    stats_parser = commands.add_parser("stats", help="summarize the cache")
+    stats_parser.add_argument("directory")
+    args = parser.parse_args()
+
+    cache = PageCache(args.directory)
+    if args.command == "stats":
+        print(json.dumps(cache.stats(), indent=2))
+        return
+
+    start = time.perf_counter()
+    data = reparse(cache, args.kind, args.workers)
+    elapsed = time.perf_counter() - start
+
+    output = args.output or f"reparsed_{args.kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+    if args.kind == "roc":
+        rows = sum(len(companies) for companies in data.values())
+        print(f"Re-extracted {rows} companies across {len(data)} states in {elapsed:.2f}s "
+              f"({rows / elapsed if elapsed else 0:.0f} rows/sec) -> {output}")
+    else:
+        print(f"Re-extracted {len(data)} infoboxes in {elapsed:.2f}s -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Per-host token-bucket rate limiter with AIMD rate adaptation
+
+Every request a crawler sends to a site takes one token from that host's
+bucket first. The bucket refills at the host's current rate, which adapts
+to how the site is coping:
+
+    additive increase       each fast, successful request raises the rate by
+                            increase / rate, i.e. about `increase` requests
+                            per second for every second of healthy traffic
+    multiplicative decrease a timeout, an error page (429/503, "Access
+                            denied", ...) or a response slower than
+                            slow_latency multiplies the rate by backoff
+
+A decrease only counts once per round: failures of requests that were
+already sent at the old rate are ignored, so a burst of concurrent timeouts
+halves the rate once instead of collapsing it. pause() honours Retry-After.
+
+One limiter is shared by every worker thread of the process:
+
+    limiter = get_shared_limiter()
+    with limiter.request(url) as ticket:
+        driver.get(url)
+        ticket['ok'] = not is_error_page(driver.title)
+"""
+import asyncio
+import logging
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+# (starting, maximum) requests per second per host; anything else gets DEFAULT_RATE
+HOST_RATES = {
+    'www.data.gov.in': (1.0, 4.0),
+    'data.gov.in': (1.0, 4.0),
+    'api.data.gov.in': (5.0, 20.0),
+    'en.wikipedia.org': (5.0, 20.0),
+    'www.tcs.com': (1.0, 4.0)
+}
+DEFAULT_RATE = (2.0, 8.0)
+
+# The offline fixture server is never throttled
+UNLIMITED_HOSTS = ('localhost', '127.0.0.1')
+
+# Status phrases and codes that make up the title of a throttling or error page
+# served with a normal load ("429 Too Many Requests", "Access denied | ...")
+ERROR_PAGE_MARKERS = (
+    'too many requests', 'service unavailable', 'service temporarily unavailable', 'temporarily unavailable',
+    'access denied', 'rate limited', 'rate limit exceeded', 'bad gateway', 'gateway timeout', 'forbidden',
+    'internal server error', 'wikimedia error'
+)
+ERROR_PAGE_STATUSES = ('403', '429', '500', '502', '503', '504')
+
+# A marker only counts at the start of the title and must end it or be followed by
+# a separator, so "Forbidden Planet - Wikipedia" or "NH 503" are ordinary pages
+_PHRASES = '|'.join(re.escape(marker) for marker in ERROR_PAGE_MARKERS)
+_STATUSES = '|'.join(ERROR_PAGE_STATUSES)
+ERROR_PAGE_TITLE = re.compile(
+    rf'^\s*(?:error\s*[-:]?\s*)?(?:(?:{_STATUSES})(?:\s*[-:]?\s*(?:{_PHRASES}))?|(?:{_PHRASES}))'
+    r'\s*(?:$|[-|:\u2013\u2014])',
+    re.IGNORECASE
+)
+
+# HTTP statuses that mean the site wants us to slow down
+THROTTLE_STATUSES = (429, 502, 503, 504)
+
+logger = logging.getLogger(__name__)
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def host_of(url_or_host):
+    """Host name of a URL, or the argument itself when it is already a host"""
+    if '//' in url_or_host:
+        return urlparse(url_or_host).hostname or ''
+    return url_or_host
+
+
+def is_error_page(title):
+    """True when a loaded page's title is that of a throttling or server error page"""
+    return bool(ERROR_PAGE_TITLE.match(title or ''))
+
+
+class HostBucket:
+    """Token bucket for one host whose refill rate follows AIMD"""
+
+    def __init__(self, host, rate, max_rate, min_rate=0.1, burst=2, increase=0.5, backoff=0.5,
+                 slow_latency=15.0):
+        self.host = host
+        self.rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.increase = increase
+        self.backoff = backoff
+        self.slow_latency = slow_latency
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.round = 0
+        self.requests = 0
+        self.failures = 0
+        self.decreases = 0
+        self.waited = 0.0
+        self.lowest_rate = rate
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token; returns (seconds to wait before sending, round the request belongs to)"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # Tokens go negative while callers queue up, which spaces them out at the rate
+            self.tokens -= 1
+            delay = max(-self.tokens / self.rate, self.blocked_until - now, 0.0)
+            self.requests += 1
+            self.waited += delay
+            return delay, self.round
+
+    def record(self, ticket_round, seconds, ok):
+        """Adapt the rate to how one request went"""
+        with self._lock:
+            if ok and seconds <= self.slow_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                return
+            if not ok:
+                self.failures += 1
+
+            # Requests sent before the last decrease already saw the old rate
+            if ticket_round < self.round:
+                return
+            self.round += 1
+            self.decreases += 1
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            self.lowest_rate = min(self.lowest_rate, self.rate)
+            logger.warning(f"Backing off {self.host} to {self.rate:.2f} req/s "
+                           f"({'failed' if not ok else f'slow: {seconds:.1f}s'})")
+
+    def pause(self, seconds):
+        """Send nothing to this host for the next seconds (e.g. Retry-After)"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def summary(self):
+        with self._lock:
+            return {
+                'rate': round(self.rate, 3),
+                'lowest_rate': round(self.lowest_rate, 3),
+                'requests': self.requests,
+                'failures': self.failures,
+                'decreases': self.decreases,
+                'waited_seconds': round(self.waited, 3)
+            }
+
+
+class RateLimiter:
+    """Host buckets shared by every crawler and worker thread"""
+
+    def __init__(self, host_rates=None, default_rate=DEFAULT_RATE, **bucket_options):
+        self.host_rates = dict(HOST_RATES)
+        self.host_rates.update(host_rates or {})
+        self.default_rate = default_rate
+        self.bucket_options = bucket_options
+        self.buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url_or_host):
+        """Bucket for a host (None for hosts that are never throttled)"""
+        host = host_of(url_or_host)
+        if host in UNLIMITED_HOSTS:
+            return None
+        with self._lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate, max_rate = self.host_rates.get(host, self.default_rate)
+                bucket = self.buckets[host] = HostBucket(host, rate, max_rate, **self.bucket_options)
+            return bucket
+
+    def _reserve(self, url_or_host, metrics):
+        bucket = self.bucket(url_or_host)
+        if bucket is None:
+            return None, 0.0, 0
+        delay, ticket_round = bucket.reserve()
+        if metrics:
+            metrics.observe('rate_wait', delay, host=bucket.host)
+        return bucket, delay, ticket_round
+
+    @contextmanager
+    def request(self, url_or_host, metrics=None):
+        """Wait for a token, then time the block; set ticket['ok'] = False on an error page"""
+        bucket, delay, ticket_round = self._reserve(url_or_host, metrics)
+        ticket = {'ok': True, 'waited': delay}
+        if bucket is None:
+            yield ticket
+            return
+        if delay:
+            time.sleep(delay)
+
+        start = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket['ok'] = False
+            raise
+        finally:
+            bucket.record(ticket_round, time.monotonic() - start, bool(ticket['ok']))
+
+    @asynccontextmanager
+    async def request_async(self, url_or_host, metrics=None):
+        """request() for coroutines: the wait for a token sleeps on the event loop"""
+        bucket, delay, ticket_round = self._reserve(url_or_host, metrics)
+        ticket = {'ok': True, 'waited': delay}
+        if bucket is None:
+            yield ticket
+            return
+        if delay:
+            await asyncio.sleep(delay)
+
+        start = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket['ok'] = False
+            raise
+        finally:
+            bucket.record(ticket_round, time.monotonic() - start, bool(ticket['ok']))
+
+    def pause(self, url_or_host, seconds):
+        """Hold back a host, e.g. for a Retry-After header"""
+        bucket = self.bucket(url_or_host)
+        if bucket:
+            bucket.pause(seconds)
+
+    def summary(self):
+        """Current rate and counters per host"""
+        with self._lock:
+            buckets = dict(self.buckets)
+        return {host: bucket.summary() for host, bucket in sorted(buckets.items())}
+
+
+def get_shared_limiter():
+    """Process-wide limiter so every crawler and worker paces the same hosts together"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -0,0 +1,303 @@
+"""Browserless engine for the ROC company master dataset
+
+The data.gov.in page that ROCCompanyCrawler drives through Chrome is a view
+over a paginated API resource. ROCHttpCrawler reads that resource directly:
+pages are requested concurrently over pooled keep-alive connections and the
+JSON or CSV payload is mapped straight to the company dict schema. It keeps
+the fetch_companies_by_state(state, max_pages) contract, so the serial and
+parallel state loops, CSV/JSON saving and statistics work unchanged.
+
+Offline run against the recorded fixtures:
+
+    python roc_http_engine.py --fixture --states "andaman and nicobar islands" assam
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from MasterDataCrawler import ROCCompanyCrawler
+from crawl_journal import CrawlJournal
+from delta_index import DeltaTracker, FingerprintIndex
+from crawl_sinks import create_sink
+from cin_dedup import CinDeduplicator
+from company_schema import CompanyRecord, record_to_company
+from http_session import create_pool
+from rate_limiter import THROTTLE_STATUSES
+
+DEFAULT_RESOURCE_URL = "https://api.data.gov.in/resource/" + os.environ.get("ROC_RESOURCE_ID", "")
+
+
+class ROCHttpCrawler(ROCCompanyCrawler):
+    """ROCCompanyCrawler that reads the dataset over HTTP instead of a browser"""
+
+    def __init__(self, resource_url=None, api_key=None, page_size=1000, max_concurrency=4,
+                 response_format='json', state_filter_field='CompanyStateCode', journal=None,
+                 delta=None, sink=None):
+        super().__init__(headless=True, journal=journal, delta=delta, sink=sink)
+        self.resource_url = resource_url or DEFAULT_RESOURCE_URL
+        self.api_key = api_key or os.environ.get("DATA_GOV_IN_API_KEY", "")
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.response_format = response_format
+        self.state_filter_field = state_filter_field
+        self.pool = None
+
+    def setup_driver(self):
+        """Open the keep-alive connection pool used in place of a browser"""
+        self.pool = create_pool(max_connections=self.max_concurrency)
+        self.logger.info(f"HTTP pool ready for {self.resource_url}")
+
+    def close_driver(self):
+        """Close pooled connections"""
+        if self.pool:
+            self.pool.clear()
+            self.pool = None
+            self.logger.info("HTTP pool closed")
+
+    def spawn_worker(self):
+        """Create an independent HTTP crawler for a parallel state worker"""
+        worker = ROCHttpCrawler(
+            resource_url=self.resource_url,
+            api_key=self.api_key,
+            page_size=self.page_size,
+            max_concurrency=self.max_concurrency,
+            response_format=self.response_format,
+            state_filter_field=self.state_filter_field
+        )
+        self.share_settings(worker)
+        return worker
+
+    def fetch_page(self, state_name, page_index, offset=None):
+        """Fetch one page of a state's records, from row offset if given; returns (total or None, companies)"""
+        if offset is None:
+            offset = page_index * self.page_size
+        fields = {
+            'format': self.response_format,
+            'offset': str(offset),
+            'limit': str(self.page_size),
+            f'filters[{self.state_filter_field}]': state_name
+        }
+        if self.api_key:
+            fields['api-key'] = self.api_key
+
+        with self.rate_limiter.request(self.resource_url, self.metrics) as ticket:
+            with self.metrics.span('fetch_page', state=state_name, page=page_index + 1):
+                response = self.pool.request('GET', self.resource_url, fields=fields)
+            ticket['ok'] = response.status not in THROTTLE_STATUSES
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            self.rate_limiter.pause(self.resource_url, int(retry_after))
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status} for page {page_index + 1} of {state_name}")
+
+        with self.metrics.span('parse', state=state_name, page=page_index + 1):
+            return self.parse_response(response.data, response.headers.get('Content-Type', ''))
+
+    def parse_response(self, body, content_type=''):
+        """Parse a JSON or CSV payload into (total or None, companies)"""
+        scraped_at = datetime.now().isoformat()
+        text = body.decode('utf-8-sig')
+
+        if 'csv' in content_type or self.response_format == 'csv':
+            records = list(csv.DictReader(io.StringIO(text)))
+            total = None
+        else:
+            payload = json.loads(text)
+            records = payload.get('records', [])
+            total = int(payload['total']) if payload.get('total') is not None else None
+
+        return total, [CompanyRecord.from_dict(record_to_company(record, scraped_at)) for record in records]
+
+    def resume_row(self, state_name, pages_done):
+        """Row offset a resumed state continues at
+
+        The journal counts rows, so a run with a different page_size than the
+        one that wrote it still continues right after the last journaled row.
+        """
+        return self.journal.rows_recorded(state_name) if pages_done else 0
+
+    def page_offsets(self, pages_done, first_row):
+        """Row offset of a page index, counting pages from the resume point"""
+        return lambda page_index: first_row + (page_index - pages_done) * self.page_size
+
+    def fit_page_size(self, state_name, total, offset, companies):
+        """Shrink page_size to what the API serves per request when it caps limit below it"""
+        if total is not None and 0 < len(companies) < self.page_size and offset + len(companies) < total:
+            self.logger.warning(f"The API served {len(companies)} rows of {state_name} for a limit of "
+                                f"{self.page_size}; continuing at that page size")
+            self.page_size = len(companies)
+
+    def page_end(self, total, offset, companies):
+        """True when a page holds a state's last row, None when it came up short of the total it promised"""
+        if total is None:
+            # Without a total only a short page tells where the state ends
+            return len(companies) < self.page_size
+        if offset + len(companies) >= total:
+            return True
+        return None if len(companies) < self.page_size else False
+
+    def record_http_page(self, state_name, all_companies, page_number, total, offset, companies):
+        """Record a fetched page into all_companies; returns page_end's verdict, True on an early stop too"""
+        kept = self.record_page(state_name, page_number, companies)
+        if not self.sink:
+            all_companies.extend(kept)
+        self.logger.info(f"Extracted {len(companies)} companies from page {page_number}")
+        if self.observe_page(state_name, companies):
+            self.logger.info(f"Stopping {state_name} early: reached a run of unchanged known companies")
+            return True
+        return self.page_end(total, offset, companies)
+
+    def fetch_companies_by_state(self, state_name, max_pages=None):
+        """Fetch all companies for a specific state over HTTP"""
+        self.logger.info(f"Starting to fetch companies for state: {state_name}")
+
+        all_companies, pages_done = self.resume_state(state_name)
+        if pages_done and (self.journal.is_complete(state_name) or
+                           (max_pages and pages_done >= max_pages)):
+            self.logger.info(f"Loaded {len(all_companies)} journaled companies for {state_name}")
+            return all_companies
+
+        try:
+            # Continue at the first row the journal does not have
+            offset_of = self.page_offsets(pages_done, self.resume_row(state_name, pages_done))
+            total, companies = self.fetch_page(state_name, pages_done, offset_of(pages_done))
+            self.fit_page_size(state_name, total, offset_of(pages_done), companies)
+            ended = self.record_http_page(state_name, all_companies, pages_done + 1, total,
+                                          offset_of(pages_done), companies)
+            if ended is False and max_pages != pages_done + 1:
+                ended = self._fetch_remaining_pages(state_name, all_companies, total, max_pages, pages_done + 1,
+                                                    offset_of)
+
+            # A state cut short by max_pages stays open so a later run can continue it
+            if ended:
+                self.complete_state(state_name)
+            elif ended is None:
+                self.interrupt_state(state_name, f"the API served fewer than its {total} rows")
+
+        except Exception as e:
+            # Pages recorded before the failure are already in all_companies
+            self.logger.error(f"Error fetching companies for {state_name}: {e}")
+
+        self.logger.info(f"Total companies fetched for {state_name}: {len(all_companies)}")
+        return all_companies
+
+    def _fetch_remaining_pages(self, state_name, all_companies, total, max_pages, first_page, offset_of):
+        """Fetch the pages from index first_page on concurrently into all_companies; returns page_end's verdict"""
+        if total is not None:
+            # Pages up to the one holding the last row, counted from wherever the state resumed
+            page_count = first_page + max(0, -(-(total - offset_of(first_page)) // self.page_size))
+        else:
+            page_count = None
+        if max_pages:
+            page_count = min(page_count, max_pages) if page_count is not None else max_pages
+
+        next_page = first_page
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # One window of concurrent requests at a time, so an incremental crawl
+            # can stop without having fetched far past the point it stopped at
+            while page_count is None or next_page < page_count:
+                window_end = next_page + self.max_concurrency
+                if page_count is not None:
+                    window_end = min(window_end, page_count)
+                pages = list(range(next_page, window_end))
+                results = executor.map(lambda page: self.fetch_page(state_name, page, offset_of(page)), pages)
+
+                # Results arrive in page order, so the journal always holds a contiguous prefix
+                for page, (_, page_companies) in zip(pages, results):
+                    ended = self.record_http_page(state_name, all_companies, page + 1, total, offset_of(page),
+                                                  page_companies)
+                    if ended is not False:
+                        return ended
+
+                next_page = window_end
+
+        # Only max_pages stops the loop before the last row
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch ROC company master data over HTTP")
+    parser.add_argument("--states", nargs="+", help="states to fetch (default: all)")
+    parser.add_argument("--fixture", action="store_true", help="serve recorded fixtures locally instead of data.gov.in")
+    parser.add_argument("--latency", type=float, default=0.0, help="fixture server latency per request")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent page requests per state")
+    parser.add_argument("--workers", type=int, default=1, help="states fetched in parallel")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--max-pages", type=int)
+    parser.add_argument("--journal", help="directory of a resumable crawl journal")
+    parser.add_argument("--index", help="CIN index file for an incremental crawl (updated in place)")
+    parser.add_argument("--sink", choices=["ndjson", "parquet"], help="stream rows to a combined file and per-state CSVs")
+    parser.add_argument("--stop-after-unchanged", type=int, default=50,
+                        help="incremental mode: stop a state after this many unchanged known rows in a row")
+    parser.add_argument("--dedup", action="store_true", help="drop rows whose CIN was already fetched")
+    parser.add_argument("--dedup-spill", help="SQLite file the CIN set spills to on very large runs")
+    parser.add_argument("--metrics", help="write per-phase timings to METRICS.json and METRICS.prom")
+    args = parser.parse_args()
+
+    server = None
+    resource_url = None
+    if args.fixture:
+        from fixture_server import FixtureServer
+        server = FixtureServer(latency=args.latency).start()
+        resource_url = server.resource_url
+
+    sink = None
+    if args.sink:
+        sink = create_sink(args.sink, f"all_companies_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.sink}")
+
+    try:
+        crawler = ROCHttpCrawler(
+            resource_url=resource_url,
+            page_size=args.page_size,
+            max_concurrency=args.concurrency,
+            response_format=args.format,
+            journal=CrawlJournal(args.journal) if args.journal else None,
+            delta=DeltaTracker(FingerprintIndex.load(args.index), args.stop_after_unchanged) if args.index else None,
+            sink=sink
+        )
+        if args.dedup:
+            crawler.dedup = CinDeduplicator(spill_path=args.dedup_spill)
+        start = time.perf_counter()
+        all_data = crawler.fetch_all_states_data(
+            selected_states=args.states,
+            max_pages_per_state=args.max_pages,
+            workers=args.workers
+        )
+        if sink:
+            sink.close()
+        elapsed = time.perf_counter() - start
+        rows = sum(sink.counts.values()) if sink else sum(len(companies) for companies in all_data.values())
+        print(f"Fetched {rows} companies across {len(all_data)} states in {elapsed:.3f}s "
+              f"({rows / elapsed if elapsed else 0:.0f} rows/sec)")
+        if server:
+            print(f"Fixture server handled {server.request_count} requests")
+        print(crawler.metrics.report())
+        print(f"Request rates: {json.dumps(crawler.rate_limiter.summary())}")
+        if args.metrics:
+            crawler.metrics.export(f"{args.metrics}.json", f"{args.metrics}.prom")
+        if crawler.dedup:
+            report_path = f"duplicate_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            crawler.dedup.save_report(report_path)
+            print(f"Dropped {crawler.dedup.duplicates} duplicate companies (see {report_path})")
+            crawler.dedup.close()
+        if crawler.delta:
+            delta = crawler.delta.delta()
+            crawler.save_to_json(delta, f"delta_companies_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+            crawler.delta.updated_index().save(args.index)
+            print(f"New: {sum(map(len, delta['new'].values()))}, "
+                  f"changed: {sum(map(len, delta['changed'].values()))}, "
+                  f"tombstones: {sum(map(len, delta['tombstones'].values()))}, "
+                  f"stopped early: {len(delta['stopped_early'])} states")
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
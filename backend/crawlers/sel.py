@@ -4,11 +4,29 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import argparse
 import json
+import os
+import queue
+import sys
+import threading
 import time
 
-def setup_driver(headless=True):
-    """Setup Chrome driver with options"""
+from browser_profile import NetworkReport, apply_lean_options, use_target
+from company_schema import iter_companies
+from crawl_metrics import CrawlMetrics
+from http_cache import HttpCache
+from html_extract import board_members_from_text, infobox_index, infobox_lookup, infobox_profile
+from page_cache import PageCache
+from rate_limiter import get_shared_limiter, is_error_page
+
+# Crawl targets; bench_replay.py points them at the local fixture server
+WIKIPEDIA_BASE_URL = "https://en.wikipedia.org/wiki/"
+TCS_LEADERSHIP_URL = "https://www.tcs.com/who-we-are/leadership"
+
+def setup_driver(headless=True, targets=None, network_log=True):
+    """Setup Chrome driver with options; targets enables lean browser profiles for those sites"""
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless")
@@ -17,109 +35,129 @@ def setup_driver(headless=True):
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+    if targets:
+        apply_lean_options(chrome_options, targets, network_log)
     
     driver = webdriver.Chrome(options=chrome_options)
     driver.implicitly_wait(10)
     return driver
 
-def get_wikipedia_infobox_selenium(title, driver):
-    """Extract Wikipedia infobox using Selenium"""
-    url = f"https://en.wikipedia.org/wiki/{title.replace(' ', '_')}"
+def get_wikipedia_infobox_selenium(title, driver, page_cache=None):
+    """Extract Wikipedia infobox using Selenium; page_cache keeps the page for offline re-parsing"""
+    url = f"{WIKIPEDIA_BASE_URL}{title.replace(' ', '_')}"
+    with get_shared_limiter().request(url) as ticket:
+        try:
+            use_target(driver, 'wikipedia')
+            driver.get(url)
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "infobox"))
+            )
+            infobox = driver.find_element(By.CLASS_NAME, "infobox")
+            if page_cache:
+                page_cache.put(driver.page_source, url, 'wikipedia', key=title)
+            return infobox
+        except (TimeoutException, NoSuchElementException):
+            # A page without an infobox is fine, a throttling page is not
+            ticket['ok'] = not is_error_page(driver.title)
+            print(f"Error: Infobox not found on {url}")
+            return None
+
+# Header and data text of each of the infobox's own rows, read in one call;
+# nested tables are part of their cell's text
+INFOBOX_ROWS_SCRIPT = """
+    var rows = arguments[0].rows || [];
+    var result = [];
+    for (var i = 0; i < rows.length; i++) {
+        var header = null, data = null;
+        for (var c = 0; c < rows[i].cells.length; c++) {
+            var cell = rows[i].cells[c];
+            if (cell.tagName === 'TH' && !header) {
+                header = cell;
+            } else if (cell.tagName === 'TD' && !data) {
+                data = cell;
+            }
+        }
+        if (header && data) {
+            result.push([header.innerText, data.innerText]);
+        }
+    }
+    return result;
+"""
+
+def extract_infobox_index_selenium(infobox):
+    """The infobox as a normalized label -> entries mapping, read in one browser call"""
     try:
-        driver.get(url)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "infobox"))
-        )
-        infobox = driver.find_element(By.CLASS_NAME, "infobox")
-        return infobox
-    except (TimeoutException, NoSuchElementException):
-        print(f"Error: Infobox not found on {url}")
-        return None
+        return infobox_index(infobox.parent.execute_script(INFOBOX_ROWS_SCRIPT, infobox))
+    except Exception as e:
+        print(f"Error reading infobox rows: {e}")
+        return {}
 
 def extract_infobox_field_selenium(infobox, label):
     """Extract specific field from infobox using Selenium"""
-    results = []
-    try:
-        rows = infobox.find_elements(By.TAG_NAME, "tr")
-        for row in rows:
-            try:
-                header = row.find_element(By.TAG_NAME, "th")
-                if label.lower() in header.text.lower():
-                    data = row.find_element(By.TAG_NAME, "td")
-                    # Get text and split by newlines to handle multiple entries
-                    full_text = data.text
-                    results = [entry.strip() for entry in full_text.split('\n') if entry.strip()]
-                    break
-            except NoSuchElementException:
-                continue
-    except Exception as e:
-        print(f"Error extracting field '{label}': {e}")
-    return results
-
-def group_name_roles(flat_list):
-    """Group names with their roles"""
-    grouped = []
-    i = 0
-    while i < len(flat_list):
-        name = flat_list[i]
-        role = None
-        if i + 1 < len(flat_list) and flat_list[i + 1].startswith("("):
-            role = flat_list[i + 1].strip("()")
-            i += 2
-        else:
-            i += 1
-        grouped.append({
-            "name": name,
-            "role": role if role else "Unknown"
-        })
-    return grouped
+    return infobox_lookup(extract_infobox_index_selenium(infobox), label)
+
+# Candidate lines of the section under the first "board of directors" h2/h3,
+# collected from its siblings up to the next heading in one call. A heading in
+# the newer <div class="mw-heading"> wrapper is walked from its wrapper.
+BOARD_SECTION_SCRIPT = """
+    // innerText of an element that is not rendered is its raw text, where WebElement.text is ''
+    function rendered(element) {
+        return element.getClientRects().length > 0;
+    }
+    var headers = document.querySelectorAll('h2, h3');
+    for (var i = 0; i < headers.length; i++) {
+        if (!rendered(headers[i]) ||
+                headers[i].innerText.toLowerCase().indexOf('board of directors') === -1) {
+            continue;
+        }
+        var anchor = headers[i];
+        if (anchor.parentElement && anchor.parentElement.classList.contains('mw-heading')) {
+            anchor = anchor.parentElement;
+        }
+        var lines = [];
+        for (var sibling = anchor.nextElementSibling; sibling; sibling = sibling.nextElementSibling) {
+            var tag = sibling.tagName.toLowerCase();
+            if (tag === 'h2' || tag === 'h3' || sibling.classList.contains('mw-heading')) {
+                break;
+            }
+            if (!rendered(sibling)) {
+                continue;
+            }
+            var text = sibling.innerText.split('\\n');
+            for (var j = 0; j < text.length; j++) {
+                if (text[j].trim()) {
+                    lines.push(text[j]);
+                }
+            }
+        }
+        return lines;
+    }
+    return [];
+"""
 
 def extract_board_members_selenium(driver):
     """Extract board members from Wikipedia page using Selenium"""
-    board_members = []
     try:
-        # Look for board of directors section
-        headers = driver.find_elements(By.CSS_SELECTOR, "h2, h3")
-        for header in headers:
-            if 'board of directors' in header.text.lower():
-                # Get the next sibling elements until we hit another header
-                content = []
-                sibling = driver.execute_script("return arguments[0].nextElementSibling;", header)
-                
-                while sibling and sibling.tag_name.lower() not in ['h2', 'h3']:
-                    text = sibling.text
-                    lines = text.split('\n')
-                    for line in lines:
-                        if line.strip():
-                            if '-' in line:
-                                parts = line.split('-', 1)
-                                name = parts[0].strip()
-                                role = parts[1].strip()
-                                content.append({"name": name, "role": role})
-                            else:
-                                content.append({"name": line.strip(), "role": ""})
-                    
-                    sibling = driver.execute_script("return arguments[0].nextElementSibling;", sibling)
-                
-                board_members = content
-                break
+        return board_members_from_text(driver.execute_script(BOARD_SECTION_SCRIPT))
     except Exception as e:
         print(f"Error extracting board members: {e}")
-    
-    return board_members
+        return []
 
 def scrape_tcs_leadership_selenium(driver):
     """Scrape TCS leadership page using Selenium"""
-    url = "https://www.tcs.com/who-we-are/leadership"
+    url = TCS_LEADERSHIP_URL
     leadership_data = []
     
     try:
-        driver.get(url)
-        
-        # Wait for the page to load
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "h2.intro-heading, .leadership-section"))
-        )
+        use_target(driver, 'tcs')
+        with get_shared_limiter().request(url) as ticket:
+            driver.get(url)
+            
+            # Wait for the page to load
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "h2.intro-heading, .leadership-section"))
+            )
+            ticket['ok'] = not is_error_page(driver.title)
         
         # Give additional time for dynamic content to load
         time.sleep(3)
@@ -163,7 +201,9 @@ def scrape_tcs_leadership_selenium(driver):
                 
                 for selector in name_selectors:
                     try:
-                        name_tag = role_tag.find_element(By.XPATH, f"following-sibling::{selector.replace('.', '[contains(@class, \"').replace('h3', 'h3').replace('[contains(@class, \"', '[contains(@class, \"') + '\")]' if '.' in selector else selector}")
+                        # "h3.intro-description" -> h3[contains(@class, "intro-description")]
+                        sibling = selector.replace('.', '[contains(@class, "') + '")]' if '.' in selector else selector
+                        name_tag = role_tag.find_element(By.XPATH, f"following-sibling::{sibling}")
                         if name_tag:
                             break
                     except:
@@ -210,42 +250,326 @@ def scrape_tcs_leadership_selenium(driver):
     
     return leadership_data
 
-def crawl_company_selenium(title):
-    """Main function to crawl company data using Selenium"""
-    driver = setup_driver(headless=False)  # Set to True for headless mode
-    
+# Results scraped from pages assembled client-side (browser_profile's 'tcs' target):
+# a conditional GET only revalidates their HTML shell, so they are scraped again
+# after this many seconds even while the shell is unchanged
+DERIVED_MAX_AGE = {
+    'leadership': 86400
+}
+
+def revalidated(http_cache, url, name, scrape, metrics):
+    """scrape(), or the result it stored for url while the page there is unchanged over HTTP"""
+    if not http_cache:
+        return scrape()
     try:
-        # Get Wikipedia data
-        infobox = get_wikipedia_infobox_selenium(title, driver)
-        if not infobox:
-            return {"error": "Infobox not found"}
-        
-        raw_key_people = extract_infobox_field_selenium(infobox, "Key people")
-        key_people = group_name_roles(raw_key_people)
-        subsidiaries = extract_infobox_field_selenium(infobox, "Subsidiaries")
+        # A conditional GET; a 304 or a fresh entry costs no body transfer and no browser load
+        with metrics.span('http_revalidate', kind=name) as span:
+            response = http_cache.get(url)
+            span['ok'] = response.unchanged
+    except Exception as e:
+        print(f"Error revalidating {url}: {e}")
+        return scrape()
+    
+    # The digest pins the result to the body just fetched, even if another run replaces it meanwhile
+    stored = None
+    if response.unchanged:
+        stored = http_cache.derived(url, name, digest=response.digest, max_age=DERIVED_MAX_AGE.get(name))
+    if stored is not None:
+        return stored
+    result = scrape()
+    # Only complete results are kept, so a failed scrape is retried on the next run
+    if result and response.digest and not (isinstance(result, dict) and 'error' in result):
+        http_cache.set_derived(url, name, result, digest=response.digest)
+    return result
+
+def scrape_company_profile(title, driver, metrics, page_cache=None):
+    """Infobox fields and board members of one company's Wikipedia article, read in Chrome"""
+    with metrics.span('wikipedia_load', company=title) as span:
+        infobox = get_wikipedia_infobox_selenium(title, driver, page_cache)
+        span['ok'] = infobox is not None
+    if not infobox:
+        return {"error": "Infobox not found"}
+    
+    # Every infobox field is a lookup in one index, so more fields cost no extra round trips
+    with metrics.span('infobox_extract', company=title):
+        fields = infobox_profile(extract_infobox_index_selenium(infobox))
+    with metrics.span('board_members', company=title):
         board_members_wiki = extract_board_members_selenium(driver)
-        
-        # Get TCS official data
-        board_members_tcs = scrape_tcs_leadership_selenium(driver)
-        
-        return {
-            "company": title,
-            "employees_key_people": key_people,
-            "subsidiaries": subsidiaries,
-            "board_members_wikipedia": board_members_wiki,
-            "board_members_tcs_official": board_members_tcs
-        }
     
+    return {"company": title, **fields, "board_members_wikipedia": board_members_wiki}
+
+def crawl_company(title, get_driver, metrics, page_cache=None, leadership=True, http_cache=None):
+    """Crawl one company, calling get_driver() only for pages that must be read in Chrome
+
+    http_cache skips Chrome for pages unchanged since a past run.
+    """
+    # Get Wikipedia data
+    url = f"{WIKIPEDIA_BASE_URL}{title.replace(' ', '_')}"
+    result = revalidated(http_cache, url, 'profile',
+                         lambda: scrape_company_profile(title, get_driver(), metrics, page_cache), metrics)
+    if 'error' in result:
+        return result
+    result = dict(result)
+    
+    # Get TCS official data
+    if leadership:
+        with metrics.span('tcs_leadership', company=title) as span:
+            result["board_members_tcs_official"] = revalidated(
+                http_cache, TCS_LEADERSHIP_URL, 'leadership', lambda: scrape_tcs_leadership_selenium(get_driver()), metrics)
+            span['ok'] = bool(result["board_members_tcs_official"])
+    
+    metrics.add_rows(sum(len(value) for value in result.values() if isinstance(value, list)), company=title)
+    return result
+
+def crawl_company_with_driver(title, driver, metrics, page_cache=None, leadership=True, http_cache=None):
+    """Crawl one company on an already running driver"""
+    return crawl_company(title, lambda: driver, metrics, page_cache, leadership, http_cache)
+
+def crawl_company_selenium(title, metrics=None, page_cache=None, headless=False, http_cache=None):
+    """Main function to crawl company data using Selenium; phase timings go to metrics
+
+    Chrome is started only when a page has to be read in it, so a run whose
+    pages are all unchanged in http_cache never starts a browser.
+    """
+    metrics = metrics or CrawlMetrics()
+    drivers = []
+    
+    def get_driver():
+        if not drivers:
+            with metrics.span('driver_start', company=title):
+                drivers.append(setup_driver(headless=headless, targets=['wikipedia', 'tcs']))  # Pass headless=True for headless mode
+        return drivers[0]
+    
+    try:
+        return crawl_company(title, get_driver, metrics, page_cache, http_cache=http_cache)
+    
+    finally:
+        for driver in drivers:
+            print(f"Network usage: {json.dumps(NetworkReport().collect(driver).summary())}")
+            driver.quit()
+
+def iter_titles(source):
+    """Company titles from a text file (one per line, "-" for stdin), a crawl JSON/NDJSON file or a list"""
+    if isinstance(source, str) and source.endswith(('.json', '.ndjson')):
+        for company in iter_companies(source):
+            if company.get('company_name'):
+                yield company['company_name']
+    elif isinstance(source, str):
+        lines = sys.stdin if source == '-' else open(source, encoding='utf-8')
+        try:
+            for line in lines:
+                if line.strip():
+                    yield line.strip()
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+    else:
+        yield from source
+
+def finished_titles(output_path):
+    """Titles already written to a batch output file, so a rerun continues where it stopped; timeouts are retried"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                if not result.get('timed_out'):
+                    done.add(result['company'])
+            except (ValueError, KeyError):
+                continue  # a torn last line from an interrupted run
+    return done
+
+def start_pooled_driver(metrics, headless, title_timeout):
+    """Headless driver for the batch pool; waits are explicit, so no implicit wait on misses"""
+    with metrics.span('driver_start'):
+        # No network report is read from pooled drivers, so their performance log stays off
+        driver = setup_driver(headless=headless, targets=['wikipedia', 'tcs'], network_log=False)
+        driver.implicitly_wait(0)
+        driver.set_page_load_timeout(title_timeout)
+    return driver
+
+def crawl_companies_batch(titles, output_path, drivers=4, title_timeout=90, headless=True, metrics=None,
+                          page_cache=None, leadership=False, http_cache=None):
+    """Crawl a list or stream of titles over a pool of warm drivers, appending one JSON line per title"""
+    metrics = metrics or CrawlMetrics()
+    done = finished_titles(output_path)
+    # Bounded, so a stream of titles is read only as fast as it is crawled
+    work = queue.Queue(maxsize=drivers * 2)
+    output_lock = threading.Lock()
+    stats = {'titles': 0, 'ok': 0, 'errors': 0, 'timeouts': 0, 'skipped': 0, 'driver_restarts': 0,
+             'ready': 0, 'warm_at': None, 'warm_titles': 0}
+    start = time.perf_counter()
+    output = open(output_path, 'a', encoding='utf-8')
+    
+    def write_result(result):
+        with output_lock:
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+            output.flush()
+            stats['titles'] += 1
+            if 'error' not in result:
+                stats['ok'] += 1
+            else:
+                stats['errors'] += 1
+            if stats['warm_at'] is not None:
+                stats['warm_titles'] += 1
+    
+    def mark_ready():
+        # Steady state starts once every driver is up (or has failed to start)
+        with output_lock:
+            stats['ready'] += 1
+            if stats['ready'] == drivers:
+                stats['warm_at'] = time.perf_counter()
+    
+    def run_worker(worker_id):
+        try:
+            driver = start_pooled_driver(metrics, headless, title_timeout)
+        except Exception as e:
+            print(f"Worker {worker_id} could not start a driver: {e}")
+            mark_ready()
+            return
+        mark_ready()
+        # The title runs on a helper thread so a hung page can be abandoned at its deadline
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            while True:
+                item = work.get()
+                if item is None:
+                    break
+                title, task = item
+                future = executor.submit(task, driver)
+                try:
+                    with metrics.span('company', company=title) as span:
+                        result = future.result(timeout=title_timeout)
+                        span['ok'] = 'error' not in result
+                    result = dict(result, company=title)
+                except FutureTimeout:
+                    result = {"company": title, "error": f"Timed out after {title_timeout}s", "timed_out": True}
+                    with output_lock:
+                        stats['timeouts'] += 1
+                        stats['driver_restarts'] += 1
+                    # Quitting the session makes the stuck call fail; a fresh driver takes the next title
+                    driver.quit()
+                    executor.shutdown(wait=False)
+                    executor = ThreadPoolExecutor(max_workers=1)
+                    try:
+                        driver = start_pooled_driver(metrics, headless, title_timeout)
+                    except Exception as e:
+                        print(f"Worker {worker_id} could not restart its driver: {e}")
+                        write_result(result)
+                        return
+                except Exception as e:
+                    result = {"company": title, "error": str(e)}
+                write_result(result)
+        finally:
+            executor.shutdown(wait=False)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    threads = [threading.Thread(target=run_worker, args=(i,), name=f"company-worker-{i}", daemon=True)
+               for i in range(drivers)]
+    for thread in threads:
+        thread.start()
+    
+    def submit(item):
+        while True:
+            try:
+                work.put(item, timeout=1)
+                return
+            except queue.Full:
+                if not any(thread.is_alive() for thread in threads):
+                    raise RuntimeError("Every company worker has stopped")
+    
+    try:
+        # The TCS leadership page is not per company, so a batch fetches it once
+        if leadership and TCS_LEADERSHIP_URL not in done:
+            submit((TCS_LEADERSHIP_URL, lambda driver: {"board_members_tcs_official": revalidated(
+                http_cache, TCS_LEADERSHIP_URL, 'leadership', lambda: scrape_tcs_leadership_selenium(driver), metrics)}))
+        for title in iter_titles(titles):
+            if title in done:
+                stats['skipped'] += 1
+                continue
+            done.add(title)
+            submit((title, lambda driver, title=title: crawl_company_with_driver(title, driver, metrics, page_cache,
+                                                                                leadership=False,
+                                                                                http_cache=http_cache)))
+        for _ in threads:
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    work.put(None, timeout=1)
+                    break
+                except queue.Full:
+                    continue
+        for thread in threads:
+            thread.join()
     finally:
-        driver.quit()
+        output.close()
+    
+    stats['seconds'] = time.perf_counter() - start
+    return batch_report(stats, metrics, drivers, start)
+
+def batch_report(stats, metrics, drivers, start):
+    """Throughput of a batch, with driver startup separated from steady-state crawling"""
+    phases = metrics.to_dict()['phases']
+    startup = phases.get('driver_start', {})
+    company = phases.get('company', {})
+    stats.pop('ready')
+    warm_at = stats.pop('warm_at')
+    warm_titles = stats.pop('warm_titles')
+    steady_seconds = stats['seconds'] - (warm_at - start) if warm_at else None
+    per_title = company.get('mean_seconds') or 0
+    report = dict(stats)
+    report.update({
+        'drivers': drivers,
+        'driver_starts': startup.get('count', 0),
+        'startup_mean_seconds': startup.get('mean_seconds'),
+        'startup_total_seconds': startup.get('total_seconds'),
+        'title_mean_seconds': company.get('mean_seconds'),
+        'titles_per_second': round(stats['titles'] / stats['seconds'], 3) if stats['seconds'] else None,
+        'steady_titles_per_second': round(warm_titles / steady_seconds, 3) if steady_seconds else None,
+        # What launching one Chrome per title would have cost at the same parallelism
+        'cold_start_estimate_seconds': round(stats['titles'] * ((startup.get('mean_seconds') or 0) + per_title)
+                                             / drivers, 3)
+    })
+    report['seconds'] = round(report['seconds'], 3)
+    return report
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Crawl company profiles from Wikipedia")
+    parser.add_argument("--batch", help="titles to crawl: a text file (one per line, - for stdin) or a crawl .json/.ndjson")
+    parser.add_argument("--output", default="company_profiles.ndjson", help="batch output, one JSON line per title")
+    parser.add_argument("--drivers", type=int, default=4, help="warm headless drivers in the batch pool")
+    parser.add_argument("--timeout", type=float, default=90, help="seconds allowed per title")
+    parser.add_argument("--leadership", action="store_true", help="batch: also fetch the TCS leadership page once")
+    parser.add_argument("--http-cache", help="directory of a persistent HTTP cache; pages unchanged since a past run "
+                                             "reuse its results instead of loading Chrome")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="seconds a cached page is trusted unrevalidated")
+    args = parser.parse_args()
+    
+    metrics = CrawlMetrics()
+    # Set COMPANY_PAGE_CACHE to a directory to keep the Wikipedia page for offline re-parsing
+    page_cache = PageCache(os.environ["COMPANY_PAGE_CACHE"]) if os.environ.get("COMPANY_PAGE_CACHE") else None
+    http_cache = HttpCache(args.http_cache, args.cache_ttl) if args.http_cache else None
     try:
-        data = crawl_company_selenium("Tata Consultancy Services")
-        print(json.dumps(data, indent=2))
+        if args.batch:
+            report = crawl_companies_batch(args.batch, args.output, args.drivers, args.timeout,
+                                           metrics=metrics, page_cache=page_cache, leadership=args.leadership,
+                                           http_cache=http_cache)
+            print(json.dumps(report, indent=2))
+        else:
+            data = crawl_company_selenium("Tata Consultancy Services", metrics, page_cache, http_cache=http_cache)
+            print(json.dumps(data, indent=2))
     except Exception as e:
         print(f"Error in main execution: {e}")
+    finally:
+        metrics.export("company_crawl_metrics.json", "company_crawl_metrics.prom", prefix="company_crawler")
+        print(metrics.report())
+        if http_cache:
+            print(f"HTTP cache: {json.dumps(http_cache.stats())}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,123 @@
+"""Resolve a fallback chain of selectors in one browser round trip
+
+The crawlers try lists of CSS and XPath candidates for the same control
+(popup close buttons, the data table, the Next button). Trying them one
+find_element or WebDriverWait at a time costs a round trip per candidate and,
+on a page where most of them miss, a full timeout per candidate. PROBE_SCRIPT
+evaluates the whole list inside the page and returns the first match in list
+order that passes the filters, so a chain costs one call and waits are
+bounded by one timeout:
+
+    index, element = probe(driver, CLOSE_SELECTORS)
+    found = waiter.wait_for('data_table', probe_condition(TABLE_SELECTORS, visible=False))
+
+Candidates starting with "/" or "(" are XPath, everything else CSS.
+"""
+
+PROBE_SCRIPT = """
+    var selectors = arguments[0];
+    var options = arguments[1] || {};
+
+    function usable(element) {
+        if (options.visible) {
+            if (!element.getClientRects().length) {
+                return false;
+            }
+            var style = window.getComputedStyle(element);
+            if (style.visibility === 'hidden' || style.display === 'none') {
+                return false;
+            }
+        }
+        if (options.enabled && (element.disabled || element.getAttribute('aria-disabled') === 'true')) {
+            return false;
+        }
+        if (options.excludeClass &&
+                (element.getAttribute('class') || '').toLowerCase().indexOf(options.excludeClass) !== -1) {
+            return false;
+        }
+        return true;
+    }
+
+    for (var i = 0; i < selectors.length; i++) {
+        var candidates = [];
+        try {
+            if (selectors[i].charAt(0) === '/' || selectors[i].charAt(0) === '(') {
+                var snapshot = document.evaluate(selectors[i], document, null,
+                                                 XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (var s = 0; s < snapshot.snapshotLength; s++) {
+                    candidates.push(snapshot.snapshotItem(s));
+                }
+            } else {
+                candidates = document.querySelectorAll(selectors[i]);
+            }
+        } catch (e) {
+            // An invalid selector is a miss, not a failure of the whole chain
+            continue;
+        }
+        for (var c = 0; c < candidates.length; c++) {
+            if (candidates[c].nodeType === 1 && usable(candidates[c])) {
+                return [i, candidates[c]];
+            }
+        }
+    }
+    return null;
+"""
+
+# Picks a <select> option by the first matching candidate text or value, else by
+# partial text, and fires the events a user selection would
+SELECT_OPTION_SCRIPT = """
+    var select = arguments[0];
+    var candidates = arguments[1];
+    var partial = arguments[2].toLowerCase();
+    var options = select.options;
+    var chosen = -1;
+
+    for (var c = 0; c < candidates.length && chosen < 0; c++) {
+        for (var i = 0; i < options.length; i++) {
+            if (options[i].text.trim() === candidates[c]) {
+                chosen = i;
+                break;
+            }
+        }
+        for (var v = 0; v < options.length && chosen < 0; v++) {
+            if (options[v].value === candidates[c]) {
+                chosen = v;
+            }
+        }
+    }
+    for (var p = 0; p < options.length && chosen < 0; p++) {
+        if (partial && options[p].text.toLowerCase().indexOf(partial) !== -1) {
+            chosen = p;
+        }
+    }
+    if (chosen < 0) {
+        return null;
+    }
+
+    select.selectedIndex = chosen;
+    select.dispatchEvent(new Event('input', {bubbles: true}));
+    select.dispatchEvent(new Event('change', {bubbles: true}));
+    return {text: options[chosen].text, value: options[chosen].value};
+"""
+
+
+def probe(driver, selectors, visible=True, enabled=False, exclude_class=None):
+    """First element matching any selector, in list order; returns (index, element) or (None, None)"""
+    options = {'visible': visible, 'enabled': enabled, 'excludeClass': exclude_class}
+    result = driver.execute_script(PROBE_SCRIPT, list(selectors), options)
+    if not result:
+        return None, None
+    return result[0], result[1]
+
+
+def probe_condition(selectors, **filters):
+    """WebDriverWait condition that is (index, element) once any selector matches"""
+    def condition(driver):
+        index, element = probe(driver, selectors, **filters)
+        return (index, element) if element is not None else False
+    return condition
+
+
+def select_option(driver, select_element, candidates, partial=''):
+    """Select the first option whose text or value equals a candidate (or contains partial)"""
+    return driver.execute_script(SELECT_OPTION_SCRIPT, select_element, list(candidates), partial)
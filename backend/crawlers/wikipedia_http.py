@@ -0,0 +1,182 @@
+"""Browserless Wikipedia company profiles over a pooled keep-alive session
+
+sel.py renders the whole article in Chrome to read a few infobox rows. This
+client fetches the article content over HTTP instead. By default it uses the
+MediaWiki parse API (action=parse), which returns only the rendered article
+body; --html fetches the article page itself. The content is parsed with
+html_extract's scanners. The result has the same Key people, Subsidiaries and
+board-member structures as sel.crawl_company_selenium:
+
+    python wikipedia_http.py "Tata Consultancy Services" Infosys
+    python wikipedia_http.py --titles-file titles.txt --workers 8 --output profiles.ndjson
+    python wikipedia_http.py --fixture "Tata Consultancy Services" --repeat 50
+    python wikipedia_http.py --titles-file titles.txt --http-cache http_cache --cache-ttl 86400
+
+With --http-cache, responses are kept on disk and revalidated with conditional
+requests, so a repeat run over unchanged articles transfers almost nothing.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+from crawl_metrics import CrawlMetrics
+from html_extract import extract_board_members, extract_infobox_rows, infobox_index, infobox_profile
+from http_cache import HttpCache
+from http_session import create_pool
+from rate_limiter import THROTTLE_STATUSES, get_shared_limiter
+
+ARTICLE_URL = "https://en.wikipedia.org/wiki/"
+API_URL = "https://en.wikipedia.org/w/api.php"
+
+
+class WikipediaHttpClient:
+    """Company profiles from Wikipedia over HTTP, parsed without a browser"""
+
+    def __init__(self, article_url=ARTICLE_URL, api_url=API_URL, use_api=True, pool=None, max_connections=8,
+                 metrics=None, page_cache=None, http_cache=None):
+        self.article_url = article_url
+        self.api_url = api_url
+        self.use_api = use_api
+        self.pool = pool or create_pool(max_connections=max_connections)
+        self.metrics = metrics or CrawlMetrics()
+        self.rate_limiter = get_shared_limiter()
+        # Optional PageCache; fetched content is stored under kind 'wikipedia' like the Selenium path
+        self.page_cache = page_cache
+        # Optional HttpCache; fresh responses are served from disk, stale ones revalidated
+        self.http_cache = http_cache
+
+    def _send(self, url, fields=None, headers=None):
+        """GET through the shared rate limiter; returns the response"""
+        with self.rate_limiter.request(url, self.metrics) as ticket:
+            response = self.pool.request('GET', url, fields=fields, headers=headers)
+            ticket['ok'] = response.status not in THROTTLE_STATUSES
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            self.rate_limiter.pause(url, int(retry_after))
+        return response
+
+    def _get(self, url, fields=None):
+        """GET through the HTTP cache when there is one"""
+        if self.http_cache:
+            return self.http_cache.get(url, fields, self._send)
+        return self._send(url, fields)
+
+    def fetch_html(self, title):
+        """(url, article HTML) for a title; the HTML is None when the article is missing"""
+        if self.use_api:
+            fields = {'action': 'parse', 'page': title, 'prop': 'text', 'format': 'json',
+                      'formatversion': '2', 'redirects': '1'}
+            response = self._get(self.api_url, fields)
+            if response.status != 200:
+                raise RuntimeError(f"HTTP {response.status} from the parse API for {title}")
+            payload = json.loads(response.data.decode('utf-8'))
+            url = f"{self.article_url}{quote(title.replace(' ', '_'))}"
+            # A missing page is an error payload, not an HTTP error
+            return url, payload.get('parse', {}).get('text')
+
+        url = f"{self.article_url}{quote(title.replace(' ', '_'))}"
+        response = self._get(url)
+        if response.status == 404:
+            return url, None
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status} for {url}")
+        return url, response.data.decode('utf-8')
+
+    def company_profile(self, title):
+        """Infobox fields and board members of one company, as sel.crawl_company_selenium returns them"""
+        with self.metrics.span('wikipedia_fetch', company=title) as span:
+            url, html = self.fetch_html(title)
+            span['ok'] = html is not None
+        if html is None:
+            return {"error": "Article not found"}
+        if self.page_cache:
+            self.page_cache.put(html, url, 'wikipedia', key=title)
+
+        with self.metrics.span('infobox_extract', company=title) as span:
+            rows = extract_infobox_rows(html)
+            span['ok'] = bool(rows)
+            if not rows:
+                return {"error": "Infobox not found"}
+            fields = infobox_profile(infobox_index(rows))
+        with self.metrics.span('board_members', company=title):
+            board_members = extract_board_members(html)
+
+        profile = {"company": title, **fields, "board_members_wikipedia": board_members}
+        self.metrics.add_rows(sum(len(value) for value in profile.values() if isinstance(value, list)), company=title)
+        return profile
+
+    def company_profiles(self, titles, workers=8):
+        """Profiles for many titles over the shared pool, yielded in input order as they finish"""
+        def profile(title):
+            try:
+                with self.metrics.span('company', company=title) as span:
+                    result = self.company_profile(title)
+                    span['ok'] = 'error' not in result
+                return dict(result, company=title)
+            except Exception as e:
+                return {"company": title, "error": str(e)}
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(profile, titles)
+
+    def close(self):
+        self.pool.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch company profiles from Wikipedia without a browser")
+    parser.add_argument("titles", nargs="*")
+    parser.add_argument("--titles-file", help="one title per line")
+    parser.add_argument("--html", action="store_true", help="fetch the article page instead of the parse API")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests")
+    parser.add_argument("--output", help="write one JSON line per title instead of printing")
+    parser.add_argument("--fixture", action="store_true", help="serve the fixture article locally")
+    parser.add_argument("--repeat", type=int, default=1, help="fetch every title this many times (latency runs)")
+    parser.add_argument("--http-cache", help="directory of a persistent HTTP cache with conditional revalidation")
+    parser.add_argument("--cache-ttl", type=float, default=3600, help="seconds a cached response is used unrevalidated")
+    args = parser.parse_args()
+
+    titles = list(args.titles)
+    if args.titles_file:
+        with open(args.titles_file, encoding='utf-8') as f:
+            titles.extend(line.strip() for line in f if line.strip())
+    titles = titles * args.repeat
+
+    server = None
+    article_url, api_url = ARTICLE_URL, API_URL
+    if args.fixture:
+        from fixture_server import FixtureServer
+        server = FixtureServer(records=[]).start()
+        article_url, api_url = server.wikipedia_url, server.wikipedia_api_url
+
+    http_cache = HttpCache(args.http_cache, args.cache_ttl) if args.http_cache else None
+    client = WikipediaHttpClient(article_url, api_url, use_api=not args.html, max_connections=args.workers,
+                                 http_cache=http_cache)
+    output = open(args.output, 'a', encoding='utf-8') if args.output else None
+    start = time.perf_counter()
+    try:
+        for profile in client.company_profiles(titles, args.workers):
+            if output:
+                output.write(json.dumps(profile, ensure_ascii=False) + '\n')
+            elif args.repeat == 1:
+                print(json.dumps(profile, indent=2, ensure_ascii=False))
+    finally:
+        elapsed = time.perf_counter() - start
+        if output:
+            output.close()
+        client.close()
+        if server:
+            server.stop()
+
+    company = client.metrics.to_dict()['phases'].get('company', {})
+    print(f"Fetched {len(titles)} profiles in {elapsed:.3f}s ({len(titles) / elapsed if elapsed else 0:.1f}/sec), "
+          f"{(company.get('mean_seconds') or 0) * 1000:.1f} ms per company")
+    print(client.metrics.report())
+    if http_cache:
+        print(f"HTTP cache: {json.dumps(http_cache.stats())}")
+
+
+if __name__ == "__main__":
+    main()